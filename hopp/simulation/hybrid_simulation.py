@@ -1,5 +1,7 @@
-from typing import Dict, Iterable, Optional, Sequence, Union
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
 import csv
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import json
@@ -17,9 +19,12 @@ from hopp.simulation.technologies.csp.trough_plant import TroughConfig, TroughPl
 from hopp.simulation.technologies.wave.mhk_wave_plant import MHKWavePlant, MHKConfig
 from hopp.simulation.technologies.battery import Battery, BatteryConfig, BatteryStateless, BatteryStatelessConfig
 from hopp.simulation.technologies.grid import Grid, GridConfig
+from hopp.simulation.technologies.financial.custom_financial_model import CustomFinancialModel
+from hopp.simulation.technologies.lifetime_profile import LifetimeProfile
 from hopp.simulation.technologies.reopt import REopt
 from hopp.simulation.technologies.layout.hybrid_layout import HybridLayout
 from hopp.simulation.technologies.dispatch.hybrid_dispatch_builder_solver import HybridDispatchBuilderSolver
+from hopp.tools.utils import expand_param_grid
 from hopp.utilities.log import hybrid_logger as logger
 from hopp.simulation.base import BaseClass
 
@@ -192,6 +197,7 @@ class HybridSimulation(BaseClass):
 
     dispatch_builder: HybridDispatchBuilderSolver = field(init=False)
     _fileout: Path = field(init=False)
+    _performance_snapshot: Optional[dict] = field(init=False, default=None)
 
     def __attrs_post_init__(self):
         self.technologies = {} # store technologies after they've been initialized
@@ -636,8 +642,8 @@ class HybridSimulation(BaseClass):
         # Put the hybrid together for grid simulation
         hybrid_size_kw = 0
         hybrid_nominal_capacity = 0
-        total_gen = np.zeros(self.site.n_timesteps * project_life)
-        total_gen_before_battery = np.zeros(self.site.n_timesteps * project_life)
+        total_gen = LifetimeProfile.zeros(self.site.n_timesteps, project_life)
+        total_gen_before_battery = LifetimeProfile.zeros(self.site.n_timesteps, project_life)
         total_gen_max_feasible_year1 = np.zeros(self.site.n_timesteps)
 
         for system in self.technologies.keys():
@@ -646,8 +652,10 @@ class HybridSimulation(BaseClass):
                 if model:
                     hybrid_size_kw += model.system_capacity_kw
                     hybrid_nominal_capacity += model.calc_nominal_capacity(self.interconnect_kw)
-                    project_life_gen = np.tile(model.generation_profile, int(project_life / (len(model.generation_profile) // self.site.n_timesteps)))
-                    if len(project_life_gen) != len(total_gen):
+                    try:
+                        project_life_gen = LifetimeProfile(model.generation_profile, self.site.n_timesteps,
+                                                           project_life)
+                    except ValueError:
                         raise ValueError("Generation profile, `gen`, from system {} should have length that divides"
                                         " n_timesteps {} * project_life {}".format(system, self.site.n_timesteps,
                                                                                     project_life))
@@ -659,22 +667,26 @@ class HybridSimulation(BaseClass):
 
         # Consolidate grid generation by copying over power and storage generation information
         if self.battery:
-            self.grid.generation_profile_wo_battery = total_gen_before_battery
+            self.grid.generation_profile_wo_battery = total_gen_before_battery.to_array()
         self.grid.simulate_grid_connection(hybrid_size_kw, total_gen, project_life, lifetime_sim, total_gen_max_feasible_year1)
         self.grid.hybrid_nominal_capacity = hybrid_nominal_capacity
         self.grid.total_gen_max_feasible_year1 = total_gen_max_feasible_year1
         logger.info(f"Hybrid Peformance Simulation Complete. AEPs are {self.annual_energies}.")
 
-    def simulate_financials(self, project_life):
+    def simulate_financials(self, project_life, technologies: Optional[Iterable[str]] = None):
         """
         Runs the finanical models for individual sub-systems and the hybrid system as a whole
 
         :param project_life: ``int``,
             Number of year in the analysis period (execepted project lifetime) [years]
+        :param technologies: (optional) sub-systems whose financial models are run, all if not provided.
+            The hybrid system's financial model is always run
         :return:
         """
         for system in self.technologies.keys():
             if system != 'grid':
+                if technologies is not None and system not in technologies:
+                    continue
                 model = getattr(self, system)
                 if model:
                     storage_cc = True
@@ -709,6 +721,11 @@ class HybridSimulation(BaseClass):
             self.grid._financial_model.value('batt_annual_charge_from_system', self.battery._financial_model.value('batt_annual_charge_from_system')[system_year_start:])
 
         self.grid.simulate_financials(self.interconnect_kw, project_life)
+        # Generation as seen by the financial models, which extend it over the project life
+        self._performance_snapshot = {
+            'project_life': project_life,
+            'generation_profile': {k: v.generation_profile for k, v in self.technologies.items()},
+        }
         logger.info(f"Hybrid Financials Complete. NPVs are {self.net_present_values}.")
 
 
@@ -727,6 +744,161 @@ class HybridSimulation(BaseClass):
         self.calculate_financials()
         self.simulate_financials(project_life)
 
+    def resimulate_financials(self, changes: Optional[dict] = None) -> set:
+        """
+        Re-evaluates the financials of an already simulated hybrid plant after changing financial assumptions, using
+        the performance outputs and project life of the last :meth:`simulate` instead of re-running the performance
+        models. Raises a ``RuntimeError`` if any generation profile changed since then.
+
+        Only the financial models of the technologies whose financial inputs or installed cost `changes` modifies are
+        re-executed; the hybrid system's financial model always is.
+
+        :param changes: (optional) financial inputs to change, in the format accepted by :meth:`assign`. Changes to
+            the inputs of a system performance model are rejected with a ``ValueError`` and the plant is left as it was
+
+        :returns: names of the technologies whose financial models were re-executed
+        """
+        snapshot = self._performance_snapshot
+        if snapshot is None:
+            raise RuntimeError("'resimulate_financials' called before 'simulate_financials'.")
+        for k, v in self.technologies.items():
+            if not np.array_equal(v.generation_profile, snapshot['generation_profile'][k]):
+                raise RuntimeError(f"Generation of {k} changed since the last 'simulate'. Performance must be "
+                                   "re-simulated with 'simulate'.")
+
+        changes = changes or {}
+        if any(not isinstance(v, dict) for v in changes.values()):
+            targets = list(self.technologies.keys())
+        else:
+            targets = [k for k in self.technologies.keys() if k in changes]
+        states = {k: _technology_state(self.technologies[k]) for k in targets}
+        financial_inputs = {k: _model_inputs(self.technologies[k]._financial_model) for k in targets}
+        installed_costs = {k: v.total_installed_cost for k, v in self.technologies.items()}
+
+        self.assign(changes)
+        performance_changes = {}
+        for k in targets:
+            if 'system' in states[k]:
+                names = _changed_inputs(states[k]['system'], _model_inputs(self.technologies[k]._system_model))
+                if names:
+                    performance_changes[k] = names
+        if performance_changes:
+            for k in targets:
+                _restore_technology_state(self.technologies[k], states[k])
+            raise ValueError(f"Changes to performance model inputs {performance_changes} can't be re-evaluated "
+                             "without re-simulating performance with 'simulate'.")
+
+        changed = {k for k in targets
+                   if _changed_inputs(financial_inputs[k], _model_inputs(self.technologies[k]._financial_model))}
+        self.calculate_installed_cost()
+        changed.update(k for k, v in self.technologies.items() if v.total_installed_cost != installed_costs[k])
+
+        if changed:
+            # hybrid financial inputs are aggregated from the technologies' values, which are otherwise unchanged
+            self.calculate_financials()
+        self.simulate_financials(snapshot['project_life'], changed)
+        changed.add('grid')
+        logger.info(f"Hybrid financials re-simulated for {sorted(changed)}.")
+        return changed
+
+    def sweep(self,
+              param_grid: Union[dict, Sequence[dict]],
+              n_workers: int = 1,
+              project_life: int = 25,
+              lifetime_sim: bool = False,
+              outputs: Optional[Sequence[str]] = None) -> Iterator[Tuple[int, dict, dict]]:
+        """
+        Simulates a batch of scenarios, each applied with :meth:`assign` to a hybrid plant that is built only once
+        per worker, so each scenario costs only its simulation and not the site, model and dispatch setup. The plant's
+        inputs are restored to their state before the sweep once each scenario is simulated, so no scenario sees the
+        values of those before it.
+
+        .. note::
+            With ``n_workers > 1``, each worker process builds its own plant from the inputs this instance was
+            created with (``site``, ``tech_config``, ``dispatch_options``, ``cost_info``, ``simulation_options``).
+            Changes made to this instance after it was created are not seen by the workers, so they should be
+            included in the scenarios instead.
+
+        :param param_grid: scenarios to simulate. Either a (nested) dict of :class:`hopp.tools.utils.Candidates`
+            and fixed values, expanded into every combination by :func:`hopp.tools.utils.expand_param_grid`, or a
+            sequence of dicts each accepted by :meth:`assign`
+        :param n_workers: number of worker processes. With 1, scenarios are simulated in series on this instance
+        :param project_life: Number of year in the analysis period (execepted project lifetime) [years]
+        :param lifetime_sim: For simulation modules which support simulating each year of the project_life,
+            whether or not to do so; otherwise the first year data is repeated
+        :param outputs: (optional) names of :class:`HybridSimulation` attributes to return for each scenario.
+            If not provided, :meth:`hybrid_simulation_outputs` is returned
+
+        :returns: iterator of (scenario index, scenario, outputs) tuples, yielded as each scenario completes
+        """
+        scenarios = expand_param_grid(param_grid)
+
+        if n_workers <= 1:
+            baseline = {}
+            for i, scenario in enumerate(scenarios):
+                yield i, scenario, self._simulate_scenario(scenario, project_life, lifetime_sim, outputs, baseline)
+            return
+
+        init_args = (self.site, self.tech_config, self.dispatch_options, self.cost_info, self.simulation_options)
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 initializer=_init_sweep_worker,
+                                 initargs=init_args) as executor:
+            futures = {executor.submit(_run_sweep_scenario, scenario, project_life, lifetime_sim, outputs): i
+                       for i, scenario in enumerate(scenarios)}
+            for future in as_completed(futures):
+                i = futures[future]
+                yield i, scenarios[i], future.result()
+
+    def _simulate_scenario(self,
+                           scenario: dict,
+                           project_life: int,
+                           lifetime_sim: bool,
+                           outputs: Optional[Sequence[str]],
+                           baseline: dict) -> dict:
+        """
+        Assigns and simulates a single :meth:`sweep` scenario, returning its outputs as plain values
+
+        :param baseline: state of the plant before any scenario was assigned, extended with the values of the inputs
+            assigned by `scenario`. Filled in by the first scenario, and restored after each one is simulated
+        """
+        assigned = []
+        for k, v in scenario.items():
+            if isinstance(v, dict):
+                if k in self.technologies.keys():
+                    assigned.extend((k, kk) for kk in v.keys())
+            else:
+                assigned.extend((tech, k) for tech in self.technologies.keys())
+
+        if not baseline:
+            baseline['models'] = {tech: _technology_state(model) for tech, model in self.technologies.items()}
+            baseline['values'] = {}
+        for key in assigned:
+            if key not in baseline['values']:
+                tech, name = key
+                baseline['values'][key] = deepcopy(self.technologies[tech].value(name))
+
+        try:
+            self.assign(scenario)
+            self.simulate(project_life, lifetime_sim)
+
+            if outputs is None:
+                return self.hybrid_simulation_outputs()
+
+            results = {}
+            for name in outputs:
+                result = getattr(self, name)
+                if isinstance(result, HybridSimulationOutput):
+                    result = dict(result.items())
+                results[name] = result
+            return results
+        finally:
+            # setters may also change derived inputs and layouts, which are then reset from the models' state
+            for tech, name in assigned:
+                if baseline['values'][(tech, name)] is not None:
+                    self.technologies[tech].value(name, baseline['values'][(tech, name)])
+            for tech, model in self.technologies.items():
+                _restore_technology_state(model, baseline['models'][tech])
+
     @property
     def interconnect_kw(self) -> float:
         """Interconnection limit [kW]"""
@@ -803,7 +975,7 @@ class HybridSimulation(BaseClass):
                 continue
             if hasattr(self, v):
                 setattr(aep, v, getattr(getattr(self, v), "annual_energy_kwh"))
-        aep.hybrid = sum(self.grid.generation_profile[0:self.site.n_timesteps])
+        aep.hybrid = float(self.grid.generation_profile[0:self.site.n_timesteps].sum())
         return aep
 
     @property
@@ -1181,3 +1353,84 @@ class HybridSimulation(BaseClass):
                     linewidth=4.0
                     ):
         return self.layout.plot(figure, axes, wind_color, pv_color, site_border_color, site_alpha, linewidth)
+
+
+def _technology_state(model: PowerSourceTypes) -> dict:
+    """
+    Returns the inputs of a technology's system and financial models and the attributes of its layout, which
+    `_restore_technology_state` sets back
+    """
+    state = {}
+    for name, obj in (('system', model._system_model), ('financial', model._financial_model)):
+        if hasattr(obj, 'export'):
+            inputs = obj.export()
+            inputs.pop('Outputs', None)
+            state[name] = inputs
+        elif isinstance(obj, CustomFinancialModel):
+            state[name] = deepcopy({k: v for k, v in vars(obj).items() if k != '_system_model'})
+    layout = getattr(model, 'layout', None) or model._layout
+    if layout is not None:
+        state['layout'] = dict(vars(layout))
+    return state
+
+
+def _model_inputs(obj) -> dict:
+    """
+    Returns the inputs of a system or financial model by group, for finding which changed with `_changed_inputs`
+    """
+    if isinstance(obj, CustomFinancialModel):
+        inputs = {type(group).__name__: group.export() for group in obj.subclasses if group is not obj.Outputs}
+        inputs[''] = {k: v for k, v in vars(obj).items()
+                      if k not in ('_system_model', 'subclasses') and k not in inputs}
+        return inputs
+    if hasattr(obj, 'export'):
+        inputs = obj.export()
+        inputs.pop('Outputs', None)
+        return inputs
+    return {}
+
+
+def _changed_inputs(before: dict, after: dict) -> list:
+    """
+    Returns the names of the inputs that differ between two `_model_inputs` of a model
+    """
+    changed = []
+    for group in before.keys() | after.keys():
+        group_before, group_after = before.get(group, {}), after.get(group, {})
+        for name in group_before.keys() | group_after.keys():
+            a, b = group_before.get(name), group_after.get(name)
+            try:
+                same = np.array_equal(a, b, equal_nan=True)
+            except (TypeError, ValueError):
+                same = a == b
+            if not same:
+                changed.append(name)
+    return sorted(changed)
+
+
+def _restore_technology_state(model: PowerSourceTypes, state: dict):
+    for name, obj in (('financial', model._financial_model), ('system', model._system_model)):
+        if name not in state:
+            continue
+        if isinstance(obj, CustomFinancialModel):
+            vars(obj).update(deepcopy(state[name]))
+        else:
+            obj.assign(state[name])
+    if 'layout' in state:
+        layout = getattr(model, 'layout', None) or model._layout
+        vars(layout).update(state['layout'])
+
+
+# Plant built once per sweep worker process by `_init_sweep_worker`, and the values its scenarios restore
+_sweep_system: Optional[HybridSimulation] = None
+_sweep_baseline: dict = {}
+
+
+def _init_sweep_worker(site, tech_config, dispatch_options, cost_info, simulation_options):
+    global _sweep_system, _sweep_baseline
+    _sweep_system = HybridSimulation(site, tech_config, dispatch_options, cost_info, simulation_options)
+    _sweep_baseline = {}
+
+
+def _run_sweep_scenario(scenario, project_life, lifetime_sim, outputs):
+    return _sweep_system._simulate_scenario(scenario, project_life, lifetime_sim, outputs, _sweep_baseline)
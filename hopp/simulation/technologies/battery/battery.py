@@ -1,7 +1,6 @@
 from dataclasses import dataclass, asdict
 from typing import Optional, Sequence, List, Union
 import numpy as np
-import pandas as pd
 
 from attrs import define, field
 import PySAM.BatteryStateful as BatteryModel
@@ -10,7 +9,8 @@ import PySAM.Singleowner as Singleowner
 from hopp.simulation.base import BaseClass
 from hopp.simulation.technologies.financial import FinancialModelType, CustomFinancialModel
 
-from hopp.simulation.technologies.power_source import PowerSource
+from hopp.simulation.technologies.power_source import PowerSource, read_only_array
+from hopp.simulation.technologies.capacity_credit import battery_max_feasible_kwh
 from hopp.simulation.technologies.sites.site_info import SiteInfo
 
 from hopp.utilities.log import hybrid_logger as logger
@@ -267,22 +267,28 @@ class Battery(PowerSource):
         else:
             raise ValueError("Stateful battery module 'control_mode' invalid value.")
 
+        # Resolve the PySAM groups once instead of looking up every variable at every time step
+        controls = self._system_model.Controls
+        control_variable = self.dispatch.control_variable
+        state_sources = self.stateful_output_sources()
+        # Only store information if passed the previous day simulations (used in clustering)
+        stored_values = {attr: np.zeros(n_periods) for attr in state_sources} if sim_start_time is not None else None
+
         time_step_duration = self.dispatch.time_duration
         for t in range(n_periods):
-            self.value('dt_hr', time_step_duration[t])
-            self.value(self.dispatch.control_variable, control[t])
-
-            # Only store information if passed the previous day simulations (used in clustering)
-            if sim_start_time is not None:
-                index_time_step = sim_start_time + t  # Store information
-            else:
-                index_time_step = None
+            controls.dt_hr = time_step_duration[t]
+            setattr(controls, control_variable, control[t])
+            self._system_model.execute(0)
 
-            self.simulate_power(time_step=index_time_step)
+            if stored_values is not None:
+                for attr, (group, var_name) in state_sources.items():
+                    stored_values[attr][t] = getattr(group, var_name)
 
-        # Store Dispatch model values
+        # Store Stateful battery and Dispatch model values
         if sim_start_time is not None:
             time_slice = slice(sim_start_time, sim_start_time + n_periods)
+            for attr, values in stored_values.items():
+                getattr(self.outputs, attr)[time_slice] = values.tolist()
             self.outputs.dispatch_SOC[time_slice] = self.dispatch.soc[0:n_periods]
             self.outputs.dispatch_P[time_slice] = self.dispatch.power[0:n_periods]
             self.outputs.dispatch_I[time_slice] = self.dispatch.current[0:n_periods]
@@ -308,6 +314,23 @@ class Battery(PowerSource):
         if time_step is not None:
             self.update_battery_stored_values(time_step)
 
+    def stateful_output_sources(self) -> dict:
+        """
+        Maps each stored stateful attribute to the Stateful battery group and variable it is read from.
+
+        Returns:
+            dict of attribute name to (PySAM group, variable name)
+        """
+        sources = {}
+        for attr in self.outputs.stateful_attributes:
+            if hasattr(self._system_model.StatePack, attr):
+                sources[attr] = (self._system_model.StatePack, attr)
+            elif hasattr(self._system_model.StateCell, attr):
+                sources[attr] = (self._system_model.StateCell, attr)
+            elif attr == 'gen':
+                sources[attr] = (self._system_model.StatePack, 'P')
+        return sources
+
     def update_battery_stored_values(self, time_step):
         """
         Stores Stateful battery.outputs at time step provided.
@@ -315,12 +338,8 @@ class Battery(PowerSource):
         Args:
             time_step: time step where outputs will be stored.
         """
-        for attr in self.outputs.stateful_attributes:
-            if hasattr(self._system_model.StatePack, attr) or hasattr(self._system_model.StateCell, attr):
-                getattr(self.outputs, attr)[time_step] = self.value(attr)
-            else:
-                if attr == 'gen':
-                    getattr(self.outputs, attr)[time_step] = self.value('P')
+        for attr, (group, var_name) in self.stateful_output_sources().items():
+            getattr(self.outputs, attr)[time_step] = getattr(group, var_name)
 
     def validate_replacement_inputs(self, project_life):
         """
@@ -384,13 +403,13 @@ class Battery(PowerSource):
             pass
 
         if len(self.outputs.gen) == self.site.n_timesteps:
-            single_year_gen = self.outputs.gen
-            self._financial_model.value('gen', list(single_year_gen) * project_life)
+            single_year_gen = read_only_array(self.outputs.gen)
+            self._financial_model.value('gen', np.tile(single_year_gen, project_life))
 
-            self._financial_model.value('system_pre_curtailment_kwac', list(single_year_gen) * project_life)
-            self._financial_model.value('annual_energy_pre_curtailment_ac', sum(single_year_gen))
-            self._financial_model.value('batt_annual_discharge_energy', [sum(i for i in single_year_gen if i > 0)] * project_life)
-            self._financial_model.value('batt_annual_charge_energy', [sum(i for i in single_year_gen if i < 0)] * project_life)
+            self._financial_model.value('system_pre_curtailment_kwac', np.tile(single_year_gen, project_life))
+            self._financial_model.value('annual_energy_pre_curtailment_ac', single_year_gen.sum())
+            self._financial_model.value('batt_annual_discharge_energy', [single_year_gen[single_year_gen > 0].sum()] * project_life)
+            self._financial_model.value('batt_annual_charge_energy', [single_year_gen[single_year_gen < 0].sum()] * project_life)
             # Do not calculate LCOS, so skip these inputs for now by unassigning or setting to 0
             self._financial_model.unassign("battery_total_cost_lcos")
             self._financial_model.value('batt_annual_charge_from_system', (0,))
@@ -404,7 +423,7 @@ class Battery(PowerSource):
         self._financial_model.execute(0)
         logger.info("{} simulation executed".format('battery'))
 
-    def calc_gen_max_feasible_kwh(self, interconnect_kw, use_avail_storage: bool = True) -> List[float]:
+    def calc_gen_max_feasible_kwh(self, interconnect_kw, use_avail_storage: bool = True) -> np.ndarray:
         """
         Calculates the maximum feasible capacity (generation profile) that could have occurred.
 
@@ -417,30 +436,17 @@ class Battery(PowerSource):
             Maximum feasible capacity [kWh]
         """
         t_step = self.site.interval / 60                                                # hr
-        df = pd.DataFrame()
-        df['E_delivered'] = [max(0, x * t_step) for x in self.outputs.P]                # [kWh]
-        df['SOC_perc'] = self.outputs.SOC                                               # [%]
-        df['E_stored'] = df.SOC_perc / 100 * self.system_capacity_kwh                   # [kWh]
-
-        def max_feasible_kwh(row):
-            return min(self.system_capacity_kw * t_step, row.E_delivered + row.E_stored)
-
-        if use_avail_storage:
-            E_max_feasible = df.apply(max_feasible_kwh, axis=1)                             # [kWh]
-        else:
-            E_max_feasible = df['E_delivered']
-
         W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
-        E_max_feasible = np.minimum(E_max_feasible, W_ac_nom*t_step) 
-        
-        return list(E_max_feasible)
+        E_max_feasible = battery_max_feasible_kwh(self.outputs.P, self.outputs.SOC, self.system_capacity_kw,
+                                                  self.system_capacity_kwh, W_ac_nom, t_step, use_avail_storage)
+        return E_max_feasible
 
     @property
-    def generation_profile(self) -> Sequence:
+    def generation_profile(self) -> np.ndarray:
         if self.system_capacity_kwh:
-            return self.outputs.gen
+            return read_only_array(self.outputs.gen)
         else:
-            return [0] * self.site.n_timesteps
+            return read_only_array(np.zeros(self.site.n_timesteps))
 
     @property
     def replacement_costs(self) -> Sequence:
@@ -2,10 +2,11 @@ from typing import Sequence, List, Optional, Union
 from dataclasses import dataclass, asdict
 
 from attrs import define, field
+import numpy as np
 
 from hopp.simulation.technologies.financial.custom_financial_model import CustomFinancialModel
 from hopp.simulation.technologies.sites import SiteInfo
-from hopp.simulation.technologies.power_source import PowerSource
+from hopp.simulation.technologies.power_source import PowerSource, read_only_array
 from hopp.utilities.log import hybrid_logger as logger
 from hopp.utilities.validators import gt_zero, range_val
 from hopp.simulation.base import BaseClass
@@ -191,13 +192,13 @@ class BatteryStateless(PowerSource):
         self.financial_model.value('analysis_period', project_life)
 
         if len(self.outputs.P) == self.site.n_timesteps:
-            single_year_gen = self.outputs.P
-            self.financial_model.value('gen', list(single_year_gen) * project_life)
+            single_year_gen = read_only_array(self.outputs.P)
+            self.financial_model.value('gen', np.tile(single_year_gen, project_life))
 
-            self.financial_model.value('system_pre_curtailment_kwac', list(single_year_gen) * project_life)
-            self.financial_model.value('annual_energy_pre_curtailment_ac', sum(single_year_gen))
-            self.financial_model.value('batt_annual_discharge_energy', [sum(i for i in single_year_gen if i > 0)] * project_life)
-            self.financial_model.value('batt_annual_charge_energy', [sum(i for i in single_year_gen if i < 0)] * project_life)
+            self.financial_model.value('system_pre_curtailment_kwac', np.tile(single_year_gen, project_life))
+            self.financial_model.value('annual_energy_pre_curtailment_ac', single_year_gen.sum())
+            self.financial_model.value('batt_annual_discharge_energy', [single_year_gen[single_year_gen > 0].sum()] * project_life)
+            self.financial_model.value('batt_annual_charge_energy', [single_year_gen[single_year_gen < 0].sum()] * project_life)
             self.financial_model.value('batt_annual_charge_from_system', (0,))
         else:
             raise RuntimeError
@@ -241,11 +242,11 @@ class BatteryStateless(PowerSource):
         return None
 
     @property
-    def generation_profile(self) -> Sequence:
+    def generation_profile(self) -> np.ndarray:
         if self.system_capacity_kwh:
-            return self.outputs.P
+            return read_only_array(self.outputs.P)
         else:
-            return [0] * self.site.n_timesteps
+            return read_only_array(np.zeros(self.site.n_timesteps))
 
     @property
     def annual_energy_kwh(self) -> float:
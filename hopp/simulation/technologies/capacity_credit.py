@@ -0,0 +1,154 @@
+"""
+Array kernels for the maximum feasible generation profiles and capacity credits of the power sources.
+
+Each kernel works on whole year profiles at once, so the calculations in ``simulate_financials`` do not step
+through the time steps in Python.
+"""
+import numpy as np
+
+# Tolerance of the CSP power block state thresholds
+SIGMA = 1e-6
+
+
+def generation_max_feasible_kwh(generation_kw, nominal_capacity_kw: float, t_step: float) -> np.ndarray:
+    """
+    Maximum feasible generation of a non-dispatchable source: its generation limited to its nominal capacity
+
+    :param generation_kw: generation profile [kW]
+    :param nominal_capacity_kw: nominal AC net capacity [kW]
+    :param t_step: time step [hr]
+
+    :return: maximum feasible generation [kWh]
+    """
+    return np.minimum(np.asarray(generation_kw, dtype=float), nominal_capacity_kw) * t_step
+
+
+def battery_max_feasible_kwh(power_kw,
+                             soc_percent,
+                             system_capacity_kw: float,
+                             system_capacity_kwh: float,
+                             nominal_capacity_kw: float,
+                             t_step: float,
+                             use_avail_storage: bool = True) -> np.ndarray:
+    """
+    Maximum feasible generation of a battery: its discharged energy plus, if `use_avail_storage`, its stored energy,
+    limited to its power and nominal capacities
+
+    :param power_kw: battery power profile, discharging positive [kW]
+    :param soc_percent: battery state-of-charge profile [%]
+    :param system_capacity_kw: battery power capacity [kW]
+    :param system_capacity_kwh: battery energy capacity [kWh]
+    :param nominal_capacity_kw: nominal AC net capacity [kW]
+    :param t_step: time step [hr]
+    :param use_avail_storage: include the stored energy (True), otherwise only the discharged energy (False)
+
+    :return: maximum feasible generation [kWh]
+    """
+    e_delivered = np.maximum(np.asarray(power_kw, dtype=float) * t_step, 0)                          # [kWh]
+    if use_avail_storage:
+        e_stored = np.asarray(soc_percent, dtype=float) / 100 * system_capacity_kwh                  # [kWh]
+        e_max_feasible = np.minimum(e_delivered + e_stored, system_capacity_kw * t_step)
+    else:
+        e_max_feasible = e_delivered
+    return np.minimum(e_max_feasible, nominal_capacity_kw * t_step)
+
+
+def csp_power_block_gross_max_feasible_kwh(q_pb_startup_kw,
+                                           e_pb_startup_kwh,
+                                           w_pb_gross_kw,
+                                           e_tes_kwh,
+                                           eta_pb,
+                                           q_pb_kw,
+                                           t_step: float,
+                                           startup_time: float,
+                                           cycle_capacity_kw: float,
+                                           cycle_max_frac: float,
+                                           cycle_nominal_efficiency: float,
+                                           startup_frac: float) -> np.ndarray:
+    """
+    Maximum feasible gross generation of a CSP power block if it had used more of its thermal energy storage (TES).
+
+    Each time step is in one of the simplified power block operating states:
+
+    ===========   ==========================================   ==========================================
+    State         Condition                                    Maximum feasible generation
+    ===========   ==========================================   ==========================================
+    [off]         (startup == 0 and gross output power == 0)   E_pb_possible|t_pb_on - E_startup
+    [starting]    (startup  > 0 and gross output power == 0)   0
+    [started]     (startup  > 0 and gross output power  > 0)   E_pb_possible|t_pb_on
+    [on]          (startup == 0 and gross output power  > 0)   E_pb_possible|t_step
+    ===========   ==========================================   ==========================================
+
+    Time steps in none of the states, i.e., with negative startup or output power, are NaN.
+
+    :param q_pb_startup_kw: power block startup thermal power [kWt]
+    :param e_pb_startup_kwh: power block startup thermal energy [kWht]
+    :param w_pb_gross_kw: power block gross output, averaged over the time step [kWe]
+    :param e_tes_kwh: TES charge state [kWht]
+    :param eta_pb: power block efficiency [-]
+    :param q_pb_kw: power block thermal input [kWt]
+    :param t_step: time step [hr]
+    :param startup_time: power block startup time [hr]
+    :param cycle_capacity_kw: power block nominal gross capacity [kWe]
+    :param cycle_max_frac: power block maximum output fraction of its nominal capacity [-]
+    :param cycle_nominal_efficiency: power block nominal efficiency [-]
+    :param startup_frac: power block startup thermal power fraction of its nominal thermal input [-]
+
+    :return: maximum feasible gross generation [kWhe]
+    """
+    q_startup = np.asarray(q_pb_startup_kw, dtype=float)
+    e_startup = np.asarray(e_pb_startup_kwh, dtype=float)
+    w_gross = np.asarray(w_pb_gross_kw, dtype=float)
+    e_tes = np.asarray(e_tes_kwh, dtype=float)
+    eta = np.asarray(eta_pb, dtype=float)
+    q_pb = np.asarray(q_pb_kw, dtype=float)
+
+    startup_off = np.abs(q_startup) < SIGMA
+    startup_on = q_startup > SIGMA
+    gross_off = np.abs(w_gross) < SIGMA
+    gross_on = w_gross > SIGMA
+    off = startup_off & gross_off
+    starting = startup_on & gross_off
+    started = startup_on & gross_on
+    on = startup_off & gross_on
+    generating = started | on
+
+    # 1. What's the maximum the power block could generate with unlimited resource, outside of startup time?
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Fraction of timestep used for startup = 1.0 - (timestep-averaged efficiency / instantaneous efficiency while on)
+        t_started = np.where(e_startup > SIGMA, t_step * (1.0 - eta / (w_gross / (q_pb - q_startup))), 0)
+    t_pb_startup = np.select([off, started], [startup_time, t_started], 0)                  # [hr]
+    w_pb_max = cycle_capacity_kw * cycle_max_frac                                           # [kWe]
+    e_pb_max = np.maximum(w_pb_max * (t_step - t_pb_startup), w_gross * t_step)             # [kWhe]
+
+    # 2. What did the power block actually generate?
+    e_pb_gross = np.where(generating, w_gross * t_step, 0)                                  # [kWhe]
+
+    # 3. What more could the power block generate if it used all the remaining TES (with no physical constraints)?
+    e_pb_startup = cycle_capacity_kw / cycle_nominal_efficiency * startup_frac * t_pb_startup    # [kWht]
+    de_pb_rest_of_tes = np.where(off,
+                                 np.maximum(0, e_tes - e_pb_startup) * cycle_nominal_efficiency,
+                                 e_tes * eta)                                               # [kWhe]
+
+    # 4. Thus, what could the power block have generated if it utilized more TES?
+    e_max_feasible = np.minimum(e_pb_max, e_pb_gross + de_pb_rest_of_tes)                   # [kWhe]
+    return np.select([starting, off | generating], [0.0, e_max_feasible], np.nan)
+
+
+def capacity_credit_percent(gen_max_feasible_kwh, capacity_hours, nominal_capacity_kw: float, t_step: float) -> float:
+    """
+    Capacity credit: mean fraction of the nominal capacity the maximum feasible generation reaches over the capacity
+    hours
+
+    :param gen_max_feasible_kwh: maximum feasible generation profile [kWh]
+    :param capacity_hours: whether each time step is a capacity hour
+    :param nominal_capacity_kw: nominal AC net capacity [kW]
+    :param t_step: time step [hr]
+
+    :return: capacity credit [%]
+    """
+    selected = np.asarray(gen_max_feasible_kwh, dtype=float)[np.equal(capacity_hours, True)]
+    if len(selected) == 0 or nominal_capacity_kw <= 0:
+        return 0
+    capacity_value = np.minimum(selected / (nominal_capacity_kw * t_step), 1.0).sum() / len(selected) * 100
+    return min(100, float(capacity_value))
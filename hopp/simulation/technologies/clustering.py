@@ -6,6 +6,8 @@ import numpy as np
 import pysolar
 import datetime
 
+from hopp.simulation.technologies.resource.solar_resource import read_solar_resource_file
+
 
 class Clustering:
 
@@ -140,15 +142,11 @@ class Clustering:
         weather = {k:[] for k in ['year', 'month', 'day', 'hour', 'ghi', 'dhi', 'dni', 'tdry', 'wspd']}
 
         # Get header info
-        header = np.genfromtxt(self.solar_resource_file, delimiter = ',', dtype = 'str', skip_header = 0, max_rows = 2)
-        i = np.where(header[0,:] == 'Latitude')[0][0]
-        weather['lat' ] = float(header[1,i])
-        i = np.where(header[0,:] == 'Longitude')[0][0]
-        weather['lon'] = float(header[1,i])
-        i = np.where(header[0,:] == 'Time Zone')[0][0]
-        weather['tz'] = float(header[1,i])
-        i = np.where(header[0,:] == 'Elevation')[0][0]
-        weather['elev'] = float(header[1,i]) 
+        table = read_solar_resource_file(self.solar_resource_file)
+        weather['lat'] = float(table.attrs['Latitude'])
+        weather['lon'] = float(table.attrs['Longitude'])
+        weather['tz'] = float(table.attrs['Time Zone'])
+        weather['elev'] = float(table.attrs['Elevation'])
 
         # Read in weather data
         labels = {'year': ['Year'],
@@ -161,15 +159,12 @@ class Clustering:
                 'tdry': ['Tdry', 'Temperature'],
                 'wspd': ['Wspd', 'Wind Speed']}
 
-        header = np.genfromtxt(self.solar_resource_file, dtype=str, delimiter=',', max_rows=1, skip_header=2)
-        data = np.genfromtxt(self.solar_resource_file, dtype=float, delimiter=',', skip_header=3)
         for k in labels.keys():
             found = False
             for j in labels[k]:
-                if j in header:
+                if j in table.columns:
                     found = True
-                    c = header.tolist().index(j)
-                    weather[k] = data[:, c]
+                    weather[k] = table[j].to_numpy(copy=True)
             if not found:
                 print('Failed to find data for ' + k + ' in weather file')
 
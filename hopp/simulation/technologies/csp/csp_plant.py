@@ -1,6 +1,6 @@
 import os
 import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Optional, Union
 
 import rapidjson                # NOTE: install 'python-rapidjson' NOT 'rapidjson'
 
@@ -10,9 +10,11 @@ import numpy as np
 import PySAM.Singleowner as Singleowner
 
 from hopp.simulation.technologies.csp.pySSC_daotk.ssc_wrap import PysamWrap, PysscWrap, ssc_wrap
+from hopp.simulation.technologies.resource.solar_resource import read_solar_resource_file
 from hopp.simulation.base import BaseClass
 from hopp.simulation.technologies.dispatch.power_sources.csp_dispatch import CspDispatch
-from hopp.simulation.technologies.power_source import PowerSource
+from hopp.simulation.technologies.power_source import PowerSource, read_only_array
+from hopp.simulation.technologies.capacity_credit import csp_power_block_gross_max_feasible_kwh
 from hopp.simulation.technologies.sites import SiteInfo
 from hopp.simulation.technologies.financial import FinancialModelType, CustomFinancialModel
 from hopp.utilities.validators import contains, gt_zero
@@ -196,25 +198,22 @@ class CspPlant(PowerSource):
         Returns:
             Weather file data (DataFrame)
         """
-        df = pd.read_csv(self.site.solar_resource.filename, sep=',', skiprows=2, header=0)
+        table = read_solar_resource_file(self.site.solar_resource.filename)
+        df = table.copy()
         date_cols = ['Year', 'Month', 'Day', 'Hour', 'Minute']
-        df.index = pd.to_datetime(df[date_cols])
+        df.index = pd.to_datetime(df[date_cols].astype(int))
         df.index.name = 'datetime'
         df.drop(date_cols, axis=1, inplace=True)
 
         df.index = df.index.map(lambda t: t.replace(year=df.index[0].year))  # normalize all years to that of 1/1
-        df = df[df.columns.drop(list(df.filter(regex='Unnamed')))]  # drop unnamed columns (which are empty)
-
-        def get_weatherfile_location(tmy3_path):
-            df_meta = pd.read_csv(tmy3_path, sep=',', header=0, nrows=1)
-            return {
-                'latitude': float(df_meta['Latitude'][0]),
-                'longitude': float(df_meta['Longitude'][0]),
-                'timezone': int(df_meta['Time Zone'][0]),
-                'elevation': float(df_meta['Elevation'][0])
-            }
 
-        location = get_weatherfile_location(self.site.solar_resource.filename)
+        df.attrs = {}
+        location = {
+            'latitude': float(table.attrs['Latitude']),
+            'longitude': float(table.attrs['Longitude']),
+            'timezone': int(float(table.attrs['Time Zone'])),
+            'elevation': float(table.attrs['Elevation'])
+        }
         df.attrs.update(location)
         return df
 
@@ -730,22 +729,23 @@ class CspPlant(PowerSource):
 
         if len(self.generation_profile) == self.site.n_timesteps:
             single_year_gen = self.generation_profile
-            self._financial_model.value('gen', list(single_year_gen) * project_life)
+            self._financial_model.value('gen', np.tile(single_year_gen, project_life))
 
-            self._financial_model.value('system_pre_curtailment_kwac', list(single_year_gen) * project_life)
-            self._financial_model.value('annual_energy_pre_curtailment_ac', sum(single_year_gen))
+            self._financial_model.value('system_pre_curtailment_kwac', np.tile(single_year_gen, project_life))
+            self._financial_model.value('annual_energy_pre_curtailment_ac', single_year_gen.sum())
 
         self._financial_model.execute(0)
         logger.info("{} simulation executed".format(str(type(self).__name__)))
 
-    def calc_gen_max_feasible_kwh(self, interconnect_kw, cap_cred_avail_storage: bool = True) -> List[float]:
+    def calc_gen_max_feasible_kwh(self, interconnect_kw, cap_cred_avail_storage: bool = True) -> np.ndarray:
         """
         Calculates the maximum feasible generation profile that could have occurred.
 
         Timesteps that include startup (or could include startup if off and counting the potential
         of any stored energy) are a complication because three operating modes could exist in the
         same timestep (off, startup, on). This makes determining how long the power block (pb) is on,
-        and thus its precise max generating potential, currently undetermined.
+        and thus its precise max generating potential, currently undetermined. The power block operating states are
+        described in ``csp_power_block_gross_max_feasible_kwh``.
 
         Args:
             interconnect_kw: Interconnection limit [kW]
@@ -755,125 +755,36 @@ class CspPlant(PowerSource):
         Returns:
             list of floats, maximum feasible generation [kWh]
         """
-        SIGMA = 1e-6
-
         # Verify power block startup does not span timesteps
         t_step = self.value("time_steps_per_hour")                            # [hr]
         if self.value("startup_time") > t_step:
             raise NotImplementedError("Capacity credit calculations have not been implemented \
                                       for power block startup times greater than one timestep.")
 
-        df = pd.DataFrame()
-        df['Q_pb_startup'] = [x * 1e3 for x in self.outputs.ssc_time_series["q_dot_pc_startup"]]    # [kWt]
-        df['E_pb_startup'] = [x * 1e3 for x in self.outputs.ssc_time_series["q_pc_startup"]]        # [kWht]
-        df['W_pb_gross'] = [x * 1e3 for x in self.outputs.ssc_time_series["P_cycle"]]               # [kWe] Always average over entire timestep
-        df['E_tes'] = [x * 1e3 for x in self.outputs.ssc_time_series["e_ch_tes"]]                   # [kWht]
-        df['eta_pb'] = self.outputs.ssc_time_series["eta"]                                          # [-]
-        df['W_pb_net'] = [x * 1e3 for x in self.outputs.ssc_time_series["P_out_net"]]  # kWe 
-        df['Q_pb'] = [x * 1e3 for x in self.outputs.ssc_time_series["q_pb"]]  # kWt 
-
-        def power_block_state(Q_pb_startup: float, W_pb_gross: float) -> Optional[str]:
-            """Simplified power block operating states.
-
-            ===========   ==========================================
-            State         Condition
-            ===========   ==========================================
-            [off]         (startup == 0 and gross output power == 0)
-            [starting]    (startup  > 0 and gross output power == 0)
-            [started]     (startup  > 0 and gross output power  > 0)
-            [on]          (startup == 0 and gross output power  > 0) -> on to off transition still applicable
-            ===========   ==========================================
-
-            Args:
-                Q_pb_startup
-                W_pb_gross
-
-            Returns:
-                'off'|'starting'|'started'|'on'
-            """
-            if abs(Q_pb_startup) < SIGMA and abs(W_pb_gross) < SIGMA:
-                return 'off'
-            elif Q_pb_startup > SIGMA and abs(W_pb_gross) < SIGMA:
-                return 'starting'
-            elif Q_pb_startup > SIGMA and W_pb_gross > SIGMA:
-                return 'started'
-            elif abs(Q_pb_startup) < SIGMA and W_pb_gross > SIGMA:
-                return 'on'
-            else:
-                return None
-
-        def max_feasible_kwh(row) -> Optional[float]:
-            """
-            [off]      = E_pb_possible|t_pb_on - E_startup
-            [starting] = 0
-            [started]  = E_pb_possible|t_pb_on
-            [on]       = E_pb_possible|t_step
-
-            Args:
-                row: Pandas Series of a row from main dataframe
-
-            Returns:
-                Maximum feasible energy from power block [kWhe]
-            """
-            state = power_block_state(row.Q_pb_startup, row.W_pb_gross)
-
-            if state == 'starting':
-                return 0    # [kWhe]
-
-            # 1. What's the maximum the power block could generate with unlimited resource, outside of startup time?
-            if state == 'off':
-                t_pb_startup = self.value("startup_time")                 # [hr]
-            elif state == 'started':
-                #t_pb_startup = row.E_pb_startup / row.Q_pb_startup \
-                #                if row.E_pb_startup > SIGMA and \
-                #                row.Q_pb_startup > SIGMA \
-                #                else 0  #TODO: reported q_dot_pc_startup is timestep average so t_pb_startup = t_step from this calculation
-
-                t_pb_startup  = t_step * (1.0 - row.eta_pb / (row.W_pb_gross / (row.Q_pb - row.Q_pb_startup)))  \
-                                if row.E_pb_startup > SIGMA and row.Q_pb_startup > SIGMA \
-                                else 0    # Fraction of timestep used for startup = 1.0 - (timestep-averaged efficiency / instantaneous efficiency while on)             
-
-            elif state == 'on':
-                t_pb_startup = 0
-            else:
-                return None
-            W_pb_nom = self.cycle_capacity_kw                                           # [kWe]
-            f_pb_max = self.value("cycle_max_frac")                       # [-]
-            W_pb_max = W_pb_nom * f_pb_max                                              # [kWe]
-            E_pb_max = max(W_pb_max * (t_step - t_pb_startup), row.W_pb_gross * t_step)  # [kWhe]  
-
-            # 2. What did the power block actually generate?
-            if state == 'off':
-                E_pb_gross = 0                                                          # [kWhe]
-            elif state == 'started' or state == 'on':
-                E_pb_gross = row.W_pb_gross * t_step                                    # [kWhe] W_pb_gross avg over entire timestep
-            else:
-                return None
-
-            # 3. What more could the power block generate if it used all the remaining TES (with no physical constraints)?
-            if state == 'off':
-                eta_pb_nom = self.cycle_nominal_efficiency                     # [-]
-                f_pb_startup_of_nominal = self.value("startup_frac")      # [-]
-                E_pb_startup = W_pb_nom / eta_pb_nom * f_pb_startup_of_nominal * t_pb_startup  # [kWht]
-                dE_pb_rest_of_tes = max(0, row.E_tes - E_pb_startup) * eta_pb_nom              # [kWht]
-            elif state == 'started' or state == 'on':
-                dE_pb_rest_of_tes = row.E_tes * row.eta_pb                              # [kWhe]
-            else:
-                return None
-
-            # 4. Thus, what could the power block have generated if it utilized more TES?
-            E_pb_gross_max_feasible = min(E_pb_max, E_pb_gross + dE_pb_rest_of_tes)     # [kWhe]
-            return E_pb_gross_max_feasible
-
+        ssc_time_series = self.outputs.ssc_time_series
+        W_pb_net = np.asarray(ssc_time_series["P_out_net"], dtype=float) * 1e3                    # [kWe]
         if cap_cred_avail_storage:
-            E_pb_max_feasible = np.maximum(df['W_pb_net']*t_step, df.apply(max_feasible_kwh, axis=1)*self.value('gross_net_conversion_factor')) # [kWhe]
+            E_pb_gross_max_feasible = csp_power_block_gross_max_feasible_kwh(
+                q_pb_startup_kw=np.asarray(ssc_time_series["q_dot_pc_startup"], dtype=float) * 1e3,  # [kWt]
+                e_pb_startup_kwh=np.asarray(ssc_time_series["q_pc_startup"], dtype=float) * 1e3,     # [kWht]
+                w_pb_gross_kw=np.asarray(ssc_time_series["P_cycle"], dtype=float) * 1e3,             # [kWe] Always average over entire timestep
+                e_tes_kwh=np.asarray(ssc_time_series["e_ch_tes"], dtype=float) * 1e3,                # [kWht]
+                eta_pb=ssc_time_series["eta"],                                                       # [-]
+                q_pb_kw=np.asarray(ssc_time_series["q_pb"], dtype=float) * 1e3,                      # [kWt]
+                t_step=t_step,
+                startup_time=self.value("startup_time"),
+                cycle_capacity_kw=self.cycle_capacity_kw,
+                cycle_max_frac=self.value("cycle_max_frac"),
+                cycle_nominal_efficiency=self.cycle_nominal_efficiency,
+                startup_frac=self.value("startup_frac"))
+            E_pb_max_feasible = np.maximum(W_pb_net*t_step, E_pb_gross_max_feasible*self.value('gross_net_conversion_factor'))  # [kWhe]
         else:
-            E_pb_max_feasible = df['W_pb_net']*t_step 
+            E_pb_max_feasible = W_pb_net*t_step
 
         W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
         E_pb_max_feasible = np.minimum(E_pb_max_feasible, W_ac_nom*t_step)  # Limit to nominal capacity here, to avoid discrepancies between single-technology and hybrid capacity credits
 
-        return list(E_pb_max_feasible)
+        return E_pb_max_feasible
 
     def value(self, var_name, var_value=None):
         """
@@ -1035,16 +946,16 @@ class CspPlant(PowerSource):
     @property
     def annual_energy_kwh(self) -> float:
         if self.system_capacity_kw > 0:
-            return sum(list(self.outputs.ssc_time_series['gen']))
+            return self.generation_profile.sum()
         else:
             return 0
 
     @property
-    def generation_profile(self) -> list:
+    def generation_profile(self) -> np.ndarray:
         if self.system_capacity_kw:
-            return list(self.outputs.ssc_time_series['gen'])
+            return read_only_array(self.outputs.ssc_time_series['gen'])
         else:
-            return [0] * self.site.n_timesteps
+            return read_only_array(np.zeros(self.site.n_timesteps))
 
     @property
     def capacity_factor(self) -> float:
@@ -1,3 +1,4 @@
+import numpy as np
 import pyomo.environ as pyomo
 from pyomo.environ import units as u
 
@@ -21,6 +22,9 @@ class Dispatch:
         self.round_digits = int(4)
 
         self._model = pyomo_model
+        self._block_params = {}
+        self._stored_block_params = set()
+        self._period_lengths = None
         self._blocks = pyomo.Block(index_set, rule=self.dispatch_block_rule)
         setattr(self.model, self.block_set_name, self.blocks)
 
@@ -48,6 +52,67 @@ class Dispatch:
                 raise ValueError("Efficiency value must between 0 and 1 or 0 and 100")
         return efficiency
 
+    def block_params(self, name: str) -> list:
+        """Parameter `name` of each time period's block, in time order"""
+        if name not in self._block_params:
+            self._block_params[name] = [getattr(self.blocks[t], name) for t in self.blocks.index_set()]
+        return self._block_params[name]
+
+    def set_block_params(self, name: str, values):
+        """
+        Sets parameter `name` of every time period's block in one call, rounded to `round_digits`
+
+        Values are rounded as an array and set through Pyomo, which validates them against the parameter's domain. After
+        the first call for a parameter, only the periods whose value changed are set.
+
+        :param name: name of the block parameter
+        :param values: single value for all time periods or one value per time period
+        """
+        params = self.block_params(name)
+        values = np.round(np.broadcast_to(np.asarray(values, dtype=float), (len(params),)), self.round_digits)
+        if name not in self._stored_block_params:
+            for param, value in zip(params, values.tolist()):
+                param.set_value(value)
+            self._stored_block_params.add(name)
+        else:
+            for param, value in zip(params, values.tolist()):
+                if param.value != value:
+                    param.set_value(value)
+
+    @property
+    def period_lengths(self) -> np.ndarray:
+        """
+        Number of simulation time steps in each period of the dispatch horizon, from the `period_length` parameter of
+        the model if it has one, otherwise one time step per period
+        """
+        if self._period_lengths is None:
+            period_length = self.model.component('period_length')
+            if period_length is None:
+                self._period_lengths = np.ones(len(self.blocks), dtype=int)
+            else:
+                self._period_lengths = np.array([period_length[t] for t in self.blocks.index_set()], dtype=int)
+        return self._period_lengths
+
+    @property
+    def period_start_steps(self) -> np.ndarray:
+        """Time step of the dispatch horizon each period starts at"""
+        return np.cumsum(self.period_lengths) - self.period_lengths
+
+    def horizon_values(self, series, start_time: int) -> np.ndarray:
+        """
+        Values of a time series over the dispatch horizon, averaged over the time steps of each period
+
+        :param series: time series with a value per simulation time step
+        :param start_time: time step the horizon starts at. Horizons past the end of the series continue from its start
+        :return: value of each period of the dispatch horizon
+        """
+        lengths = self.period_lengths
+        series = np.asarray(series, dtype=float)
+        values = series[np.arange(start_time, start_time + lengths.sum()) % len(series)]
+        if lengths.max() == 1:
+            return values
+        return np.add.reduceat(values, self.period_start_steps) / lengths
+
     @property
     def blocks(self) -> pyomo.Block:
         return self._blocks
@@ -1,142 +1,257 @@
+import json
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
 from pyomo.opt import TerminationCondition
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Key of the `DispatchProblemState.summary` in the metadata of exported Parquet files
+PARQUET_SUMMARY_KEY = b'hopp_dispatch_summary'
+
+# Metrics stored for each dispatch solve and their array data types
+PROBLEM_METRICS = {
+    'start_time': int,
+    'n_days': int,
+    'termination_condition': object,
+    'solve_time': float,
+    'wall_time': float,
+    'update_time': float,
+    'objective': float,
+    'upper_bound': float,
+    'lower_bound': float,
+    'constraints': float,
+    'variables': float,
+    'non_zeros': float,
+    'gap': float,
+    'cache_hit': bool,
+}
+
+
+def _metric_value(value) -> float:
+    """Value of a solver results field, NaN if the solver does not report it"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
 
 class DispatchProblemState:
-    """Class for tracking dispatch problem solve state and metrics"""
-
-    def __init__(self):
-        self._start_time = ()
-        self._n_days = ()
-        self._termination_condition = ()
-        self._solve_time = ()
-        self._objective = ()
-        self._upper_bound = ()
-        self._lower_bound = ()
-        self._constraints = ()
-        self._variables = ()
-        self._non_zeros = ()
-        self._gap = ()
+    """
+    Class for tracking dispatch problem solve state and metrics
+
+    Metrics are stored in preallocated arrays, one element per dispatch solve, which double in size when full. Metric
+    properties return read-only views of the stored solves.
+    """
+
+    def __init__(self, n_solves: int = 365):
+        """
+        :param n_solves: number of solves to allocate storage for
+        """
+        self._n_solves = 0
+        self._metrics = {name: np.empty(max(n_solves, 1), dtype=dtype) for name, dtype in PROBLEM_METRICS.items()}
         self._n_non_optimal_solves = 0
+        self.build_time = 0.0
+
+    def _reserve(self, n_solves: int):
+        """Grows the metric arrays to hold at least `n_solves` solves"""
+        capacity = len(self._metrics['start_time'])
+        if n_solves <= capacity:
+            return
+        capacity = max(n_solves, 2 * capacity)
+        for name, data in self._metrics.items():
+            grown = np.empty(capacity, dtype=data.dtype)
+            grown[:self._n_solves] = data[:self._n_solves]
+            self._metrics[name] = grown
 
-    def store_problem_metrics(self, solver_results, start_time, n_days, objective_value):
-        self.start_time = start_time
-        self.n_days = n_days
-        self.termination_condition = str(solver_results.solver.termination_condition)
+    def store_problem_metrics(self,
+                              solver_results,
+                              start_time: int,
+                              n_days: int,
+                              objective_value: float,
+                              wall_time: float = np.nan,
+                              update_time: float = np.nan,
+                              cache_hit: bool = False):
+        """
+        Stores the metrics of a dispatch solve
+
+        :param solver_results: Pyomo solver results
+        :param start_time: start time period of the dispatch solve
+        :param n_days: number of days simulated by the dispatch solve
+        :param objective_value: dispatch objective value
+        :param wall_time: wall-clock time of the solve call [s], including writing the model to the solver
+        :param update_time: time spent updating the dispatch parameters for the solve [s]
+        :param cache_hit: whether the solution was reused from a dispatch solution cache
+        """
+        upper_bound = _metric_value(solver_results.problem.upper_bound)
+        lower_bound = _metric_value(solver_results.problem.lower_bound)
         try:
-            self.solve_time = solver_results.solver.time
+            solve_time = solver_results.solver.time
         except AttributeError:
-            self.solve_time = solver_results.solver.wallclock_time
-        self.objective = objective_value
-        self.upper_bound = solver_results.problem.upper_bound
-        self.lower_bound = solver_results.problem.lower_bound
-        self.constraints = solver_results.problem.number_of_constraints
-        self.variables = solver_results.problem.number_of_variables
-        self.non_zeros = solver_results.problem.number_of_nonzeros
+            solve_time = solver_results.solver.wallclock_time
 
         # solver_results.solution.Gap not define
-        if solver_results.problem.upper_bound != 0.0:
-            self.gap = (abs(solver_results.problem.upper_bound - solver_results.problem.lower_bound)
-                        / abs(solver_results.problem.upper_bound))
-        elif solver_results.problem.lower_bound == 0.0:
-            self.gap = 0.0
+        if np.isnan(upper_bound) or np.isnan(lower_bound):
+            gap = np.nan
+        elif upper_bound != 0.0:
+            gap = abs(upper_bound - lower_bound) / abs(upper_bound)
+        elif lower_bound == 0.0:
+            gap = 0.0
         else:
-            self.gap = float('inf')
+            gap = float('inf')
+
+        self._reserve(self._n_solves + 1)
+        i = self._n_solves
+        metrics = self._metrics
+        metrics['start_time'][i] = start_time
+        metrics['n_days'][i] = n_days
+        metrics['termination_condition'][i] = str(solver_results.solver.termination_condition)
+        metrics['solve_time'][i] = _metric_value(solve_time)
+        metrics['wall_time'][i] = wall_time
+        metrics['update_time'][i] = update_time
+        metrics['objective'][i] = _metric_value(objective_value)
+        metrics['upper_bound'][i] = upper_bound
+        metrics['lower_bound'][i] = lower_bound
+        metrics['constraints'][i] = _metric_value(solver_results.problem.number_of_constraints)
+        metrics['variables'][i] = _metric_value(solver_results.problem.number_of_variables)
+        metrics['non_zeros'][i] = _metric_value(solver_results.problem.number_of_nonzeros)
+        metrics['gap'][i] = gap
+        metrics['cache_hit'][i] = cache_hit
+        self._n_solves += 1
 
         if not solver_results.solver.termination_condition == TerminationCondition.optimal:
             self._n_non_optimal_solves += 1
 
-    def _update_metric(self, metric_name, value):
-        data = list(getattr(self, metric_name))
-        data.append(value)
-        setattr(self, '_' + metric_name, tuple(data))
+    def extend(self, other: "DispatchProblemState"):
+        """Appends the problem metrics stored in another problem state, i.e., from a separately solved segment"""
+        n_solves = self._n_solves + other.n_solves
+        self._reserve(n_solves)
+        for name, data in self._metrics.items():
+            data[self._n_solves:n_solves] = other._metrics[name][:other.n_solves]
+        self._n_solves = n_solves
+        self._n_non_optimal_solves += other.n_non_optimal_solves
 
-    @property
-    def start_time(self) -> tuple:
-        return self._start_time
+    def _metric(self, metric_name) -> np.ndarray:
+        view = self._metrics[metric_name][:self._n_solves]
+        view.flags.writeable = False
+        return view
 
-    @start_time.setter
-    def start_time(self, start_hour: int):
-        self._update_metric('start_time', start_hour)
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        :return: Dataframe of the metrics of each dispatch solve, with the `summary` in its ``attrs``
+        """
+        df = pd.DataFrame({name: self._metrics[name][:self._n_solves] for name in PROBLEM_METRICS})
+        df['termination_condition'] = df['termination_condition'].astype(str)
+        df.attrs.update(self.summary())
+        return df
 
-    @property
-    def n_days(self) -> tuple:
-        return self._n_days
+    def summary(self) -> dict:
+        """
+        :return: dispatch performance summary of the simulation: number of solves, non-optimal solves and solution
+            cache hits, model build time, total and maximum solve, wall-clock and parameter update times [s], and mean
+            and maximum gap
+        """
+        def stat(func, name):
+            values = self._metrics[name][:self._n_solves]
+            return float(func(values)) if len(values) and not np.isnan(values).all() else np.nan
 
-    @n_days.setter
-    def n_days(self, solve_days: int):
-        self._update_metric('n_days', solve_days)
+        return {
+            'n_solves': self._n_solves,
+            'n_non_optimal_solves': self._n_non_optimal_solves,
+            'n_cache_hits': int(self._metrics['cache_hit'][:self._n_solves].sum()),
+            'build_time': self.build_time,
+            'total_solve_time': stat(np.nansum, 'solve_time'),
+            'max_solve_time': stat(np.nanmax, 'solve_time'),
+            'total_wall_time': stat(np.nansum, 'wall_time'),
+            'max_wall_time': stat(np.nanmax, 'wall_time'),
+            'total_update_time': stat(np.nansum, 'update_time'),
+            'mean_gap': stat(np.nanmean, 'gap'),
+            'max_gap': stat(np.nanmax, 'gap'),
+        }
 
-    @property
-    def termination_condition(self) -> tuple:
-        return self._termination_condition
+    def export(self, filename: Union[str, Path]):
+        """
+        Writes the metrics of each dispatch solve to a Parquet file, if `filename` ends with '.parquet', or a csv file.
+        Parquet files, which require pyarrow, also store the `summary` as JSON in their schema metadata under
+        `PARQUET_SUMMARY_KEY`.
 
-    @termination_condition.setter
-    def termination_condition(self, condition: str):
-        self._update_metric('termination_condition', condition)
+        :param filename: output file path
+        """
+        df = self.to_dataframe()
+        if Path(filename).suffix == '.parquet':
+            if pyarrow is None:
+                raise ImportError("Exporting dispatch problem metrics to Parquet requires pyarrow")
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            metadata = {**(table.schema.metadata or {}), PARQUET_SUMMARY_KEY: json.dumps(self.summary()).encode()}
+            pyarrow.parquet.write_table(table.replace_schema_metadata(metadata), filename)
+        else:
+            df.to_csv(filename, index=False)
 
     @property
-    def solve_time(self) -> tuple:
-        return self._solve_time
-
-    @solve_time.setter
-    def solve_time(self, time: float):
-        self._update_metric('solve_time', time)
+    def n_solves(self) -> int:
+        return self._n_solves
 
     @property
-    def objective(self) -> tuple:
-        return self._objective
+    def start_time(self) -> np.ndarray:
+        return self._metric('start_time')
 
-    @objective.setter
-    def objective(self, objective_value: float):
-        self._update_metric('objective', objective_value)
+    @property
+    def n_days(self) -> np.ndarray:
+        return self._metric('n_days')
 
     @property
-    def upper_bound(self) -> tuple:
-        return self._upper_bound
+    def termination_condition(self) -> np.ndarray:
+        return self._metric('termination_condition')
 
-    @upper_bound.setter
-    def upper_bound(self, bound: float):
-        self._update_metric('upper_bound', bound)
+    @property
+    def solve_time(self) -> np.ndarray:
+        return self._metric('solve_time')
 
     @property
-    def lower_bound(self) -> tuple:
-        return self._lower_bound
+    def wall_time(self) -> np.ndarray:
+        return self._metric('wall_time')
 
-    @lower_bound.setter
-    def lower_bound(self, bound: float):
-        self._update_metric('lower_bound', bound)
+    @property
+    def update_time(self) -> np.ndarray:
+        return self._metric('update_time')
 
     @property
-    def constraints(self) -> tuple:
-        return self._constraints
+    def objective(self) -> np.ndarray:
+        return self._metric('objective')
 
-    @constraints.setter
-    def constraints(self, constraint_count: int):
-        self._update_metric('constraints', constraint_count)
+    @property
+    def upper_bound(self) -> np.ndarray:
+        return self._metric('upper_bound')
 
     @property
-    def variables(self) -> tuple:
-        return self._variables
+    def lower_bound(self) -> np.ndarray:
+        return self._metric('lower_bound')
 
-    @variables.setter
-    def variables(self, variable_count: int):
-        self._update_metric('variables', variable_count)
+    @property
+    def constraints(self) -> np.ndarray:
+        return self._metric('constraints')
 
     @property
-    def non_zeros(self) -> tuple:
-        return self._non_zeros
+    def variables(self) -> np.ndarray:
+        return self._metric('variables')
 
-    @non_zeros.setter
-    def non_zeros(self, non_zeros_count: int):
-        self._update_metric('non_zeros', non_zeros_count)
+    @property
+    def non_zeros(self) -> np.ndarray:
+        return self._metric('non_zeros')
 
     @property
-    def gap(self) -> tuple:
-        return self._gap
+    def gap(self) -> np.ndarray:
+        return self._metric('gap')
 
-    @gap.setter
-    def gap(self, mip_gap: int):
-        self._update_metric('gap', mip_gap)
+    @property
+    def cache_hit(self) -> np.ndarray:
+        return self._metric('cache_hit')
 
     @property
     def n_non_optimal_solves(self) -> int:
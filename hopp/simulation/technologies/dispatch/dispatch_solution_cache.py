@@ -0,0 +1,181 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+from zipfile import BadZipFile
+
+import numpy as np
+import pyomo.environ as pyomo
+from pyomo.opt import SolverResults, TerminationCondition
+
+from hopp.utilities.log import hybrid_logger as logger
+
+# Solver results fields stored with each cached solution
+CACHED_RESULTS = ('upper_bound', 'lower_bound', 'number_of_constraints', 'number_of_variables', 'number_of_nonzeros')
+
+
+class DispatchSolutionCache:
+    """
+    Least-recently-used cache of optimal dispatch solutions, keyed by a hash of the dispatch model's structure and
+    parameter values, optionally backed by a directory of solution files.
+
+    Simulations with the same dispatch model structure and identical horizon inputs, e.g. candidates of a sizing
+    sweep on days where they share prices, generation, initial state of charge and limits, reuse the stored solution
+    instead of calling the solver.
+    """
+    def __init__(self,
+                 maxsize: int = 1024,
+                 cache_dir: Union[str, Path, None] = None):
+        """
+        :param maxsize: maximum number of solutions kept in memory
+        :param cache_dir: directory where solutions are also stored, so they are shared between processes and runs.
+            If None, solutions are only kept in memory
+        """
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._solutions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / "{}.npz".format(key)
+
+    def get(self, key: str) -> Optional[tuple]:
+        """
+        :return: (variable values, solver results fields) stored for `key`, or None. Unreadable solution files are
+            treated as missing
+        """
+        if key in self._solutions:
+            self._solutions.move_to_end(key)
+            self.hits += 1
+            return self._solutions[key]
+        if self.cache_dir is not None and self._path(key).is_file():
+            try:
+                with np.load(self._path(key), allow_pickle=False) as data:
+                    solution = data['values'], dict(zip(CACHED_RESULTS, data['results']))
+            except (BadZipFile, ValueError, EOFError, OSError, KeyError) as e:
+                logger.warning("DispatchSolutionCache: ignoring unreadable {}: {}".format(self._path(key), e))
+            else:
+                self._add(key, solution)
+                self.hits += 1
+                return solution
+        self.misses += 1
+        return None
+
+    def put(self, key: str, values: np.ndarray, results: dict):
+        """
+        Stores the variable values and solver results fields of an optimal solution. Solution files are written to a
+        temporary file that then replaces the solution file, so other processes never read a partly written solution.
+        """
+        solution = (np.asarray(values, dtype=float), results)
+        self._add(key, solution)
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_file = tempfile.mkstemp(suffix=".npz", dir=self.cache_dir)
+        except OSError as e:
+            logger.warning("DispatchSolutionCache: could not save {}: {}".format(self._path(key), e))
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, values=solution[0],
+                         results=np.array([results[name] for name in CACHED_RESULTS], dtype=float))
+            os.replace(temp_file, self._path(key))
+        except OSError as e:
+            logger.warning("DispatchSolutionCache: could not save {}: {}".format(self._path(key), e))
+        finally:
+            if os.path.isfile(temp_file):
+                os.remove(temp_file)
+
+    def _add(self, key: str, solution: tuple):
+        self._solutions[key] = solution
+        self._solutions.move_to_end(key)
+        while len(self._solutions) > self.maxsize:
+            self._solutions.popitem(last=False)
+
+    def clear(self):
+        """Clears the solutions kept in memory"""
+        self._solutions.clear()
+
+    def __len__(self):
+        return len(self._solutions)
+
+
+class DispatchSolutionVectors:
+    """
+    Parameter and variable vectors of a dispatch model, used to key and store its solutions in a
+    `DispatchSolutionCache`
+    """
+    def __init__(self, pyomo_model: pyomo.ConcreteModel, round_digits: int):
+        """
+        :param pyomo_model: dispatch model
+        :param round_digits: digits parameter values are rounded to in the key
+        """
+        self.round_digits = round_digits
+        self.params = [p for param in pyomo_model.component_objects(pyomo.Param) if param.mutable
+                       for p in param.values()]
+        self.variables = list(pyomo_model.component_data_objects(pyomo.Var))
+        signature = "\n".join([p.name for p in self.params] + [v.name for v in self.variables] +
+                              [c.name for c in pyomo_model.component_data_objects(pyomo.Constraint, active=True)] +
+                              [o.name for o in pyomo_model.component_data_objects(pyomo.Objective, active=True)])
+        self._signature = hashlib.sha1(signature.encode()).digest()
+
+    def key(self) -> str:
+        """
+        :return: hash of the model structure, parameter values and fixed variable values
+        """
+        values = [p.value for p in self.params]
+        values.extend(v.value if v.fixed else np.nan for v in self.variables)
+        values = np.round(np.array(values, dtype=float), self.round_digits)
+        values[values == 0] = 0     # -0.0 and 0.0 hash alike
+        return hashlib.sha1(self._signature + values.tobytes()).hexdigest()
+
+    def values(self) -> np.ndarray:
+        return np.array([v.value for v in self.variables], dtype=float)
+
+    def load(self, values: np.ndarray, results: dict) -> SolverResults:
+        """
+        Sets the model's free variables to a cached solution
+
+        :return: solver results of the cached solution
+        """
+        for var, value in zip(self.variables, values.tolist()):
+            if not var.fixed:
+                var.set_value(None if np.isnan(value) else value, skip_validation=True)
+        solver_results = SolverResults()
+        solver_results.solver.termination_condition = TerminationCondition.optimal
+        solver_results.solver.wallclock_time = 0.0
+        for name in CACHED_RESULTS:
+            setattr(solver_results.problem, name, results[name])
+        return solver_results
+
+    @staticmethod
+    def results_fields(solver_results) -> dict:
+        """
+        :return: solver results fields stored with a cached solution, NaN where the solver does not report them
+        """
+        fields = {}
+        for name in CACHED_RESULTS:
+            try:
+                fields[name] = float(getattr(solver_results.problem, name))
+            except (TypeError, ValueError):
+                fields[name] = np.nan
+        return fields
+
+
+# Caches shared by the dispatch builders of a process, by maximum size and directory
+_shared_caches = {}
+
+
+def shared_solution_cache(maxsize: int, cache_dir: Union[str, Path, None] = None) -> DispatchSolutionCache:
+    """
+    :return: the process's solution cache with the given size and directory, so that simulations with the same
+        dispatch options share solutions
+    """
+    key = (maxsize, str(Path(cache_dir).resolve()) if cache_dir else None)
+    if key not in _shared_caches:
+        _shared_caches[key] = DispatchSolutionCache(maxsize, cache_dir)
+    return _shared_caches[key]
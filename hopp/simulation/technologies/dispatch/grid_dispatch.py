@@ -138,19 +138,15 @@ class GridDispatch(Dispatch):
         grid_limit_kw = self._system_model.value('grid_interconnection_limit_kwac')
         self.generation_transmission_limit = [grid_limit_kw / 1e3] * len(self.blocks.index_set())
         self.load_transmission_limit = [grid_limit_kw / 1e3] * len(self.blocks.index_set())
+        self.set_block_params('time_duration', self.period_lengths)
 
     def update_time_series_parameters(self, start_time: int):
-        n_horizon = len(self.blocks.index_set())
         dispatch_factors = self._financial_model.value("dispatch_factors_ts")
         ppa_price = self._financial_model.value("ppa_price_input")[0]
-        if start_time + n_horizon > len(dispatch_factors):
-            prices = list(dispatch_factors[start_time:])
-            prices.extend(list(dispatch_factors[0:n_horizon - len(prices)]))
-        else:
-            prices = dispatch_factors[start_time:start_time + n_horizon]
+        prices = self.horizon_values(dispatch_factors, start_time)
         # NOTE: Assuming the same prices
-        self.electricity_sell_price = [norm_price * ppa_price * 1e3 for norm_price in prices]
-        self.electricity_purchase_price = [norm_price * ppa_price * 1e3 for norm_price in prices]
+        self.electricity_sell_price = prices * ppa_price * 1e3
+        self.electricity_purchase_price = prices * ppa_price * 1e3
 
     @property
     def electricity_sell_price(self) -> list:
@@ -159,8 +155,7 @@ class GridDispatch(Dispatch):
     @electricity_sell_price.setter
     def electricity_sell_price(self, price_per_mwh: list):
         if len(price_per_mwh) == len(self.blocks):
-            for t, price in zip(self.blocks, price_per_mwh):
-                self.blocks[t].electricity_sell_price.set_value(round(price, self.round_digits))
+            self.set_block_params('electricity_sell_price', price_per_mwh)
         else:
             raise ValueError("'price_per_mwh' list must be the same length as time horizon")
 
@@ -171,8 +166,7 @@ class GridDispatch(Dispatch):
     @electricity_purchase_price.setter
     def electricity_purchase_price(self, price_per_mwh: list):
         if len(price_per_mwh) == len(self.blocks):
-            for t, price in zip(self.blocks, price_per_mwh):
-                self.blocks[t].electricity_purchase_price.set_value(round(price, self.round_digits))
+            self.set_block_params('electricity_purchase_price', price_per_mwh)
         else:
             raise ValueError("'price_per_mwh' list must be the same length as time horizon")
 
@@ -183,8 +177,7 @@ class GridDispatch(Dispatch):
     @generation_transmission_limit.setter
     def generation_transmission_limit(self, limit_mw: list):
         if len(limit_mw) == len(self.blocks):
-            for t, limit in zip(self.blocks, limit_mw):
-                self.blocks[t].generation_transmission_limit.set_value(round(limit, self.round_digits))
+            self.set_block_params('generation_transmission_limit', limit_mw)
         else:
             raise ValueError("'limit_mw' list must be the same length as time horizon")
 
@@ -195,8 +188,7 @@ class GridDispatch(Dispatch):
     @load_transmission_limit.setter
     def load_transmission_limit(self, limit_mw: list):
         if len(limit_mw) == len(self.blocks):
-            for t, limit in zip(self.blocks, limit_mw):
-                self.blocks[t].load_transmission_limit.set_value(round(limit, self.round_digits))
+            self.set_block_params('load_transmission_limit', limit_mw)
         else:
             raise ValueError("'limit_mw' list must be the same length as time horizon")
 
@@ -382,8 +382,7 @@ class HybridDispatch(Dispatch):
 
     @time_weighting_factor.setter
     def time_weighting_factor(self, weighting: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].time_weighting_factor = round(weighting ** t, self.round_digits)
+        self.set_block_params('time_weighting_factor', weighting ** self.period_start_steps)
 
     @property
     def time_weighting_factor_list(self) -> list:
@@ -1,13 +1,19 @@
 import sys, os
 from pathlib import Path
 import time
+import multiprocessing
 
+import numpy as np
+import pandas as pd
 import pyomo.environ as pyomo
 from pyomo.opt import TerminationCondition
 from pyomo.util.check_units import assert_units_consistent
 
 from hopp.simulation.technologies.sites.site_info import SiteInfo
 from hopp.simulation.technologies.dispatch import HybridDispatch, HybridDispatchOptions, DispatchProblemState
+from hopp.simulation.technologies.dispatch.matrix_dispatch import MatrixDispatchLP
+from hopp.simulation.technologies.dispatch.dispatch_solution_cache import DispatchSolutionVectors, \
+    shared_solution_cache
 from hopp.simulation.technologies.clustering import Clustering
 from hopp.utilities.log import hybrid_logger as logger
 
@@ -38,16 +44,17 @@ class HybridDispatchBuilderSolver:
             os.remove(self.options.log_name)
 
         self.needs_dispatch = any(item in ['battery', 'tower', 'trough'] for item in self.power_sources.keys())
+        self.solution_cache = None
+        self.solution_vectors = None
+        self.horizon_benchmark = None
+        self.segment_boundary_soc_error = []
 
         if self.needs_dispatch:
-            self._pyomo_model = self._create_dispatch_optimization_model()
-            if self.site.follow_desired_schedule:
-                self.dispatch.create_min_operating_cost_objective()
-            else:
-                self.dispatch.create_max_gross_profit_objective()
-            self.dispatch.create_arcs()
-            assert_units_consistent(self.pyomo_model)
-            self.problem_state = DispatchProblemState()
+            self.build_dispatch_model()
+
+            if self.options.solution_cache_size > 0:
+                self.solution_cache = shared_solution_cache(self.options.solution_cache_size,
+                                                            self.options.solution_cache_dir or None)
         
         # Clustering (optional)
         self.clustering = None
@@ -66,6 +73,36 @@ class HybridDispatchBuilderSolver:
                 self.clustering.use_default_weights = False
             self.clustering.run_clustering()  # Create clusters and find exemplar days for simulation
 
+    def horizon_period_lengths(self) -> list:
+        """
+        :returns: number of simulation time steps in each period of the dispatch horizon: one for each of the
+            ``n_roll_periods`` and ``look_ahead_block_periods`` for the rest of the ``n_look_ahead_periods``
+        """
+        n_roll_periods = min(self.options.n_roll_periods, self.options.n_look_ahead_periods)
+        block_periods = self.options.look_ahead_block_periods
+        if block_periods > 1 and any(tech in self.power_sources.keys() for tech in ['trough', 'tower']):
+            raise ValueError("look_ahead_block_periods > 1 is not supported with CSP technologies")
+        n_blocks, remainder = divmod(self.options.n_look_ahead_periods - n_roll_periods, block_periods)
+        return [1] * n_roll_periods + [block_periods] * n_blocks + ([remainder] if remainder else [])
+
+    def build_dispatch_model(self):
+        """
+        Builds the dispatch model for the look-ahead periods of the dispatch options and attaches the technology
+        dispatch models to the power sources
+        """
+        build_start = time.perf_counter()
+        self.opt = None
+        self.solution_vectors = None
+        self._pyomo_model = self._create_dispatch_optimization_model()
+        if self.site.follow_desired_schedule:
+            self.dispatch.create_min_operating_cost_objective()
+        else:
+            self.dispatch.create_max_gross_profit_objective()
+        self.dispatch.create_arcs()
+        assert_units_consistent(self.pyomo_model)
+        self.problem_state = DispatchProblemState(len(range(0, self.site.n_timesteps, self.options.n_roll_periods)))
+        self.problem_state.build_time = time.perf_counter() - build_start
+
     def _create_dispatch_optimization_model(self):
         """
         Creates monolith dispatch model
@@ -74,8 +111,13 @@ class HybridDispatchBuilderSolver:
         #################################
         # Sets                          #
         #################################
+        period_lengths = self.horizon_period_lengths()
         model.forecast_horizon = pyomo.Set(doc="Set of time periods in time horizon",
-                                           initialize=range(self.options.n_look_ahead_periods))
+                                           initialize=range(len(period_lengths)))
+        model.period_length = pyomo.Param(model.forecast_horizon,
+                                          doc="Number of simulation time steps in each time period",
+                                          initialize=dict(enumerate(period_lengths)),
+                                          within=pyomo.PositiveIntegers)
         #################################
         # Blocks (technologies)         #
         #################################
@@ -108,12 +150,47 @@ class HybridDispatchBuilderSolver:
             self.options)
         return model
 
-    def solve_dispatch_model(self, start_time: int, n_days: int):
-        # Solve dispatch model
+    def solve_dispatch_model(self, start_time: int, n_days: int, update_time: float = np.nan):
+        solve_start = time.perf_counter()
+        solver_results = None
+        if self.solution_cache is not None:
+            if self.solution_vectors is None:
+                # Parameters without a default are only part of the model once their values are first set
+                self.solution_vectors = DispatchSolutionVectors(self.pyomo_model, self.dispatch.round_digits)
+            solution_key = self.solution_vectors.key()
+            cached_solution = self.solution_cache.get(solution_key)
+            if cached_solution is not None:
+                solver_results = self.solution_vectors.load(*cached_solution)
+
+        cache_hit = solver_results is not None
+        if not cache_hit:
+            solver_results = self.call_solver()
+            if (self.solution_cache is not None
+                    and solver_results.solver.termination_condition == TerminationCondition.optimal):
+                self.solution_cache.put(solution_key, self.solution_vectors.values(),
+                                        DispatchSolutionVectors.results_fields(solver_results))
+
+        self.problem_state.store_problem_metrics(solver_results, start_time, n_days,
+                                                 self.dispatch.objective_value,
+                                                 wall_time=time.perf_counter() - solve_start,
+                                                 update_time=update_time,
+                                                 cache_hit=cache_hit)
+
+    def call_solver(self):
+        """Solves the dispatch model with the solver of the dispatch options"""
+        if self.options.warm_start and self.is_warm_start_capable(self.opt) and len(self.problem_state.start_time):
+            self.shift_solution_for_warm_start(self.options.n_roll_periods)
+
         if self.options.solver == 'glpk':
             solver_results = self.glpk_solve()
         elif self.options.solver == 'cbc':
             solver_results = self.cbc_solve()
+        elif self.options.solver == 'cbc_persistent':
+            solver_results = self.cbc_persistent_solve()
+        elif self.options.solver == 'highs':
+            solver_results = self.highs_solve()
+        elif self.options.solver == 'highs_matrix':
+            solver_results = self.highs_matrix_solve()
         elif self.options.solver == 'xpress':
             solver_results = self.xpress_solve()
         elif self.options.solver == 'xpress_persistent':
@@ -124,9 +201,7 @@ class HybridDispatchBuilderSolver:
             solver_results = self.gurobi_solve()
         else:
             raise ValueError("{} is not a supported solver".format(self.options.solver))
-
-        self.problem_state.store_problem_metrics(solver_results, start_time, n_days,
-                                                 self.dispatch.objective_value)
+        return solver_results
 
     @staticmethod
     def glpk_solve_call(pyomo_model: pyomo.ConcreteModel,
@@ -233,6 +308,140 @@ class HybridDispatchBuilderSolver:
                                                           self.options.log_name,
                                                           self.options.solver_options)
 
+    @staticmethod
+    def cbc_persistent_solve_call(opt,
+                                  pyomo_model: pyomo.ConcreteModel,
+                                  log_name: str = "",
+                                  user_solver_options: dict = None):
+        # Ref. on solver options: https://coin-or.github.io/Cbc/faq.html (a bit outdated)
+        # The appsi CBC interface does not accept an initial solution, so there is no warm start
+        cbc_solver_options = {'seconds': 60}
+        solver_options = SolverOptions(cbc_solver_options, "", user_solver_options)
+        results = HybridDispatchBuilderSolver.appsi_persistent_solve(opt, pyomo_model, solver_options, log_name)
+        HybridDispatchBuilderSolver.log_and_solution_check(log_name, solver_options.instance_log, results.solver.termination_condition, pyomo_model)
+        return results
+
+    def cbc_persistent_solve(self):
+        if self.opt is None:
+            self.opt = HybridDispatchBuilderSolver.create_appsi_persistent_solver('appsi_cbc')
+
+        return HybridDispatchBuilderSolver.cbc_persistent_solve_call(self.opt,
+                                                                     self.pyomo_model,
+                                                                     self.options.log_name,
+                                                                     self.options.solver_options)
+
+    @staticmethod
+    def highs_solve_call(opt,
+                         pyomo_model: pyomo.ConcreteModel,
+                         log_name: str = "",
+                         user_solver_options: dict = None,
+                         warm_start: bool = False):
+        # Ref. on solver options: https://ergo-code.github.io/HiGHS/dev/options/definitions/
+        highs_solver_options = {'time_limit': 60.}
+        solver_options = SolverOptions(highs_solver_options, "", user_solver_options)
+        results = HybridDispatchBuilderSolver.appsi_persistent_solve(opt, pyomo_model, solver_options, log_name,
+                                                                     warm_start)
+        HybridDispatchBuilderSolver.log_and_solution_check(log_name, solver_options.instance_log, results.solver.termination_condition, pyomo_model)
+        return results
+
+    def highs_solve(self):
+        if self.opt is None:
+            self.opt = HybridDispatchBuilderSolver.create_appsi_persistent_solver('appsi_highs')
+
+        return HybridDispatchBuilderSolver.highs_solve_call(self.opt,
+                                                            self.pyomo_model,
+                                                            self.options.log_name,
+                                                            self.options.solver_options,
+                                                            self.options.warm_start)
+
+    @staticmethod
+    def highs_matrix_solve_call(opt: MatrixDispatchLP,
+                                pyomo_model: pyomo.ConcreteModel,
+                                log_name: str = "",
+                                user_solver_options: dict = None):
+        # Ref. on solver options: https://ergo-code.github.io/HiGHS/dev/options/definitions/
+        highs_solver_options = {'time_limit': 60.}
+        solver_options = SolverOptions(highs_solver_options, log_name, user_solver_options, 'log_file')
+        if log_name != "":
+            solver_options.constructed.update({'output_flag': True, 'log_to_console': False})
+        results = opt.solve(options=solver_options.constructed)
+        HybridDispatchBuilderSolver.log_and_solution_check(log_name, solver_options.instance_log, results.solver.termination_condition, pyomo_model)
+        return results
+
+    def highs_matrix_solve(self):
+        if self.opt is None:
+            self.opt = MatrixDispatchLP(self.pyomo_model)
+
+        return HybridDispatchBuilderSolver.highs_matrix_solve_call(self.opt,
+                                                                   self.pyomo_model,
+                                                                   self.options.log_name,
+                                                                   self.options.solver_options)
+
+    @staticmethod
+    def create_appsi_persistent_solver(solver_name: str):
+        """
+        Creates an appsi persistent solver for the rolling horizon dispatch model.
+
+        The dispatch model structure is fixed after construction, only mutable parameter values change between
+        dispatch windows. The solver is therefore set not to check for added or removed components, or for changes
+        to constraint and named expressions, before every solve. Variables are still checked, so bounds, domains or
+        fixed values changed between windows reach the solver.
+        """
+        opt = pyomo.SolverFactory(solver_name)
+        opt.update_config.check_for_new_or_removed_constraints = False
+        opt.update_config.check_for_new_or_removed_vars = False
+        opt.update_config.check_for_new_or_removed_params = False
+        opt.update_config.update_constraints = False
+        opt.update_config.update_named_expressions = False
+        return opt
+
+    @staticmethod
+    def appsi_persistent_solve(opt,
+                               pyomo_model: pyomo.ConcreteModel,
+                               solver_options: "SolverOptions",
+                               log_name: str = "",
+                               warm_start: bool = False):
+        """Solves the dispatch model with an appsi persistent solver, returning legacy solver results"""
+        if log_name != "":
+            opt.config.logfile = solver_options.instance_log
+        return opt.solve(pyomo_model,
+                         options=solver_options.constructed,
+                         warmstart=warm_start and HybridDispatchBuilderSolver.is_warm_start_capable(opt))
+
+    @staticmethod
+    def is_warm_start_capable(opt) -> bool:
+        """Whether the solver accepts an initial solution (not all appsi solvers define ``warm_start_capable``)"""
+        if opt is None or not hasattr(opt, "warm_start_capable"):
+            return False
+        return opt.warm_start_capable()
+
+    def shift_solution_for_warm_start(self, n_time_steps: int):
+        """
+        Shifts the variable values of the time-indexed dispatch blocks back by ``n_time_steps`` simulation time steps,
+        so the solution of the previous dispatch window lines up with the next window and can be used as a warm start.
+        Each period takes the values of the previous window's period that contained its first time step, which with
+        ``look_ahead_block_periods`` > 1 may be a period of a different length. Periods that start after the previous
+        window keep their previous values.
+
+        :param n_time_steps: Number of time steps the rolling horizon moved forward
+        """
+        horizon = list(self.pyomo_model.forecast_horizon)
+        period_lengths = [pyomo.value(self.pyomo_model.period_length[t]) for t in horizon]
+        period_starts = np.cumsum([0] + period_lengths[:-1])
+        shifted_starts = period_starts + n_time_steps
+        # previous window's period containing the first time step of each period, in increasing order so that
+        # values are always read before they are overwritten
+        source_periods = np.searchsorted(period_starts, shifted_starts, side='right') - 1
+        shifted = [(t, horizon[q]) for t, q, start in zip(horizon, source_periods, shifted_starts)
+                   if start < sum(period_lengths) and horizon[q] != t]
+        for block in self.pyomo_model.component_objects(pyomo.Block, descend_into=False):
+            if not block.is_indexed() or block.index_set() is not self.pyomo_model.forecast_horizon:
+                continue
+            for t, source in shifted:
+                for var, source_var in zip(block[t].component_data_objects(pyomo.Var, descend_into=False),
+                                           block[source].component_data_objects(pyomo.Var, descend_into=False)):
+                    var.set_value(source_var.value, skip_validation=True)
+
     @staticmethod
     def xpress_solve_call(pyomo_model: pyomo.ConcreteModel,
                           log_name: str = "",
@@ -363,9 +572,16 @@ class HybridDispatchBuilderSolver:
         else:
             logger.info("Dispatch optimization not required...")
             return
+        if self.options.tune_horizon and self.clustering is None:
+            self.tune_horizon()
         ti = list(range(0, self.site.n_timesteps, self.options.n_roll_periods))
         self.dispatch.initialize_parameters()
 
+        if self.clustering is None and self.options.n_dispatch_segments > 1 and self.can_simulate_in_segments():
+            self.simulate_power_in_segments()
+            self.export_problem_metrics()
+            return
+
         if self.clustering is None:
             # Solving the year in series
             for i, t in enumerate(ti):
@@ -428,6 +644,140 @@ class HybridDispatchBuilderSolver:
                     for key in ['gen', 'P_out_net', 'P_cycle', 'q_dot_pc_startup', 'q_pc_startup', 'e_ch_tes', 'eta', 'q_pb']:  # Data quantities used in capacity value calculations
                         self.power_sources[tech].outputs.ssc_time_series[key] = list(self.clustering.compute_annual_array_from_cluster_exemplar_data(self.power_sources[tech].outputs.ssc_time_series[key])) 
 
+        self.export_problem_metrics()
+
+    def export_problem_metrics(self):
+        """Writes the dispatch problem metrics to the ``problem_metrics_file`` dispatch option, if set"""
+        if self.options.problem_metrics_file != "":
+            self.problem_state.export(self.options.problem_metrics_file)
+            logger.info("Dispatch problem metrics written to {}".format(self.options.problem_metrics_file))
+
+    def horizon_sample_start_times(self) -> list:
+        """
+        :returns: start time periods of the ``n_horizon_tuning_samples`` samples of ``n_horizon_tuning_days`` days,
+            evenly spread over the year
+        """
+        n_days = self.site.n_timesteps // self.site.n_periods_per_day
+        n_sample_days = min(self.options.n_horizon_tuning_days, n_days)
+        start_days = np.linspace(0, n_days - n_sample_days, self.options.n_horizon_tuning_samples)
+        return [int(day) * self.site.n_periods_per_day for day in np.unique(np.round(start_days))]
+
+    def benchmark_horizons(self,
+                           candidates: list = None,
+                           sample_start_times: list = None,
+                           n_sample_days: int = None,
+                           rebuild: bool = True) -> pd.DataFrame:
+        """
+        Profiles the dispatch run time and revenue of look-ahead and roll period pairs on samples of the year.
+
+        The dispatch model is rebuilt for each candidate and solved with a rolling horizon over each sample, starting
+        from the ``segment_initial_soc_heuristic`` battery SOC and carrying the dispatch SOC between windows. The
+        technology performance models are not simulated, so CSP plant states are not carried between windows. The
+        original look-ahead and roll periods are restored afterwards.
+
+        :param candidates: [n_look_ahead_periods, n_roll_periods] pairs, defaults to ``horizon_candidates``
+        :param sample_start_times: start time periods of the samples, defaults to ``horizon_sample_start_times``
+        :param n_sample_days: number of days dispatched in each sample, defaults to ``n_horizon_tuning_days``
+        :param rebuild: whether to rebuild the dispatch model for the original look-ahead and roll periods afterwards
+
+        :returns: Dataframe with a row per candidate of its look-ahead and roll periods, number of solves, run time
+            of the solves and parameter updates [s], net electricity revenue of the committed periods [$] and revenue
+            relative to the best candidate. The revenue of each candidate covers exactly the sample days
+        """
+        if candidates is None:
+            candidates = self.options.horizon_candidates
+        if sample_start_times is None:
+            sample_start_times = self.horizon_sample_start_times()
+        if n_sample_days is None:
+            n_sample_days = self.options.n_horizon_tuning_days
+
+        horizon = (self.options.n_look_ahead_periods, self.options.n_roll_periods)
+        rows = []
+        try:
+            for n_look_ahead_periods, n_roll_periods in candidates:
+                self.options.n_look_ahead_periods = int(n_look_ahead_periods)
+                self.options.n_roll_periods = int(n_roll_periods)
+                self.build_dispatch_model()
+                self.dispatch.initialize_parameters()
+                revenue = sum(self.dispatch_sample_revenue(start_time, n_sample_days)
+                              for start_time in sample_start_times)
+                summary = self.problem_state.summary()
+                rows.append({'n_look_ahead_periods': self.options.n_look_ahead_periods,
+                             'n_roll_periods': self.options.n_roll_periods,
+                             'n_solves': summary['n_solves'],
+                             'run_time': summary['total_wall_time'] + summary['total_update_time'],
+                             'revenue': revenue})
+        finally:
+            self.options.n_look_ahead_periods, self.options.n_roll_periods = horizon
+            if rebuild:
+                self.build_dispatch_model()
+
+        benchmark = pd.DataFrame(rows)
+        benchmark['relative_revenue'] = benchmark['revenue'] / benchmark['revenue'].max()
+        return benchmark
+
+    def dispatch_sample_revenue(self, start_time: int, n_days: int) -> float:
+        """
+        Solves the dispatch model with a rolling horizon over ``n_days`` days from ``start_time``, without simulating
+        the technology performance models.
+
+        :returns: net electricity revenue of the committed roll periods within the ``n_days`` days [$]
+        """
+        end_time = start_time + n_days * self.site.n_periods_per_day
+        battery_dispatch = self.power_sources['battery'].dispatch if 'battery' in self.power_sources else None
+        initial_soc = self.segment_initial_soc_heuristic() if battery_dispatch is not None else None
+        revenue = 0.0
+        for sim_start_time in range(start_time, end_time, self.options.n_roll_periods):
+            # the last roll periods are only committed up to the end of the sample
+            n_roll_periods = min(self.options.n_roll_periods, end_time - sim_start_time)
+            update_start = time.perf_counter()
+            for model in self.power_sources.values():
+                if model.system_capacity_kw == 0:
+                    continue
+                model.dispatch.update_time_series_parameters(sim_start_time)
+            if battery_dispatch is not None:
+                battery_dispatch.initial_soc = initial_soc
+            self.solve_dispatch_model(sim_start_time, n_days, update_time=time.perf_counter() - update_start)
+
+            revenue += (sum(self.dispatch.electricity_sales[:n_roll_periods])
+                        - sum(self.dispatch.electricity_purchases[:n_roll_periods]))
+            if battery_dispatch is not None:
+                initial_soc = battery_dispatch.soc[n_roll_periods - 1]
+        return revenue
+
+    @staticmethod
+    def select_horizon(benchmark: pd.DataFrame, revenue_tolerance: float) -> tuple:
+        """
+        :param benchmark: ``benchmark_horizons`` results
+        :param revenue_tolerance: fraction of the best candidate's revenue the chosen candidate may lose
+
+        :returns: look-ahead and roll periods of the fastest candidate within the revenue tolerance
+        """
+        best_revenue = benchmark['revenue'].max()
+        within_tolerance = benchmark[benchmark['revenue'] >= best_revenue - revenue_tolerance * abs(best_revenue)]
+        fastest = within_tolerance.loc[within_tolerance['run_time'].idxmin()]
+        return int(fastest['n_look_ahead_periods']), int(fastest['n_roll_periods'])
+
+    def tune_horizon(self):
+        """
+        Benchmarks the ``horizon_candidates`` on sample days with ``benchmark_horizons``, stored in
+        ``horizon_benchmark``, and rebuilds the dispatch model with the fastest look-ahead and roll periods whose
+        revenue is within ``horizon_revenue_tolerance`` of the best candidate's.
+        """
+        if 'heuristic' in self.options.battery_dispatch:
+            logger.warning("Dispatch horizon is not tuned for heuristic battery dispatch.")
+            return
+        horizon = (self.options.n_look_ahead_periods, self.options.n_roll_periods)
+        try:
+            # the model is only rebuilt once, for the chosen candidate
+            self.horizon_benchmark = self.benchmark_horizons(rebuild=False)
+            horizon = self.select_horizon(self.horizon_benchmark, self.options.horizon_revenue_tolerance)
+            logger.info("Dispatch horizon benchmark:\n{}".format(self.horizon_benchmark.to_string(index=False)))
+            logger.info("Dispatch horizon tuned to {} look-ahead and {} roll periods".format(*horizon))
+        finally:
+            self.options.n_look_ahead_periods, self.options.n_roll_periods = horizon
+            self.build_dispatch_model()
+
     def simulate_with_dispatch(self,
                                start_time: int,
                                n_days: int = 1,
@@ -439,6 +789,7 @@ class HybridDispatchBuilderSolver:
                                            self.options.n_roll_periods))
 
         for i, sim_start_time in enumerate(update_dispatch_times):
+            update_start = time.perf_counter()
             # Update battery initial state of charge
             if 'battery' in self.power_sources.keys():
                 self.power_sources['battery'].dispatch.update_dispatch_initial_soc(initial_soc=initial_soc)
@@ -450,12 +801,8 @@ class HybridDispatchBuilderSolver:
                 model.dispatch.update_time_series_parameters(sim_start_time)
 
             if self.site.follow_desired_schedule:
-                n_horizon = len(self.power_sources['grid'].dispatch.blocks.index_set())
-                if start_time + n_horizon > len(self.site.desired_schedule):
-                    system_limit = list(self.site.desired_schedule[start_time:])
-                    system_limit.extend(list(self.site.desired_schedule[0:n_horizon - len(system_limit)]))
-                else:
-                    system_limit = self.site.desired_schedule[start_time:start_time + n_horizon]
+                system_limit = list(self.power_sources['grid'].dispatch.horizon_values(self.site.desired_schedule,
+                                                                                      start_time))
 
                 transmission_limit = self.power_sources['grid'].value('grid_interconnection_limit_kwac') / 1e3
                 for count, value in enumerate(system_limit):
@@ -471,7 +818,7 @@ class HybridDispatchBuilderSolver:
                 self.battery_heuristic()
                 # TODO: we could just run the csp model without dispatch here
             else:
-                self.solve_dispatch_model(start_time, n_days)
+                self.solve_dispatch_model(start_time, n_days, update_time=time.perf_counter() - update_start)
 
             store_outputs = True
             battery_sim_start_time = sim_start_time
@@ -493,6 +840,147 @@ class HybridDispatchBuilderSolver:
                                                                    sim_start_time=sim_start_time,
                                                                    store_outputs=store_outputs)
 
+    def can_simulate_in_segments(self) -> bool:
+        """Checks whether the year can be dispatched in parallel segments, logging the reason if it can not"""
+        reason = None
+        if any(tech in self.power_sources.keys() for tech in ['trough', 'tower']):
+            reason = "CSP plant states are not carried between segments"
+        elif self.options.is_test_start_year or self.options.is_test_end_year:
+            reason = "start or end of year testing is enabled"
+        elif self.site.n_periods_per_day % self.options.n_roll_periods != 0:
+            reason = "n_roll_periods does not divide a day"
+        elif 'fork' not in multiprocessing.get_all_start_methods():
+            reason = "worker processes cannot be forked on this platform"
+
+        if reason is not None:
+            logger.warning("Dispatch segments are simulated in series: {}.".format(reason))
+            return False
+        return True
+
+    def segment_initial_soc_heuristic(self) -> float:
+        """
+        Returns the estimated battery SOC [%] at the start of a dispatch segment.
+
+        Without simulated states to interpolate from, ``Clustering.battery_soc_heuristic`` falls back to 20%. The same
+        estimate is used here, limited to the dispatch SOC bounds. The overlap days simulated before each segment
+        reduce the dependence on this estimate.
+        """
+        battery_dispatch = self.power_sources['battery'].dispatch
+        return min(max(20.0, battery_dispatch.minimum_soc), battery_dispatch.maximum_soc)
+
+    def simulate_power_in_segments(self):
+        """
+        Splits the year into ``n_dispatch_segments`` contiguous segments of whole days and simulates them concurrently
+        in forked worker processes.
+
+        Every segment but the first starts ``n_segment_overlap_days`` early from the estimated battery SOC of
+        ``segment_initial_soc_heuristic``. The overlap days settle the battery state and are then discarded. Once the
+        segments are joined, the first ``n_segment_overlap_days`` days of each segment are re-solved in series from
+        the state the preceding segment ends with, as the serial simulation would carry it over. The absolute
+        differences [%] between the re-solved SOC and the segment's own SOC at the end of the re-solved days, or at the
+        segment start without overlap days, are stored in ``segment_boundary_soc_error`` and logged. The battery
+        capacity fade and temperature are not carried over, each segment starts from their initial values.
+        """
+        n_periods_per_day = self.site.n_periods_per_day
+        n_days = self.site.n_timesteps // n_periods_per_day
+        segments = []
+        for days in np.array_split(np.arange(n_days), self.options.n_dispatch_segments):
+            if len(days) == 0:
+                continue
+            first_day, end_day = int(days[0]), int(days[-1]) + 1
+            start_day = max(0, first_day - self.options.n_segment_overlap_days)
+            segments.append((start_day, first_day, end_day))
+
+        initial_soc = self.segment_initial_soc_heuristic()
+        tasks = [(start_day * n_periods_per_day, end_day - start_day, initial_soc if start_day > 0 else None)
+                 for start_day, _, end_day in segments]
+
+        global _segment_builder
+        _segment_builder = self
+        try:
+            n_workers = min(len(tasks), os.cpu_count() or 1)
+            with multiprocessing.get_context('fork').Pool(n_workers) as pool:
+                results = pool.starmap(_simulate_dispatch_segment, tasks)
+        finally:
+            _segment_builder = None
+
+        battery_outputs = self.power_sources['battery'].outputs
+        self.segment_boundary_soc_error = []
+        for (start_day, first_day, end_day), (outputs, problem_state) in zip(segments, results):
+            n_overlap = (first_day - start_day) * n_periods_per_day
+            time_slice = slice(first_day * n_periods_per_day, end_day * n_periods_per_day)
+            if n_overlap > 0:
+                # Cycles are counted from the start of each worker simulation
+                cycles_offset = battery_outputs.n_cycles[time_slice.start - 1] - outputs['n_cycles'][n_overlap - 1]
+                outputs['n_cycles'] = [n + cycles_offset for n in outputs['n_cycles']]
+
+            for attr, values in outputs.items():
+                if attr == 'dispatch_lifecycles_per_day':
+                    battery_outputs.dispatch_lifecycles_per_day[first_day:end_day] = values[first_day - start_day:]
+                else:
+                    getattr(battery_outputs, attr)[time_slice] = values[n_overlap:]
+            self.problem_state.extend(problem_state)
+
+            if first_day > 0:
+                n_resolve_days = min(first_day - start_day, end_day - first_day)
+                if n_resolve_days == 0:
+                    self.segment_boundary_soc_error.append(abs(initial_soc - battery_outputs.SOC[time_slice.start - 1]))
+                else:
+                    self.segment_boundary_soc_error.append(
+                        self.resolve_segment_start(time_slice.start, n_resolve_days, time_slice.stop))
+
+        logger.info("Dispatch segment boundary SOC errors [%]: {}".format(
+            ", ".join("{:.2f}".format(error) for error in self.segment_boundary_soc_error)))
+
+    def resolve_segment_start(self, start_time: int, n_days: int, end_time: int) -> float:
+        """
+        Re-solves the first ``n_days`` days of a joined dispatch segment in series, starting from the battery state
+        the preceding segment ends with, and shifts the segment's later cycle counts to follow the re-solved days.
+
+        :param start_time: first time period of the segment
+        :param n_days: number of days to re-solve
+        :param end_time: end time period of the segment
+
+        :returns: absolute difference [%] between the re-solved SOC and the segment's SOC at the last re-solved period
+        """
+        battery = self.power_sources['battery']
+        battery_outputs = battery.outputs
+        resolve_end = start_time + n_days * self.site.n_periods_per_day
+        segment_soc = battery_outputs.SOC[resolve_end - 1]
+        segment_cycles = battery_outputs.n_cycles[resolve_end - 1]
+
+        battery.dispatch.update_dispatch_initial_soc(initial_soc=battery_outputs.SOC[start_time - 1])
+        # Cycles are counted from the battery model setup
+        cycles_offset = battery_outputs.n_cycles[start_time - 1] - battery._system_model.StateCell.n_cycles
+        self.simulate_with_dispatch(start_time, n_days)
+
+        time_slice = slice(start_time, resolve_end)
+        battery_outputs.n_cycles[time_slice] = [n + cycles_offset for n in battery_outputs.n_cycles[time_slice]]
+        cycles_offset = battery_outputs.n_cycles[resolve_end - 1] - segment_cycles
+        time_slice = slice(resolve_end, end_time)
+        battery_outputs.n_cycles[time_slice] = [n + cycles_offset for n in battery_outputs.n_cycles[time_slice]]
+        return abs(battery_outputs.SOC[resolve_end - 1] - segment_soc)
+
+    def simulate_dispatch_segment(self, start_time: int, n_days: int, initial_soc: float = None):
+        """
+        Simulates a segment of the year with dispatch, starting from ``initial_soc`` if provided.
+
+        :returns: battery outputs over the segment and the segment's dispatch problem state
+        """
+        # solver interfaces are not shared with the parent process
+        self.opt = None
+        self.problem_state = DispatchProblemState(len(range(0, n_days * self.site.n_periods_per_day,
+                                                            self.options.n_roll_periods)))
+        self.simulate_with_dispatch(start_time, n_days, initial_soc)
+
+        battery_outputs = self.power_sources['battery'].outputs
+        time_slice = slice(start_time, start_time + n_days * self.site.n_periods_per_day)
+        outputs = {attr: list(getattr(battery_outputs, attr)[time_slice])
+                   for attr in battery_outputs.stateful_attributes + ['dispatch_I', 'dispatch_P', 'dispatch_SOC']}
+        start_day = start_time // self.site.n_periods_per_day
+        outputs['dispatch_lifecycles_per_day'] = battery_outputs.dispatch_lifecycles_per_day[start_day:start_day + n_days]
+        return outputs, self.problem_state
+
     def battery_heuristic(self):
         tot_gen = [0.0]*self.options.n_look_ahead_periods
         if 'pv' in self.power_sources.keys():
@@ -519,6 +1007,15 @@ class HybridDispatchBuilderSolver:
     def dispatch(self) -> HybridDispatch:
         return self._dispatch
 
+
+# Builder shared with the forked worker processes of HybridDispatchBuilderSolver.simulate_power_in_segments
+_segment_builder = None
+
+
+def _simulate_dispatch_segment(start_time: int, n_days: int, initial_soc: float = None):
+    return _segment_builder.simulate_dispatch_segment(start_time, n_days, initial_soc)
+
+
 class SolverOptions:
     """Class for housing solver options"""
     def __init__(self, solver_spec_options: dict, log_name: str="", user_solver_options: dict = None, solver_spec_log_key: str="logfile"):
@@ -1,3 +1,6 @@
+import importlib.util
+from pathlib import Path
+
 import numpy as np
 
 from hopp.simulation.technologies.dispatch.power_storage import (
@@ -16,10 +19,12 @@ class HybridDispatchOptions:
     Args:
         dispatch_options (dict): Contains attribute key-value pairs to change default options. 
 
-            - **solver** (str, default='cbc'): MILP solver used for dispatch optimization problem. Options are `('glpk', 'cbc', 'xpress', 'xpress_persistent', 'gurobi_ampl', 'gurobi')`.
+            - **solver** (str, default='cbc'): MILP solver used for dispatch optimization problem. Options are `('glpk', 'cbc', 'cbc_persistent', 'highs', 'highs_matrix', 'xpress', 'xpress_persistent', 'gurobi_ampl', 'gurobi')`. `'cbc_persistent'` and `'highs'` keep the model in a persistent solver interface and only update parameter values between dispatch windows. `'highs'` solves in-process through highspy, which must be installed. `'highs_matrix'` converts the model to sparse matrices once and passes them directly to highspy, re-evaluating only the parameter-dependent coefficients for each window.
 
             - **solver_options** (dict): Dispatch solver options.
 
+            - **warm_start** (bool, default=True): If the solver is persistent and warm start capable, start each dispatch solve from the previous window's solution shifted forward by `n_roll_periods`. Only `'highs'` accepts a warm start; the appsi CBC interface used by `'cbc_persistent'` does not, so it ignores this option.
+
             - **battery_dispatch** (str, default='simple'): Sets the battery dispatch model to use for dispatch. Options are `('simple', 'one_cycle_heuristic', 'heuristic', 'non_convex_LV', 'convex_LV')`.
 
             - **grid_charging** (bool, default=True): Can the battery charge from the grid.
@@ -36,14 +41,36 @@ class HybridDispatchOptions:
 
             - **n_roll_periods** (int, default=24): Number of time periods simulation rolls forward after each dispatch.
 
+            - **look_ahead_block_periods** (int, default=1): Number of time periods aggregated into each period of the look-ahead beyond `n_roll_periods`, which are dispatched at the simulation time step. Time series are averaged over each aggregated period. Reduces the size of each dispatch problem. Not available for CSP technologies.
+
+            - **tune_horizon** (bool, default=False): If True, `n_look_ahead_periods` and `n_roll_periods` are chosen at the start of each simulation by benchmarking the `horizon_candidates` on sample days, see `HybridDispatchBuilderSolver.tune_horizon`.
+
+            - **horizon_candidates** (list, default=[[24, 24], [48, 24], [72, 24]]): If tune_horizon, the `[n_look_ahead_periods, n_roll_periods]` pairs benchmarked. With lifecycle counting, look-ahead periods must be whole days.
+
+            - **n_horizon_tuning_samples** (int, default=4): If tune_horizon, number of samples spread over the year on which the candidates are benchmarked.
+
+            - **n_horizon_tuning_days** (int, default=3): If tune_horizon, number of consecutive days dispatched in each sample.
+
+            - **horizon_revenue_tolerance** (float, default=0.005): If tune_horizon, the fastest candidate whose sample revenue is within this fraction of the best candidate's revenue is chosen.
+
             - **time_weighting_factor** (float, default=0.995): Discount factor for the time periods in the look ahead period.
 
             - **log_name** (str, default=''): Dispatch log file name, empty str will result in no log (for development).
 
+            - **solution_cache_size** (int, default=0): Number of optimal dispatch solutions kept in a cache shared by the simulations of the process, keyed by a hash of the dispatch model and its parameter values (prices, available generation, initial state of charge, limits, ...) rounded to the dispatch `round_digits`. Solves with the same inputs reuse the cached solution instead of calling the solver. If 0, no cache is used.
+
+            - **solution_cache_dir** (str, default=''): If `solution_cache_size` > 0, directory where cached solutions are also stored, so they are shared between processes and runs. Empty str keeps solutions in memory only.
+
+            - **problem_metrics_file** (str, default=''): File the solve time, model size, gap and termination condition of each dispatch solve are written to after each simulation, as Parquet if it ends with '.parquet', which requires pyarrow, otherwise csv. Empty str will result in no file.
+
             - **is_test_start_year** (bool, default=False): If True, simulation solves for first 5 days of the year.
 
             - **is_test_end_year** (bool, default=False): If True, simulation solves for last 5 days of the year.
 
+            - **n_dispatch_segments** (int, default=1): Number of contiguous segments the year is split into and dispatched concurrently in worker processes. If 1, the year is solved in series. Only the battery state-of-charge and cycle count are carried between segments: the battery capacity fade and temperature are reset to their initial values at the start of each segment, so results differ slightly from the serial simulation.
+
+            - **n_segment_overlap_days** (int, default=1): Number of days each parallel dispatch segment is simulated before its start to settle the estimated battery state-of-charge. The same number of days at the start of each segment is re-solved in series once the segments are joined.
+
             - **use_clustering** (bool, default=False): If True, the simulation will be run for a selected set of "exemplar" days.
 
             - **n_clusters** (int, default=30).
@@ -56,6 +83,7 @@ class HybridDispatchOptions:
     def __init__(self, dispatch_options: dict = None):
         self.solver: str = 'cbc'
         self.solver_options: dict = {}   # used to update solver options, look at specific solver for option names
+        self.warm_start: bool = True
         self.battery_dispatch: str = 'simple'
         self.include_lifecycle_count: bool = True
         self.lifecycle_cost_per_kWh_cycle: float = 0.0265  # Estimated using SAM output (lithium-ion battery)
@@ -65,9 +93,20 @@ class HybridDispatchOptions:
         self.n_look_ahead_periods: int = 48
         self.time_weighting_factor: float = 0.995
         self.n_roll_periods: int = 24
+        self.look_ahead_block_periods: int = 1
+        self.tune_horizon: bool = False
+        self.horizon_candidates: list = [[24, 24], [48, 24], [72, 24]]
+        self.n_horizon_tuning_samples: int = 4
+        self.n_horizon_tuning_days: int = 3
+        self.horizon_revenue_tolerance: float = 0.005
         self.log_name: str = ''  # NOTE: Logging is not thread safe
+        self.problem_metrics_file: str = ''
+        self.solution_cache_size: int = 0
+        self.solution_cache_dir: str = ''
         self.is_test_start_year: bool = False
         self.is_test_end_year: bool = False
+        self.n_dispatch_segments: int = 1
+        self.n_segment_overlap_days: int = 1
 
         self.use_clustering: bool = False
         self.n_clusters: int = 30
@@ -95,6 +134,18 @@ class HybridDispatchOptions:
         elif self.is_test_end_year:
             print('WARNING: Dispatch optimization END of year testing is enabled!')
 
+        if self.look_ahead_block_periods < 1:
+            raise ValueError("look_ahead_block_periods must be at least 1")
+
+        for candidate in self.horizon_candidates:
+            if len(candidate) != 2 or not 0 < candidate[1] <= candidate[0]:
+                raise ValueError("horizon_candidates must be [n_look_ahead_periods, n_roll_periods] pairs with "
+                                 "0 < n_roll_periods <= n_look_ahead_periods, got {}".format(candidate))
+
+        if Path(self.problem_metrics_file).suffix == '.parquet' and importlib.util.find_spec('pyarrow') is None:
+            raise ImportError("problem_metrics_file '{}' is a Parquet file, which requires pyarrow".format(
+                self.problem_metrics_file))
+
         if self.pv_charging_only and self.grid_charging:
             raise ValueError("Battery cannot be restricted to charge from PV only if grid_charging is enabled")
 
@@ -0,0 +1,329 @@
+import time
+
+import numpy as np
+import pyomo.environ as pyomo
+import scipy.sparse
+from pyomo.core.base.param import ParamData
+from pyomo.core.base.var import VarData
+from pyomo.core.expr import (
+    AbsExpression,
+    DivisionExpression,
+    NegationExpression,
+    PowExpression,
+    ProductExpression,
+    SumExpression,
+    UnaryFunctionExpression
+)
+from pyomo.core.expr.numvalue import is_constant, native_numeric_types
+from pyomo.opt import SolverResults, TerminationCondition
+from pyomo.repn import generate_standard_repn
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
+
+# elementwise functions of the expression nodes that are mapped, by node type, applied to their arguments' values
+_EXPRESSION_OPERATIONS = (
+    (SumExpression, lambda *args: sum(args)),
+    (ProductExpression, np.multiply),
+    (DivisionExpression, np.divide),
+    (NegationExpression, np.negative),
+    (PowExpression, np.power),
+    (AbsExpression, np.abs),
+)
+_UNARY_FUNCTIONS = {'exp': np.exp, 'log': np.log, 'sqrt': np.sqrt}
+
+
+def _expression_operation(node):
+    if isinstance(node, UnaryFunctionExpression):
+        if node.getname() in _UNARY_FUNCTIONS:
+            return _UNARY_FUNCTIONS[node.getname()]
+    else:
+        for node_type, operation in _EXPRESSION_OPERATIONS:
+            if isinstance(node, node_type):
+                return operation
+    raise TypeError("Expression {} is not mapped".format(type(node).__name__))
+
+
+def _expression_structure(expr, leaves: list) -> tuple:
+    """
+    Structure of a parameter-dependent expression, equal for expressions that only differ in their parameters
+
+    :param expr: expression
+    :param leaves: list to which the parameters and fixed variables of the expression are appended, in order
+    :return: nested tuple of the node types and constants of the expression
+    """
+    if type(expr) in native_numeric_types:
+        return 'c', expr
+    if expr.is_named_expression_type():
+        return _expression_structure(expr.expr, leaves)
+    if expr.is_expression_type():
+        _expression_operation(expr)
+        return (type(expr).__name__, *(_expression_structure(arg, leaves) for arg in expr.args))
+    if isinstance(expr, (ParamData, VarData)) and not is_constant(expr):
+        leaves.append(expr)
+        return 'p',
+    # immutable parameters and units
+    return 'c', pyomo.value(expr)
+
+
+def _expression_evaluator(expr, leaf_columns):
+    """
+    :param expr: expression, as mapped by `_expression_structure`
+    :param leaf_columns: iterator over the column of each parameter of the expression, in order
+    :return: function of a matrix of parameter values, with a row for each expression of the same structure, which
+        returns the values of the expressions
+    """
+    if type(expr) in native_numeric_types:
+        return lambda values: expr
+    if expr.is_named_expression_type():
+        return _expression_evaluator(expr.expr, leaf_columns)
+    if expr.is_expression_type():
+        operation = _expression_operation(expr)
+        args = [_expression_evaluator(arg, leaf_columns) for arg in expr.args]
+        return lambda values: operation(*(arg(values) for arg in args))
+    if isinstance(expr, (ParamData, VarData)) and not is_constant(expr):
+        column = next(leaf_columns)
+        return lambda values: values[:, column]
+    constant = pyomo.value(expr)
+    return lambda values: constant
+
+
+class MatrixDispatchLP:
+    """
+    Dispatch LP/MILP in matrix form, solved directly by HiGHS.
+
+    The constraints and objective of the dispatch model are converted to sparse matrices once. Coefficients and bounds
+    that depend on the blocks' mutable parameters are mapped to those parameters and are the only parts evaluated
+    again before each solve, so the rolling-horizon windows skip Pyomo's model writing. The solution is loaded back
+    into the model's variables, so the dispatch blocks report the same outputs as with the other solvers.
+
+    The conversion is redone if the objective is replaced or variables are fixed or unfixed.
+    """
+    def __init__(self, pyomo_model: pyomo.ConcreteModel):
+        if highspy is None:
+            raise ImportError("MatrixDispatchLP requires highspy")
+        self.pyomo_model = pyomo_model
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue('output_flag', False)
+
+        self._objective = None
+        self._fixed_vars = []
+        self.variables = []
+        self.constraints = []
+        self.a_matrix = None
+        self.compile()
+
+    def _active_objective(self) -> pyomo.Objective:
+        objectives = list(self.pyomo_model.component_data_objects(pyomo.Objective, active=True))
+        if len(objectives) != 1:
+            raise ValueError("Dispatch model must have a single active objective")
+        return objectives[0]
+
+    def is_stale(self) -> bool:
+        """Whether the objective was replaced or variables were fixed or unfixed since the model was converted"""
+        return (self._objective.parent_block() is None or not self._objective.active
+                or any(not v.fixed for v in self._fixed_vars) or any(v.fixed for v in self.variables))
+
+    def compile(self):
+        """
+        Converts the model's constraints and objective into sparse matrix form, keeping parameter-dependent terms as
+        expressions
+        """
+        self._objective = self._active_objective()
+        self._fixed_vars = [v for v in self.pyomo_model.component_data_objects(pyomo.Var) if v.fixed]
+        self.constraints = list(self.pyomo_model.component_data_objects(pyomo.Constraint, active=True))
+
+        columns = {}
+        self.variables = []
+
+        def column(var):
+            if id(var) not in columns:
+                columns[id(var)] = len(self.variables)
+                self.variables.append(var)
+            return columns[id(var)]
+
+        expressions = []
+
+        def split(values):
+            """
+            Splits values into an array of the constant ones, and the indices of the others with the position of their
+            expressions in `expressions`
+            """
+            static = np.zeros(len(values))
+            param_ind, expr_ind = [], []
+            for i, v in enumerate(values):
+                if is_constant(v):
+                    static[i] = pyomo.value(v)
+                else:
+                    param_ind.append(i)
+                    expr_ind.append(len(expressions))
+                    expressions.append(v)
+            return static, np.array(param_ind, dtype=int), np.array(expr_ind, dtype=int)
+
+        rows, cols, coefs = [], [], []
+        lower, upper = [], []
+        for i, con in enumerate(self.constraints):
+            repn = generate_standard_repn(con.body, compute_values=False, quadratic=False)
+            if not repn.is_linear():
+                raise ValueError("Constraint {} is not linear".format(con.name))
+            for var, coef in zip(repn.linear_vars, repn.linear_coefs):
+                rows.append(i)
+                cols.append(column(var))
+                coefs.append(coef)
+            lower.append(-np.inf if con.lower is None else con.lower - repn.constant)
+            upper.append(np.inf if con.upper is None else con.upper - repn.constant)
+
+        repn = generate_standard_repn(self._objective.expr, compute_values=False, quadratic=False)
+        if not repn.is_linear():
+            raise ValueError("Objective {} is not linear".format(self._objective.name))
+        cost_cols = [column(var) for var in repn.linear_vars]
+
+        # constraint matrix stored by column, with a map from the constraint entries to its data
+        self.a_matrix = scipy.sparse.csc_matrix((np.arange(1, len(coefs) + 1, dtype=float), (rows, cols)),
+                                                shape=(len(self.constraints), len(self.variables)))
+        self._entry_order = self.a_matrix.data.astype(int) - 1
+        self._coef_terms = split(coefs)
+        self._lower_terms = split(lower)
+        self._upper_terms = split(upper)
+        self._objective_terms = split(list(repn.linear_coefs) + [repn.constant])
+        self._cost_cols = np.array(cost_cols, dtype=int)
+        self._integer = np.array([v.is_integer() or v.is_binary() for v in self.variables], dtype=bool)
+        self._compile_expressions(expressions)
+
+    def _compile_expressions(self, expressions: list):
+        """
+        Maps the parameter-dependent expressions to the parameters (and fixed variables) they depend on, which is much
+        faster to evaluate than each expression through Pyomo.
+
+        Expressions are grouped by structure, e.g. the same coefficient of a constraint indexed by time, and each group
+        is evaluated at once from a matrix of its parameters' values, with a row per expression and a column per
+        parameter in the order they appear in the expression. Expressions with operations that aren't mapped are
+        evaluated through Pyomo.
+        """
+        self._expressions = expressions
+        self._leaves = []
+        self._pyomo_expressions = []
+        leaf_columns = {}
+        groups = {}
+        for i, expr in enumerate(expressions):
+            leaves = []
+            try:
+                structure = _expression_structure(expr, leaves)
+            except TypeError:
+                self._pyomo_expressions.append(i)
+                continue
+            for leaf in leaves:
+                if id(leaf) not in leaf_columns:
+                    leaf_columns[id(leaf)] = len(self._leaves)
+                    self._leaves.append(leaf)
+            if structure not in groups:
+                groups[structure] = (expr, [], [])
+            groups[structure][1].append(i)
+            groups[structure][2].append([leaf_columns[id(leaf)] for leaf in leaves])
+
+        self._expression_groups = []
+        for expr, positions, leaf_ind in groups.values():
+            leaf_ind = np.array(leaf_ind, dtype=int).reshape(len(positions), -1)
+            self._expression_groups.append((_expression_evaluator(expr, iter(range(leaf_ind.shape[1]))),
+                                            np.array(positions, dtype=int), leaf_ind))
+
+        try:
+            mapped = np.allclose(self._evaluate_expressions(), [pyomo.value(e) for e in expressions], equal_nan=True)
+        except (TypeError, ValueError):
+            mapped = False
+        if not mapped:
+            self._expression_groups = []
+            self._pyomo_expressions = list(range(len(expressions)))
+
+    def _evaluate_expressions(self) -> np.ndarray:
+        values = np.zeros(len(self._expressions))
+        leaf_values = np.array([leaf.value for leaf in self._leaves], dtype=float)
+        for evaluator, positions, leaf_ind in self._expression_groups:
+            values[positions] = evaluator(leaf_values[leaf_ind])
+        for i in self._pyomo_expressions:
+            values[i] = pyomo.value(self._expressions[i])
+        return values
+
+    @staticmethod
+    def _evaluate(terms, expression_values: np.ndarray) -> np.ndarray:
+        static, param_ind, expr_ind = terms
+        values = static.copy()
+        values[param_ind] = expression_values[expr_ind]
+        return values
+
+    def _build_lp(self):
+        expression_values = self._evaluate_expressions()
+        coefs = self._evaluate(self._coef_terms, expression_values)
+        objective_terms = self._evaluate(self._objective_terms, expression_values)
+        cost = np.zeros(len(self.variables))
+        np.add.at(cost, self._cost_cols, objective_terms[:-1])
+
+        col_lower = np.array([-np.inf if v.lb is None else v.lb for v in self.variables], dtype=float)
+        col_upper = np.array([np.inf if v.ub is None else v.ub for v in self.variables], dtype=float)
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = len(self.variables)
+        lp.num_row_ = len(self.constraints)
+        lp.col_cost_ = cost
+        lp.offset_ = objective_terms[-1]
+        lp.col_lower_ = col_lower
+        lp.col_upper_ = col_upper
+        lp.row_lower_ = self._evaluate(self._lower_terms, expression_values)
+        lp.row_upper_ = self._evaluate(self._upper_terms, expression_values)
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = self.a_matrix.indptr
+        lp.a_matrix_.index_ = self.a_matrix.indices
+        lp.a_matrix_.value_ = coefs[self._entry_order]
+        if self._objective.sense == pyomo.maximize:
+            lp.sense_ = highspy.ObjSense.kMaximize
+        if self._integer.any():
+            lp.integrality_ = [highspy.HighsVarType.kInteger if i else highspy.HighsVarType.kContinuous
+                               for i in self._integer]
+        return lp
+
+    def solve(self, options: dict = None) -> SolverResults:
+        """
+        Solves the dispatch model with the current parameter values and loads the solution into its variables
+
+        :param options: HiGHS options
+        :return: solver results with the same problem metrics as Pyomo's solver interfaces
+        """
+        if self.is_stale():
+            self.compile()
+
+        start = time.perf_counter()
+        self.highs.passModel(self._build_lp())
+        for key, value in (options or {}).items():
+            self.highs.setOptionValue(key, value)
+        self.highs.run()
+
+        model_status = self.highs.getModelStatus()
+        info = self.highs.getInfo()
+        termination_condition = {
+            highspy.HighsModelStatus.kOptimal: TerminationCondition.optimal,
+            highspy.HighsModelStatus.kInfeasible: TerminationCondition.infeasible,
+            highspy.HighsModelStatus.kUnbounded: TerminationCondition.unbounded,
+            highspy.HighsModelStatus.kUnboundedOrInfeasible: TerminationCondition.infeasibleOrUnbounded,
+            highspy.HighsModelStatus.kTimeLimit: TerminationCondition.maxTimeLimit,
+            highspy.HighsModelStatus.kIterationLimit: TerminationCondition.maxIterations,
+        }.get(model_status, TerminationCondition.other)
+
+        if info.primal_solution_status == highspy.kSolutionStatusFeasible:
+            for var, value in zip(self.variables, self.highs.getSolution().col_value):
+                var.set_value(value, skip_validation=True)
+
+        results = SolverResults()
+        results.solver.termination_condition = termination_condition
+        results.solver.wallclock_time = time.perf_counter() - start
+        objective = info.objective_function_value
+        bound = info.mip_dual_bound if self._integer.any() else objective
+        if self._objective.sense == pyomo.maximize:
+            results.problem.upper_bound, results.problem.lower_bound = bound, objective
+        else:
+            results.problem.upper_bound, results.problem.lower_bound = objective, bound
+        results.problem.number_of_constraints = len(self.constraints)
+        results.problem.number_of_variables = len(self.variables)
+        results.problem.number_of_nonzeros = self.a_matrix.nnz
+        return results
@@ -885,8 +885,7 @@ class CspDispatch(Dispatch):
     def time_duration(self, time_duration: list):
         """Dispatch horizon time steps [hour]"""
         if len(time_duration) == len(self.blocks):
-            for t, delta in zip(self.blocks, time_duration):
-                self.blocks[t].time_duration = round(delta, self.round_digits)
+            self.set_block_params('time_duration', time_duration)
         else:
             raise ValueError(self.time_duration.__name__ + " list must be the same length as time horizon")
 
@@ -899,8 +898,7 @@ class CspDispatch(Dispatch):
     def available_thermal_generation(self, available_thermal_generation: list):
         """Available solar thermal generation from the csp field [MWt]"""
         if len(available_thermal_generation) == len(self.blocks):
-            for t, value in zip(self.blocks, available_thermal_generation):
-                self.blocks[t].available_thermal_generation = round(value, self.round_digits)
+            self.set_block_params('available_thermal_generation', available_thermal_generation)
         else:
             raise ValueError(self.available_thermal_generation.__name__ + " list must be the same length as time horizon")
 
@@ -913,8 +911,7 @@ class CspDispatch(Dispatch):
     def cycle_ambient_efficiency_correction(self, cycle_ambient_efficiency_correction: list):
         """Cycle efficiency ambient temperature adjustment factor [-]"""
         if len(cycle_ambient_efficiency_correction) == len(self.blocks):
-            for t, value in zip(self.blocks, cycle_ambient_efficiency_correction):
-                self.blocks[t].cycle_ambient_efficiency_correction = round(value, self.round_digits)
+            self.set_block_params('cycle_ambient_efficiency_correction', cycle_ambient_efficiency_correction)
         else:
             raise ValueError(self.cycle_ambient_efficiency_correction.__name__ + " list must be the same length as time horizon")
 
@@ -927,8 +924,7 @@ class CspDispatch(Dispatch):
     def condenser_losses(self, condenser_losses: list):
         """Normalized condenser parasitic losses [-]"""
         if len(condenser_losses) == len(self.blocks):
-            for t, value in zip(self.blocks, condenser_losses):
-                self.blocks[t].condenser_losses = round(value, self.round_digits)
+            self.set_block_params('condenser_losses', condenser_losses)
         else:
             raise ValueError(self.condenser_losses.__name__ + " list must be the same length as time horizon")
 
@@ -941,8 +937,7 @@ class CspDispatch(Dispatch):
     def receiver_startup_fraction(self, receiver_startup_fraction: list):
         """Estimated fraction of time period required for receiver start-up [-]"""
         if len(receiver_startup_fraction) == len(self.blocks):
-            for t, value in zip(self.blocks, receiver_startup_fraction):
-                self.blocks[t].receiver_startup_fraction = round(value, self.round_digits)
+            self.set_block_params('receiver_startup_fraction', receiver_startup_fraction)
         else:
             raise ValueError(self.receiver_startup_fraction.__name__ + " list must be the same length as time horizon")
 
@@ -955,8 +950,7 @@ class CspDispatch(Dispatch):
     @min_receiver_start_time.setter
     def min_receiver_start_time(self, min_receiver_start_time_hr: float):
         """Minimum time to start the receiver [hr]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].min_receiver_start_time.set_value(round(min_receiver_start_time_hr, self.round_digits))
+        self.set_block_params('min_receiver_start_time', min_receiver_start_time_hr)
 
     @property
     def cost_per_field_generation(self) -> float:
@@ -967,8 +961,7 @@ class CspDispatch(Dispatch):
     @cost_per_field_generation.setter
     def cost_per_field_generation(self, om_dollar_per_mwh_thermal: float):
         """Generation cost for the csp field [$/MWht]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].cost_per_field_generation.set_value(round(om_dollar_per_mwh_thermal, self.round_digits))
+        self.set_block_params('cost_per_field_generation', om_dollar_per_mwh_thermal)
 
     @property
     def cost_per_field_start(self) -> float:
@@ -979,8 +972,7 @@ class CspDispatch(Dispatch):
     @cost_per_field_start.setter
     def cost_per_field_start(self, dollars_per_start: float):
         """Penalty for field start-up [$/start]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].cost_per_field_start.set_value(round(dollars_per_start, self.round_digits))
+        self.set_block_params('cost_per_field_start', dollars_per_start)
 
     @property
     def cost_per_cycle_generation(self) -> float:
@@ -991,8 +983,7 @@ class CspDispatch(Dispatch):
     @cost_per_cycle_generation.setter
     def cost_per_cycle_generation(self, om_dollar_per_mwh_electric: float):
         """Generation cost for power cycle [$/MWhe]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].cost_per_cycle_generation.set_value(round(om_dollar_per_mwh_electric, self.round_digits))
+        self.set_block_params('cost_per_cycle_generation', om_dollar_per_mwh_electric)
 
     @property
     def cost_per_cycle_start(self) -> float:
@@ -1003,8 +994,7 @@ class CspDispatch(Dispatch):
     @cost_per_cycle_start.setter
     def cost_per_cycle_start(self, dollars_per_start: float):
         """Penalty for power cycle start [$/start]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].cost_per_cycle_start.set_value(round(dollars_per_start, self.round_digits))
+        self.set_block_params('cost_per_cycle_start', dollars_per_start)
 
     @property
     def cost_per_change_thermal_input(self) -> float:
@@ -1015,8 +1005,7 @@ class CspDispatch(Dispatch):
     @cost_per_change_thermal_input.setter
     def cost_per_change_thermal_input(self, dollars_per_thermal_power: float):
         """Penalty for change in power cycle thermal input [$/MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].cost_per_change_thermal_input.set_value(round(dollars_per_thermal_power, self.round_digits))
+        self.set_block_params('cost_per_change_thermal_input', dollars_per_thermal_power)
 
     @property
     def field_startup_losses(self) -> float:
@@ -1027,8 +1016,7 @@ class CspDispatch(Dispatch):
     @field_startup_losses.setter
     def field_startup_losses(self, field_startup_losses: float):
         """Solar field startup or shutdown parasitic loss [MWhe]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].field_startup_losses.set_value(round(field_startup_losses, self.round_digits))
+        self.set_block_params('field_startup_losses', field_startup_losses)
 
     @property
     def receiver_required_startup_energy(self) -> float:
@@ -1039,8 +1027,7 @@ class CspDispatch(Dispatch):
     @receiver_required_startup_energy.setter
     def receiver_required_startup_energy(self, energy: float):
         """Required energy expended to start receiver [MWht]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].receiver_required_startup_energy.set_value(round(energy, self.round_digits))
+        self.set_block_params('receiver_required_startup_energy', energy)
 
     @property
     def storage_capacity(self) -> float:
@@ -1051,8 +1038,7 @@ class CspDispatch(Dispatch):
     @storage_capacity.setter
     def storage_capacity(self, energy: float):
         """Thermal energy storage capacity [MWht]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].storage_capacity.set_value(round(energy, self.round_digits))
+        self.set_block_params('storage_capacity', energy)
 
     @property
     def receiver_pumping_losses(self) -> float:
@@ -1063,8 +1049,7 @@ class CspDispatch(Dispatch):
     @receiver_pumping_losses.setter
     def receiver_pumping_losses(self, electric_per_thermal: float):
         """Solar field and/or receiver pumping power per unit power produced [MWe/MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].receiver_pumping_losses.set_value(round(electric_per_thermal, self.round_digits))
+        self.set_block_params('receiver_pumping_losses', electric_per_thermal)
 
     @property
     def minimum_receiver_power(self) -> float:
@@ -1075,8 +1060,7 @@ class CspDispatch(Dispatch):
     @minimum_receiver_power.setter
     def minimum_receiver_power(self, thermal_power: float):
         """Minimum operational thermal power delivered by receiver [MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].minimum_receiver_power.set_value(round(thermal_power, self.round_digits))
+        self.set_block_params('minimum_receiver_power', thermal_power)
 
     @property
     def allowable_receiver_startup_power(self) -> float:
@@ -1087,8 +1071,7 @@ class CspDispatch(Dispatch):
     @allowable_receiver_startup_power.setter
     def allowable_receiver_startup_power(self, thermal_power: float):
         """Allowable power per period for receiver start-up [MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].allowable_receiver_startup_power.set_value(round(thermal_power, self.round_digits))
+        self.set_block_params('allowable_receiver_startup_power', thermal_power)
 
     @property
     def field_track_losses(self) -> float:
@@ -1099,8 +1082,7 @@ class CspDispatch(Dispatch):
     @field_track_losses.setter
     def field_track_losses(self, electric_power: float):
         """Solar field tracking parasitic loss [MWe]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].field_track_losses.set_value(round(electric_power, self.round_digits))
+        self.set_block_params('field_track_losses', electric_power)
 
     # @property
     # def heat_trace_losses(self) -> float:
@@ -1123,8 +1105,7 @@ class CspDispatch(Dispatch):
     @cycle_required_startup_energy.setter
     def cycle_required_startup_energy(self, thermal_energy: float):
         """Required energy expended to start cycle [MWht]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].cycle_required_startup_energy.set_value(round(thermal_energy, self.round_digits))
+        self.set_block_params('cycle_required_startup_energy', thermal_energy)
 
     @property
     def cycle_nominal_efficiency(self) -> float:
@@ -1136,8 +1117,7 @@ class CspDispatch(Dispatch):
     def cycle_nominal_efficiency(self, efficiency: float):
         """Power cycle nominal efficiency [-]"""
         efficiency = self._check_efficiency_value(efficiency)
-        for t in self.blocks.index_set():
-            self.blocks[t].cycle_nominal_efficiency.set_value(round(efficiency, self.round_digits))
+        self.set_block_params('cycle_nominal_efficiency', efficiency)
 
     @property
     def cycle_performance_slope(self) -> float:
@@ -1148,8 +1128,7 @@ class CspDispatch(Dispatch):
     @cycle_performance_slope.setter
     def cycle_performance_slope(self, slope: float):
         """Slope of linear approximation of power cycle performance curve [MWe/MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].cycle_performance_slope.set_value(round(slope, self.round_digits))
+        self.set_block_params('cycle_performance_slope', slope)
 
     @property
     def cycle_pumping_losses(self) -> float:
@@ -1160,8 +1139,7 @@ class CspDispatch(Dispatch):
     @cycle_pumping_losses.setter
     def cycle_pumping_losses(self, electric_per_thermal: float):
         """Cycle heat transfer fluid pumping power per unit energy expended [MWe/MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].cycle_pumping_losses.set_value(round(electric_per_thermal, self.round_digits))
+        self.set_block_params('cycle_pumping_losses', electric_per_thermal)
 
     @property
     def allowable_cycle_startup_power(self) -> float:
@@ -1172,8 +1150,7 @@ class CspDispatch(Dispatch):
     @allowable_cycle_startup_power.setter
     def allowable_cycle_startup_power(self, thermal_power: float):
         """Allowable power per period for cycle start-up [MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].allowable_cycle_startup_power.set_value(round(thermal_power, self.round_digits))
+        self.set_block_params('allowable_cycle_startup_power', thermal_power)
 
     @property
     def minimum_cycle_thermal_power(self) -> float:
@@ -1184,8 +1161,7 @@ class CspDispatch(Dispatch):
     @minimum_cycle_thermal_power.setter
     def minimum_cycle_thermal_power(self, thermal_power: float):
         """Minimum operational thermal power delivered to the power cycle [MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].minimum_cycle_thermal_power.set_value(round(thermal_power, self.round_digits))
+        self.set_block_params('minimum_cycle_thermal_power', thermal_power)
 
     @property
     def maximum_cycle_thermal_power(self) -> float:
@@ -1196,8 +1172,7 @@ class CspDispatch(Dispatch):
     @maximum_cycle_thermal_power.setter
     def maximum_cycle_thermal_power(self, thermal_power: float):
         """Maximum operational thermal power delivered to the power cycle [MWt]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].maximum_cycle_thermal_power.set_value(round(thermal_power, self.round_digits))
+        self.set_block_params('maximum_cycle_thermal_power', thermal_power)
 
     # @property
     # def minimum_cycle_power(self) -> float:
@@ -1220,8 +1195,7 @@ class CspDispatch(Dispatch):
     @maximum_cycle_power.setter
     def maximum_cycle_power(self, electric_power: float):
         """Maximum cycle electric power output [MWe]"""
-        for t in self.blocks.index_set():
-            self.blocks[t].maximum_cycle_power.set_value(round(electric_power, self.round_digits))
+        self.set_block_params('maximum_cycle_power', electric_power)
 
     # INITIAL CONDITIONS
     @property
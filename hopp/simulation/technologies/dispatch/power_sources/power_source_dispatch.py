@@ -63,21 +63,16 @@ class PowerSourceDispatch(Dispatch):
 
     def initialize_parameters(self):
         self.cost_per_generation = self._financial_model.value("om_capacity")[0]*1e3/8760
+        self.set_block_params('time_duration', self.period_lengths)
 
     def update_time_series_parameters(self, start_time: int):
-        n_horizon = len(self.blocks.index_set())
+        n_horizon = int(self.period_lengths.sum())
         generation = self._system_model.value("gen")
-        if start_time + n_horizon > len(generation):
-            horizon_gen = list(generation[start_time:])
-            horizon_gen.extend(list(generation[0:n_horizon - len(horizon_gen)]))
-        else:
-            horizon_gen = generation[start_time:start_time + n_horizon]
-
-        if len(horizon_gen) < len(self.blocks):
+        if len(generation) < n_horizon:
             raise RuntimeError(f"Dispatch parameter update error at start_time {start_time}: System model "
-                               f"{type(self._system_model)} generation profile should have at least {len(self.blocks)} "
+                               f"{type(self._system_model)} generation profile should have at least {n_horizon} "
                                f"length but has only {len(generation)}")
-        self.available_generation = [gen_kw / 1e3 for gen_kw in horizon_gen]
+        self.available_generation = self.horizon_values(generation, start_time) / 1e3
 
     @property
     def cost_per_generation(self) -> float:
@@ -86,8 +81,7 @@ class PowerSourceDispatch(Dispatch):
 
     @cost_per_generation.setter
     def cost_per_generation(self, om_dollar_per_mwh: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].cost_per_generation.set_value(round(om_dollar_per_mwh, self.round_digits))
+        self.set_block_params('cost_per_generation', om_dollar_per_mwh)
 
     @property
     def available_generation(self) -> list:
@@ -96,8 +90,7 @@ class PowerSourceDispatch(Dispatch):
     @available_generation.setter
     def available_generation(self, resource: list):
         if len(resource) == len(self.blocks):
-            for t, gen in zip(self.blocks, resource):
-                self.blocks[t].available_generation.set_value(round(gen, self.round_digits))
+            self.set_block_params('available_generation', resource)
         else:
             raise ValueError(f"'resource' list ({len(resource)}) must be the same length as time horizon ({len(self.blocks)})")
 
@@ -152,12 +152,10 @@ class ConvexLinearVoltageBatteryDispatch(NonConvexLinearVoltageBatteryDispatch):
     def _lifecycle_count_rule(self, m, i):
         # current accounting
         # TODO: Check for cheating -> there seems to be a lot of error
-        start = int(i * self.timesteps_per_day)
-        end = int((i + 1) * self.timesteps_per_day)
         return self.model.lifecycles[i] == sum(self.blocks[t].time_duration
                                             * (0.8 * self.blocks[t].discharge_current
                                                - 0.8 * self.blocks[t].aux_discharge_current_soc)
-                                            / self.blocks[t].capacity for t in range(start, end))
+                                            / self.blocks[t].capacity for t in self.day_periods(i))
 
     # Auxiliary Variables
     @property
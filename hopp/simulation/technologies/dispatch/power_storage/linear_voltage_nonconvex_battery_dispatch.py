@@ -161,12 +161,10 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     def _lifecycle_count_rule(self, m, i):
         # current accounting
-        start = int(i * self.timesteps_per_day)
-        end = int((i + 1) * self.timesteps_per_day)
         return self.model.lifecycles[i] == sum(self.blocks[t].time_duration
                                             * (0.8 * self.blocks[t].discharge_current
                                                - 0.8 * self.blocks[t].discharge_current * self.blocks[t].soc0)
-                                            / self.blocks[t].capacity for t in range(start, end))
+                                            / self.blocks[t].capacity for t in self.day_periods(i))
 
     def _set_control_mode(self):
         self._system_model.value("control_mode", 0.0)  # Current control
@@ -227,8 +225,7 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     @voltage_slope.setter
     def voltage_slope(self, voltage_slope: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].voltage_slope = round(voltage_slope, self.round_digits)
+        self.set_block_params('voltage_slope', voltage_slope)
 
     @property
     def voltage_intercept(self) -> float:
@@ -237,8 +234,7 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     @voltage_intercept.setter
     def voltage_intercept(self, voltage_intercept: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].voltage_intercept = round(voltage_intercept, self.round_digits)
+        self.set_block_params('voltage_intercept', voltage_intercept)
 
     # # TODO: Add this if wanted
     # # self.alphaP = Param(None)  # [kW_DC]    Bi-directional intercept for charge
@@ -253,8 +249,7 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     @average_current.setter
     def average_current(self, average_current: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].average_current = round(average_current, self.round_digits)
+        self.set_block_params('average_current', average_current)
 
     @property
     def internal_resistance(self) -> float:
@@ -263,8 +258,7 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     @internal_resistance.setter
     def internal_resistance(self, internal_resistance: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].internal_resistance = round(internal_resistance, self.round_digits)
+        self.set_block_params('internal_resistance', internal_resistance)
 
     @property
     def minimum_charge_current(self) -> float:
@@ -273,8 +267,7 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     @minimum_charge_current.setter
     def minimum_charge_current(self, minimum_charge_current: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].minimum_charge_current = round(minimum_charge_current, self.round_digits)
+        self.set_block_params('minimum_charge_current', minimum_charge_current)
 
     @property
     def maximum_charge_current(self) -> float:
@@ -283,8 +276,7 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     @maximum_charge_current.setter
     def maximum_charge_current(self, maximum_charge_current: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].maximum_charge_current = round(maximum_charge_current, self.round_digits)
+        self.set_block_params('maximum_charge_current', maximum_charge_current)
 
     @property
     def minimum_discharge_current(self) -> float:
@@ -293,8 +285,7 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     @minimum_discharge_current.setter
     def minimum_discharge_current(self, minimum_discharge_current: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].minimum_discharge_current = round(minimum_discharge_current, self.round_digits)
+        self.set_block_params('minimum_discharge_current', minimum_discharge_current)
 
     @property
     def maximum_discharge_current(self) -> float:
@@ -303,8 +294,7 @@ class NonConvexLinearVoltageBatteryDispatch(SimpleBatteryDispatch):
 
     @maximum_discharge_current.setter
     def maximum_discharge_current(self, maximum_discharge_current: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].maximum_discharge_current = round(maximum_discharge_current, self.round_digits)
+        self.set_block_params('maximum_discharge_current', maximum_discharge_current)
 
     # Outputs
     @property
@@ -210,18 +210,21 @@ class PowerStorageDispatch(Dispatch):
 
     def _lifecycle_count_rule(self, m, i):
         # Use full-energy cycles
-        start = int(i * self.timesteps_per_day)
-        end = int((i + 1) * self.timesteps_per_day)
         return m.lifecycles[i] == sum(self.blocks[t].time_duration
                                             * self.blocks[t].discharge_power
-                                            / self.blocks[t].capacity for t in range(start, end))
+                                            / self.blocks[t].capacity for t in self.day_periods(i))
+
+    def day_periods(self, day: int) -> list:
+        """Periods of the dispatch horizon starting within `day` of the horizon"""
+        period_days = self.period_start_steps // self.timesteps_per_day
+        return [t for t, period_day in zip(self.blocks.index_set(), period_days) if period_day == day]
 
     def _create_lifecycle_model(self):
         ##################################
         # Parameters                     #
         ##################################
         self.timesteps_per_day = 24 / pyomo.value(self.blocks[0].time_duration)
-        self.model.days = pyomo.RangeSet(0, int(len(self.blocks)) / self.timesteps_per_day - 1)
+        self.model.days = pyomo.RangeSet(0, int(self.period_lengths.sum()) / self.timesteps_per_day - 1)
         self.model.lifecycle_cost = pyomo.Param(
             doc="Lifecycle cost of " + self.block_set_name + " [$/lifecycle]",
             default=0.0,
@@ -292,8 +295,7 @@ class PowerStorageDispatch(Dispatch):
     @time_duration.setter
     def time_duration(self, time_duration: list):
         if len(time_duration) == len(self.blocks):
-            for t, delta in zip(self.blocks, time_duration):
-                self.blocks[t].time_duration = round(delta, self.round_digits)
+            self.set_block_params('time_duration', time_duration)
         else:
             raise ValueError(self.time_duration.__name__ + " list must be the same length as time horizon")
 
@@ -304,8 +306,7 @@ class PowerStorageDispatch(Dispatch):
 
     @cost_per_charge.setter
     def cost_per_charge(self, om_dollar_per_mwh: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].cost_per_charge = round(om_dollar_per_mwh, self.round_digits)
+        self.set_block_params('cost_per_charge', om_dollar_per_mwh)
 
     @property
     def cost_per_discharge(self) -> float:
@@ -314,8 +315,7 @@ class PowerStorageDispatch(Dispatch):
 
     @cost_per_discharge.setter
     def cost_per_discharge(self, om_dollar_per_mwh: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].cost_per_discharge = round(om_dollar_per_mwh, self.round_digits)
+        self.set_block_params('cost_per_discharge', om_dollar_per_mwh)
 
     @property
     def minimum_power(self) -> float:
@@ -324,8 +324,7 @@ class PowerStorageDispatch(Dispatch):
 
     @minimum_power.setter
     def minimum_power(self, minimum_power_mw: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].minimum_power = round(minimum_power_mw, self.round_digits)
+        self.set_block_params('minimum_power', minimum_power_mw)
 
     @property
     def maximum_power(self) -> float:
@@ -334,8 +333,7 @@ class PowerStorageDispatch(Dispatch):
 
     @maximum_power.setter
     def maximum_power(self, maximum_power_mw: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].maximum_power = round(maximum_power_mw, self.round_digits)
+        self.set_block_params('maximum_power', maximum_power_mw)
 
     @property
     def minimum_soc(self) -> float:
@@ -346,8 +344,7 @@ class PowerStorageDispatch(Dispatch):
     def minimum_soc(self, minimum_soc: float):
         if minimum_soc > 1:
             minimum_soc /= 100.
-        for t in self.blocks.index_set():
-            self.blocks[t].minimum_soc = round(minimum_soc, self.round_digits)
+        self.set_block_params('minimum_soc', minimum_soc)
 
     @property
     def maximum_soc(self) -> float:
@@ -358,8 +355,7 @@ class PowerStorageDispatch(Dispatch):
     def maximum_soc(self, maximum_soc: float):
         if maximum_soc > 1:
             maximum_soc /= 100.
-        for t in self.blocks.index_set():
-            self.blocks[t].maximum_soc = round(maximum_soc, self.round_digits)
+        self.set_block_params('maximum_soc', maximum_soc)
 
     @property
     def charge_efficiency(self) -> float:
@@ -369,8 +365,7 @@ class PowerStorageDispatch(Dispatch):
     @charge_efficiency.setter
     def charge_efficiency(self, efficiency: float):
         efficiency = self._check_efficiency_value(efficiency)
-        for t in self.blocks.index_set():
-            self.blocks[t].charge_efficiency = round(efficiency, self.round_digits)
+        self.set_block_params('charge_efficiency', efficiency)
 
     @property
     def discharge_efficiency(self) -> float:
@@ -380,8 +375,7 @@ class PowerStorageDispatch(Dispatch):
     @discharge_efficiency.setter
     def discharge_efficiency(self, efficiency: float):
         efficiency = self._check_efficiency_value(efficiency)
-        for t in self.blocks.index_set():
-            self.blocks[t].discharge_efficiency = round(efficiency, self.round_digits)
+        self.set_block_params('discharge_efficiency', efficiency)
 
     @property
     def round_trip_efficiency(self) -> float:
@@ -401,8 +395,7 @@ class PowerStorageDispatch(Dispatch):
 
     @capacity.setter
     def capacity(self, capacity_mwh: float):
-        for t in self.blocks.index_set():
-            self.blocks[t].capacity = round(capacity_mwh, self.round_digits)
+        self.set_block_params('capacity', capacity_mwh)
 
     @property
     def initial_soc(self) -> float:
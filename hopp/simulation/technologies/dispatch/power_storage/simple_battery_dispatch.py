@@ -58,7 +58,7 @@ class SimpleBatteryDispatch(PowerStorageDispatch):
 
     def update_time_series_parameters(self, start_time: int):
         # TODO: provide more control
-        self.time_duration = [1.0] * len(self.blocks.index_set())
+        self.time_duration = self.period_lengths
 
     def update_dispatch_initial_soc(self, initial_soc: float = None):
         if initial_soc is not None:
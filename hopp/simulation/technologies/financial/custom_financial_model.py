@@ -3,6 +3,10 @@ from typing import Sequence, List
 import numpy as np
 from hopp.tools.utils import flatten_dict, equal
 
+# Financial inputs that can vary between the scenarios of a batch evaluation, see `CustomFinancialModel.batch_evaluate`
+BATCH_INPUTS = ('real_discount_rate', 'inflation_rate', 'ppa_price_input', 'ppa_escalation', 'om_fixed',
+                'om_capacity', 'om_production', 'total_installed_cost', 'system_capacity', 'annual_energy')
+
 
 @dataclass
 class FinancialData:
@@ -248,31 +252,132 @@ class CustomFinancialModel():
         """
         Computes the net cash flow timeseries of annual values over lifetime
         """
+        return self.batch_net_cash_flow(project_life)[0].tolist()
+
+
+    def degradation_fractions(self, project_life=25) -> np.ndarray:
+        """
+        Computes the fraction of annual energy remaining after degradation in each year of the lifetime
+        """
         degradation = self.value('degradation')
         if isinstance(degradation, float) or isinstance(degradation, int):
             degradation = [degradation] * project_life
         elif len(degradation) == 1:
             degradation = [degradation[0]] * project_life
-        else:
-            degradation = list(degradation)
-
-        ncf = list()
-        ncf.append(-self.value('total_installed_cost'))
-        degrad_fraction = 1                         # fraction of annual energy after degradation
-        for year in range(1, project_life + 1):
-            degrad_fraction *= (1 - degradation[year - 1])
-            ncf.append(
-                        (
-                        - self.o_and_m_cost() * (1 + self.value('inflation_rate') / 100)**(year - 1)
-                        + self.value('annual_energy')
-                        * degrad_fraction
-                        * self.value('ppa_price_input')[0]
-                        * (1 + self.value('ppa_escalation') / 100)**(year - 1)
-                        )
-                      )
+        return np.cumprod(1 - np.asarray(degradation[:project_life], dtype=float))
+
+
+    def batch_inputs(self, **inputs) -> dict:
+        """
+        Financial inputs of a batch of scenarios. Inputs not given are the model's values.
+
+        :param inputs: scenario values of any of `BATCH_INPUTS`, each a scalar or an array of one value per scenario.
+            Arrays are broadcast against each other
+        :return: dictionary of input arrays of shape (scenarios, 1)
+        """
+        unknown = set(inputs) - set(BATCH_INPUTS)
+        if unknown:
+            raise ValueError("Unknown batch financial inputs {}, expected any of {}".format(sorted(unknown),
+                                                                                            BATCH_INPUTS))
+        values = []
+        for name in BATCH_INPUTS:
+            if name in inputs:
+                value = inputs[name]
+            elif name == 'annual_energy':
+                value = self.annual_energy
+            else:
+                value = self.value(name)
+                if name in ('ppa_price_input', 'om_fixed', 'om_capacity', 'om_production'):
+                    value = value[0]
+            values.append(np.atleast_1d(np.asarray(value, dtype=float)))
+        return {name: value.reshape(-1, 1) for name, value in zip(BATCH_INPUTS, np.broadcast_arrays(*values))}
+
+
+    def batch_net_cash_flow(self, project_life=25, **inputs) -> np.ndarray:
+        """
+        Computes the net cash flows of annual values over lifetime of a batch of scenarios on the same generation
+
+        :param project_life: number of years in the analysis period
+        :param inputs: scenario values of any of `BATCH_INPUTS`, see `batch_inputs`
+        :return: net cash flows of shape (scenarios, project_life + 1) [$]
+        """
+        x = self.batch_inputs(**inputs)
+        years = np.arange(project_life)             # years since the first operating year
+        ncf = np.empty((len(x['annual_energy']), project_life + 1))
+        ncf[:, 0] = -x['total_installed_cost'][:, 0]
+        ncf[:, 1:] = - self.batch_o_and_m_cost(x) * (1 + x['inflation_rate'] / 100)**years \
+                     + x['annual_energy'] \
+                     * self.degradation_fractions(project_life) \
+                     * x['ppa_price_input'] \
+                     * (1 + x['ppa_escalation'] / 100)**years
         return ncf
 
 
+    def batch_evaluate(self, project_life=None, **inputs) -> dict:
+        """
+        Computes the financial metrics of a batch of scenarios on the same generation, without re-simulating
+        performance. The scenarios are evaluated together as (scenario x year) arrays.
+
+        The levelized costs are the installed cost plus the present value of the O&M costs, divided by the present value
+        of the degraded energy, discounted at the nominal (nominal LCOE) or real (real LCOE) discount rate.
+
+        :param project_life: number of years in the analysis period, the model's 'analysis_period' if None
+        :param inputs: scenario values of any of `BATCH_INPUTS`, see `batch_inputs`
+        :return: dictionary of arrays of one value per scenario:
+            net_present_value [$], levelized_cost_of_energy_real and levelized_cost_of_energy_nominal [cents/kWh] and
+            internal_rate_of_return [%]
+        """
+        if project_life is None:
+            project_life = int(self.value('analysis_period'))
+        x = self.batch_inputs(**inputs)
+        ncf = self.batch_net_cash_flow(project_life, **{name: x[name][:, 0] for name in BATCH_INPUTS})
+        nominal_rate = self.nominal_discount_rate(x['inflation_rate'], x['real_discount_rate']) / 100
+        real_rate = x['real_discount_rate'] / 100
+
+        years = np.arange(1, project_life + 1)
+        energy = x['annual_energy'] * self.degradation_fractions(project_life)
+        costs = self.batch_o_and_m_cost(x) * (1 + x['inflation_rate'] / 100)**(years - 1)
+        pv_costs = x['total_installed_cost'][:, 0] + (costs / (1 + nominal_rate)**years).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lcoe_nom = pv_costs / (energy / (1 + nominal_rate)**years).sum(axis=1) * 100
+            lcoe_real = pv_costs / (energy / (1 + real_rate)**years).sum(axis=1) * 100
+
+        return {
+            'net_present_value': np.atleast_1d(self.npv(nominal_rate, ncf)),
+            'levelized_cost_of_energy_real': lcoe_real,
+            'levelized_cost_of_energy_nominal': lcoe_nom,
+            'internal_rate_of_return': self.irr(ncf) * 100,
+        }
+
+
+    @staticmethod
+    def irr(net_cash_flow, guess: float = 0.1, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+        """
+        Returns the IRR (Internal Rate of Return) of each cash flow series, found together by Newton's method
+
+        :param net_cash_flow: net cash flow timeseries, or array of one timeseries per row
+        :param guess: initial rate [-]
+        :param tol: rate convergence tolerance [-]
+        :param max_iter: maximum number of iterations
+        :return: rate of each timeseries [-], NaN where it does not converge
+        """
+        values = np.atleast_2d(np.asarray(net_cash_flow, dtype=float))
+        timestep_array = np.arange(0, values.shape[1])
+        rate = np.full(len(values), guess)
+        converged = np.zeros(len(values), dtype=bool)
+        with np.errstate(all='ignore'):
+            for _ in range(max_iter):
+                discount = (1 + rate[:, None]) ** -timestep_array
+                npv = (values * discount).sum(axis=1)
+                d_npv = -(timestep_array * values * discount).sum(axis=1) / (1 + rate)
+                step = npv / d_npv
+                rate = np.where(converged, rate, rate - step)
+                converged |= np.abs(step) < tol
+                if converged.all():
+                    break
+        return np.where(converged & (rate > -1), rate, np.nan)
+
+
     def o_and_m_cost(self):
         """
         Computes the annual O&M cost from the fixed, per capacity and per production costs
@@ -282,6 +387,18 @@ class CustomFinancialModel():
                + self.value('om_production')[0] * self.value('annual_energy') * 1e-3
 
 
+    @staticmethod
+    def batch_o_and_m_cost(inputs: dict) -> np.ndarray:
+        """
+        Computes the annual O&M cost of a batch of scenarios from the fixed, per capacity and per production costs
+
+        :param inputs: batch financial inputs, see `batch_inputs`
+        """
+        return inputs['om_fixed'] \
+               + inputs['om_capacity'] * inputs['system_capacity'] \
+               + inputs['om_production'] * inputs['annual_energy'] * 1e-3
+
+
     def value(self, var_name, var_value=None):
         attr_obj = None
         if var_name in self.__dir__():
@@ -1,4 +1,4 @@
-from typing import Iterable, List, Sequence, Optional, Union
+from typing import Iterable, Sequence, Optional, Union
 
 import numpy as np
 from attrs import define, field
@@ -6,7 +6,9 @@ import PySAM.Grid as GridModel
 import PySAM.Singleowner as Singleowner
 
 from hopp.simulation.technologies.sites import SiteInfo
-from hopp.simulation.technologies.power_source import PowerSource
+from hopp.simulation.technologies.power_source import PowerSource, read_only_array
+from hopp.simulation.technologies.capacity_credit import generation_max_feasible_kwh
+from hopp.simulation.technologies.lifetime_profile import LifetimeProfile
 from hopp.simulation.base import BaseClass
 from hopp.simulation.technologies.financial import FinancialModelType, CustomFinancialModel
 from hopp.type_dec import NDArrayFloat
@@ -85,13 +87,12 @@ class Grid(PowerSource):
         self.total_gen_max_feasible_year1 = np.array([0.])
 
     def simulate_grid_connection(
-        # TODO: update args to use numpy types, once PowerSource is refactored
         self,
         hybrid_size_kw: float, 
-        total_gen: Union[List[float], NDArrayFloat], 
+        total_gen: Union[NDArrayFloat, LifetimeProfile], 
         project_life: int, 
         lifetime_sim: bool, 
-        total_gen_max_feasible_year1: Union[List[float], NDArrayFloat]
+        total_gen_max_feasible_year1: NDArrayFloat
     ):
         """
         Sets up and simulates hybrid system grid connection. Additionally,
@@ -100,7 +101,8 @@ class Grid(PowerSource):
 
         Args:
             hybrid_size_kw: Hybrid system capacity [kW]
-            total_gen: Hybrid system generation profile [kWh]
+            total_gen: Hybrid system generation profile [kWh], over the project life or
+                repeated from its first year
             project_life: Number of year in the analysis period (expected project
                 lifetime) [years]
             lifetime_sim: For simulation modules which support simulating each year of
@@ -110,36 +112,62 @@ class Grid(PowerSource):
                 system (for capacity payments) [kWh]
 
         """
-        if self.site.follow_desired_schedule:
+        if isinstance(total_gen, LifetimeProfile):
+            self._simulate_lifetime_profile_connection(total_gen, project_life)
+        elif self.site.follow_desired_schedule:
             # Desired schedule sets the upper bound of the system output, any over generation is curtailed
-            lifetime_schedule: NDArrayFloat = np.tile([
-                x * 1e3 for x in self.site.desired_schedule],
+            lifetime_schedule = np.tile(
+                np.asarray(self.site.desired_schedule, dtype=float) * 1e3,
                 int(project_life / (len(self.site.desired_schedule) // self.site.n_timesteps))
             )
-            self.generation_profile = list(np.minimum(total_gen, lifetime_schedule)) # TODO: remove list() cast once parent class uses numpy 
+            total_gen = np.asarray(total_gen, dtype=float)
+            self.generation_profile = np.minimum(total_gen, lifetime_schedule)
 
-            self.missed_load = np.array([schedule - gen if gen > 0 else schedule for (schedule, gen) in
-                                     zip(lifetime_schedule, self.generation_profile)])
-            self.missed_load_percentage = sum(self.missed_load)/sum(lifetime_schedule)
+            self.missed_load = lifetime_schedule - np.maximum(self.generation_profile, 0)
+            self.missed_load_percentage = self.missed_load.sum()/lifetime_schedule.sum()
 
-            self.schedule_curtailed = np.array([gen - schedule if gen > schedule else 0. for (gen, schedule) in
-                                            zip(total_gen, lifetime_schedule)])
-            self.schedule_curtailed_percentage = sum(self.schedule_curtailed)/sum(lifetime_schedule)
+            self.schedule_curtailed = np.maximum(total_gen - lifetime_schedule, 0)
+            self.schedule_curtailed_percentage = self.schedule_curtailed.sum()/lifetime_schedule.sum()
         else:
-            self.generation_profile = list(total_gen)
+            self.generation_profile = total_gen
 
         self.total_gen_max_feasible_year1 = np.array(total_gen_max_feasible_year1)
         self.system_capacity_kw = hybrid_size_kw  # TODO: Should this be interconnection limit?
-        self.gen_max_feasible = list(np.minimum(  # TODO: remove list() cast once parent class uses numpy 
+        self.gen_max_feasible = np.minimum(
             total_gen_max_feasible_year1, 
             self.interconnect_kw * self.site.interval / 60
-        ))
+        )
         self.simulate_power(project_life, lifetime_sim)
 
         # FIXME: updating capacity credit for reporting only.
         self.capacity_credit_percent = [i * (self.system_capacity_kw / self.interconnect_kw) for i in self.capacity_credit_percent]
 
-    def calc_gen_max_feasible_kwh(self, interconnect_kw: float) -> list:
+    def _simulate_lifetime_profile_connection(self, total_gen: LifetimeProfile, project_life: int):
+        """
+        Same as the desired schedule and generation profile part of `simulate_grid_connection`, computed on the
+        year-indexed arrays of the generation and desired schedule
+
+        Args:
+            total_gen: Hybrid system generation profile [kWh]
+            project_life: Number of year in the analysis period [years]
+        """
+        if self.site.follow_desired_schedule:
+            lifetime_schedule = LifetimeProfile(np.asarray(self.site.desired_schedule) * 1e3, self.site.n_timesteps,
+                                                project_life)
+            generation = total_gen.minimum(lifetime_schedule)
+            self.generation_profile = generation.to_array()
+
+            missed_load = lifetime_schedule - generation.maximum(0)
+            self.missed_load = missed_load.to_array()
+            self.missed_load_percentage = missed_load.sum()/lifetime_schedule.sum()
+
+            schedule_curtailed = (total_gen - lifetime_schedule).maximum(0)
+            self.schedule_curtailed = schedule_curtailed.to_array()
+            self.schedule_curtailed_percentage = schedule_curtailed.sum()/lifetime_schedule.sum()
+        else:
+            self.generation_profile = total_gen.to_array()
+
+    def calc_gen_max_feasible_kwh(self, interconnect_kw: float) -> NDArrayFloat:
         """
         Calculates the maximum feasible generation profile that could have occurred (year 1)
 
@@ -150,8 +178,8 @@ class Grid(PowerSource):
         """
         W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
         t_step = self.site.interval / 60                                                # hr
-        E_net_max_feasible = [min(x,W_ac_nom) * t_step for x in self.total_gen_max_feasible_year1[0:self.site.n_timesteps]]      # [kWh]
-        return E_net_max_feasible
+        return generation_max_feasible_kwh(self.total_gen_max_feasible_year1[0:self.site.n_timesteps], W_ac_nom,
+                                           t_step)
 
     @property
     def system_capacity_kw(self) -> float:
@@ -180,34 +208,32 @@ class Grid(PowerSource):
         self._system_model.GridLimits.grid_curtailment = curtailment_limit_timeseries_kw
 
     @property
-    def generation_profile(self) -> Sequence:
+    def generation_profile(self) -> NDArrayFloat:
         """System power generated [kW]"""
-        return self._system_model.SystemOutput.gen
+        return read_only_array(self._system_model.SystemOutput.gen)
 
     @generation_profile.setter
-    def generation_profile(self, system_generation_kw: Sequence):
+    def generation_profile(self, system_generation_kw: Union[Sequence, NDArrayFloat]):
         self._system_model.SystemOutput.gen = system_generation_kw
 
     @property
-    def generation_profile_wo_battery(self) -> Sequence:
+    def generation_profile_wo_battery(self) -> NDArrayFloat:
         """System power generated without battery [kW]"""
-        return self._financial_model.value('gen_without_battery')
+        return read_only_array(self._financial_model.value('gen_without_battery'))
 
     @generation_profile_wo_battery.setter
     def generation_profile_wo_battery(self, system_generation_wo_battery_kw: Sequence):
         self._system_model.SystemOutput.gen = system_generation_wo_battery_kw
 
     @property
-    def generation_profile_pre_curtailment(self) -> Sequence:
+    def generation_profile_pre_curtailment(self) -> NDArrayFloat:
         """System power before grid interconnect [kW]"""
-        return self._system_model.Outputs.system_pre_interconnect_kwac
+        return read_only_array(self._system_model.Outputs.system_pre_interconnect_kwac)
 
     @property
-    def generation_curtailed(self) -> Sequence:
+    def generation_curtailed(self) -> NDArrayFloat:
         """Generation curtailed due to interconnect limit [kW]"""
-        curtailed = self.generation_profile
-        pre_curtailed = self.generation_profile_pre_curtailment
-        return [pre_curtailed[i] - curtailed[i] for i in range(len(curtailed))]
+        return self.generation_profile_pre_curtailment - self.generation_profile
 
     @property
     def curtailment_percent(self) -> float:
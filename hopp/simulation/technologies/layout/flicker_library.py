@@ -0,0 +1,235 @@
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from hopp.simulation.technologies.layout.flicker_mismatch import FlickerMismatch
+from hopp.utilities.log import flicker_logger as logger
+
+# Directory of the flicker heat maps shipped with HOPP
+FLICKER_DATA_DIR = Path(__file__).parent / "flicker_data"
+# Name of the index stored in each library directory
+INDEX_FILENAME = "flicker_library.csv"
+INDEX_COLUMNS = ['Filename', 'Lat', 'Lon', 'Diameter', 'StepsPerHour', 'AnglesPerStep', 'mtime_ns']
+
+# turbine diameter of the heat maps in the "{lat}_{lon}_{steps_per_hour}_{angles_per_step}_shadow.txt" format
+legacy_flicker_diam = 70
+
+
+class FlickerHeatmapLibrary:
+    """
+    Library of single-turbine flicker heat maps, created by FlickerMismatch, stored as compressed files in a directory.
+
+    Each heat map is keyed by its location, rounded to `lat_lon_resolution`, the turbine diameter, the steps per hour
+    and the blade angles per step it was computed with. An index of the heat maps is kept in the directory so that the
+    files are only opened the first time they are seen or after they are modified, and the nearest heat map to any
+    location can be found without loading them.
+
+    Heat maps in the older "{lat}_{lon}_{steps_per_hour}_{angles_per_step}_shadow.txt" format are also indexed, with a
+    turbine diameter of `legacy_flicker_diam`.
+
+    The heat maps shipped with HOPP in `FLICKER_DATA_DIR` are a read-only library: nothing is saved there and its index
+    is only kept in memory. Generated heat maps are saved to a library in a directory of the caller's choosing.
+    """
+    def __init__(self,
+                 library_dir: Union[str, Path] = FLICKER_DATA_DIR,
+                 lat_lon_resolution: float = 0.1,
+                 read_only: Optional[bool] = None):
+        """
+        :param library_dir: directory of the heat map files
+        :param lat_lon_resolution: degrees to which locations are rounded, heat maps within the same rounded location
+            and with the same settings replace each other
+        :param read_only: if True, heat maps can't be saved and the index isn't written to the directory. Defaults to
+            True for `FLICKER_DATA_DIR` and False otherwise
+        """
+        self.library_dir = Path(library_dir)
+        self.lat_lon_resolution = lat_lon_resolution
+        if read_only is None:
+            read_only = self.library_dir.resolve() == FLICKER_DATA_DIR.resolve()
+        self.read_only = read_only
+        self._index = None
+
+    def key(self,
+            lat: float,
+            lon: float,
+            diameter: float,
+            steps_per_hour: int,
+            angles_per_step: Optional[int]
+            ) -> tuple:
+        """
+        :return: (lat, lon, diameter, steps_per_hour, angles_per_step) of a heat map in the library, with the location
+            rounded to the library's resolution and angles_per_step of None as 0
+        """
+        digits = max(0, int(np.ceil(-np.log10(self.lat_lon_resolution))))
+        lat = round(round(lat / self.lat_lon_resolution) * self.lat_lon_resolution, digits)
+        lon = round(round(lon / self.lat_lon_resolution) * self.lat_lon_resolution, digits)
+        return lat, lon, float(diameter), int(steps_per_hour), int(angles_per_step or 0)
+
+    @staticmethod
+    def filename(key: tuple) -> str:
+        return "{}_{}_{:g}_{}_{}_flicker.npz".format(*key)
+
+    @staticmethod
+    def _read_key(file_path: Path) -> tuple:
+        """
+        Reads the key of a heat map file, from its contents or, for the older text format, from its name
+        """
+        if file_path.suffix == ".npz":
+            with np.load(file_path) as data:
+                return tuple(float(data[k]) for k in ('lat', 'lon', 'diameter', 'steps_per_hour', 'angles_per_step'))
+        lat, lon, steps_per_hour, angles_per_step = file_path.name[:-len("_shadow.txt")].split("_")
+        return float(lat), float(lon), legacy_flicker_diam, float(steps_per_hour), float(angles_per_step)
+
+    @property
+    def index(self) -> pd.DataFrame:
+        """
+        Index of the heat maps in the library, updated when files are added, removed or modified
+
+        :return: Dataframe of Filename, Lat, Lon, Diameter, StepsPerHour, AnglesPerStep and mtime [ns]
+        """
+        index_path = self.library_dir / INDEX_FILENAME
+        known = {}
+        if self._index is not None:
+            index = self._index
+        elif not self.read_only and index_path.is_file():
+            index = pd.read_csv(index_path)
+            if list(index.columns) != INDEX_COLUMNS:
+                index = None
+        else:
+            index = None
+        if index is not None:
+            known = {row.Filename: row for row in index.itertuples(index=False)}
+
+        rows = []
+        changed = False
+        files = os.listdir(self.library_dir) if self.library_dir.is_dir() else []
+        for file in sorted(files):
+            if not (file.endswith("_flicker.npz") or file.endswith("_shadow.txt")):
+                continue
+            mtime_ns = os.stat(self.library_dir / file).st_mtime_ns
+            if file in known and int(known[file].mtime_ns) == mtime_ns:
+                rows.append(tuple(known[file]))
+            else:
+                try:
+                    key = self._read_key(self.library_dir / file)
+                except (ValueError, KeyError, OSError):
+                    logger.warning("FlickerHeatmapLibrary: skipping unrecognized file {}".format(file))
+                    continue
+                rows.append((file, *key, mtime_ns))
+                changed = True
+
+        index = pd.DataFrame(rows, columns=INDEX_COLUMNS)
+        self._index = index
+        if not self.read_only and (changed or len(index) != len(known)):
+            try:
+                index.to_csv(index_path, index=False)
+            except OSError as e:
+                logger.warning("FlickerHeatmapLibrary: could not write index {}: {}".format(index_path, e))
+        return index
+
+    def save(self,
+             flicker_data: tuple,
+             lat: float,
+             lon: float,
+             steps_per_hour: int,
+             angles_per_step: Optional[int]
+             ) -> Optional[Path]:
+        """
+        Stores a heat map in the library, replacing any with the same key
+
+        :param flicker_data: (turbine diameter, (turbine x index, turbine y index), heat map, x coordinates,
+            y coordinates), as in `HybridLayout._flicker_data`
+        :param lat: latitude of the heat map
+        :param lon: longitude of the heat map
+        :param steps_per_hour: FlickerMismatch.steps_per_hour the heat map was computed with
+        :param angles_per_step: blade angles per step the heat map was computed with
+        :return: path of the stored file, or None if the library is read-only or its directory can't be written to
+        """
+        diameter, turb_index, heatmap, x_coords, y_coords = flicker_data
+        key = self.key(lat, lon, diameter, steps_per_hour, angles_per_step)
+        file_path = self.library_dir / self.filename(key)
+        if self.read_only:
+            logger.warning("FlickerHeatmapLibrary: not saving {} to a read-only library".format(file_path))
+            return None
+        try:
+            self.library_dir.mkdir(parents=True, exist_ok=True)
+            np.savez_compressed(file_path,
+                                heatmap=heatmap, x_coords=x_coords, y_coords=y_coords, turb_index=turb_index,
+                                **dict(zip(('lat', 'lon', 'diameter', 'steps_per_hour', 'angles_per_step'), key)))
+        except OSError as e:
+            logger.warning("FlickerHeatmapLibrary: could not save {}: {}".format(file_path, e))
+            return None
+        return file_path
+
+    def load(self,
+             filename: str
+             ) -> tuple:
+        """
+        Loads a heat map of the library
+
+        :param filename: name of the file in the library directory
+        :return: (turbine diameter, (turbine x index, turbine y index), heat map, x coordinates, y coordinates)
+        """
+        file_path = self.library_dir / filename
+        if file_path.suffix == ".npz":
+            with np.load(file_path) as data:
+                return (float(data['diameter']), tuple(int(i) for i in data['turb_index']), data['heatmap'],
+                        data['x_coords'], data['y_coords'])
+
+        heatmap = np.loadtxt(file_path)
+        bounds = FlickerMismatch.get_turb_site(legacy_flicker_diam).bounds
+        _, heatmap_template = FlickerMismatch._setup_heatmap_template(bounds)
+        turb_index = FlickerMismatch.get_turb_pos_indices(heatmap_template)
+        return legacy_flicker_diam, turb_index, heatmap, heatmap_template[1], heatmap_template[2]
+
+    def get(self,
+            lat: float,
+            lon: float,
+            diameter: float,
+            steps_per_hour: int,
+            angles_per_step: Optional[int]
+            ) -> Optional[tuple]:
+        """
+        Loads the heat map with the same key, if it is in the library
+
+        :return: flicker data as returned by `load`, or None
+        """
+        key = self.key(lat, lon, diameter, steps_per_hour, angles_per_step)
+        index = self.index
+        match = np.ones(len(index), dtype=bool)
+        for col, value in zip(INDEX_COLUMNS[1:6], key):
+            match &= np.isclose(index[col].to_numpy(dtype=float), value)
+        if not match.any():
+            return None
+        return self.load(index['Filename'][np.flatnonzero(match)[0]])
+
+    def nearest(self,
+                lat: float,
+                lon: float,
+                diameter: Optional[float] = None
+                ) -> Optional[tuple]:
+        """
+        Loads the heat map of the nearest location in the library. Of the heat maps at that location, the one with the
+        closest turbine diameter is used, then the one with the most steps per hour and blade angles per step.
+
+        :param lat: latitude
+        :param lon: longitude
+        :param diameter: turbine diameter, if None any diameter
+        :return: flicker data as returned by `load`, or None if the library is empty
+        """
+        index = self.index
+        if not len(index):
+            return None
+        locations = index[['Lat', 'Lon']].to_numpy(dtype=float)
+        _, nearest = cKDTree(locations).query((lat, lon))
+        candidates = index[(locations == locations[nearest]).all(axis=1)]
+
+        diameter_error = (candidates['Diameter'] - diameter).abs() if diameter is not None else 0
+        candidates = candidates.assign(DiameterError=diameter_error,
+                                       Fidelity=candidates['StepsPerHour'] * candidates['AnglesPerStep'].clip(lower=1))
+        best = candidates.sort_values(['DiameterError', 'Fidelity'], ascending=[True, False]).iloc[0]
+        logger.info("FlickerHeatmapLibrary: using {} for ({}, {})".format(best['Filename'], lat, lon))
+        return self.load(best['Filename'])
@@ -1,12 +1,13 @@
-from typing import List, Union, Optional, Sequence
+from typing import List, Union, Optional, Sequence, Callable
 from pathlib import Path
 import copy
 from itertools import product
 import sys
 
-import multiprocessing_on_dill as mp
-import functools
+import multiprocessing as mp
+from multiprocessing import shared_memory
 import matplotlib.pyplot as plt
+from matplotlib.path import Path as PolygonPath
 sys.path.append('.')
 
 from shapely.geometry import MultiPoint, Polygon, Point, MultiPolygon, box
@@ -17,6 +18,7 @@ import PySAM.Pvwattsv8 as pv
 from hopp import ROOT_DIR
 from hopp.utilities.log import flicker_logger as logger
 from hopp.simulation.technologies.resource import SolarResource
+from hopp.simulation.technologies.resource.solar_resource import solar_resource_file_to_sam_data
 from hopp.simulation.technologies.layout.shadow_flicker import get_sun_pos, get_turbine_shadows_timeseries, create_pv_string_points
 from hopp.simulation.technologies.layout.pv_module import *
 
@@ -110,6 +112,7 @@ class FlickerMismatch:
 
         self.site_points = MultiPoint()
         self.array_string_points = []
+        self.module_arrays = None
         self.heat_map_template = None
 
         self.elv_ang = None
@@ -130,25 +133,15 @@ class FlickerMismatch:
             np.average(self.wind_dir if self.wind_dir is not None else 0),
             np.std((self.wind_dir if self.wind_dir is not None else 0)))
 
-        # mp
-        self.step_intervals = None
+    @property
+    def array_string_points(self) -> list:
+        """Points of the modules of each string of each solar array. Replacing them clears the cached module arrays"""
+        return self._array_string_points
 
-    def _create_pool(self,
-                     n_procs: int
-                     ) -> mp.Pool:
-        """
-        Initialize a multiprocessing pool where each simulation step can be partitioned (by modulo operator) to
-        split up work among different FlickerMismatch instances.
-        :param n_procs:
-        """
-        self.step_intervals = []
-        n_steps_per_process = int(self.n_steps / n_procs)
-        s = 0
-        for i in range(n_procs - 1):
-            self.step_intervals.append(range(s, s + n_steps_per_process))
-            s += n_steps_per_process
-        self.step_intervals.append(range(s, self.n_steps))
-        return mp.Pool(processes=n_procs)
+    @array_string_points.setter
+    def array_string_points(self, array_string_points: list):
+        self._array_string_points = array_string_points
+        self.module_arrays = None
 
     def _setup_wind_dir(self,
                         wind_dir_degrees):
@@ -174,7 +167,7 @@ class FlickerMismatch:
                 SolarResource(self.lat, self.lon, year=2012)
                 if not weather_path.is_file():
                     raise ValueError("resource file does not exist")
-            pv_model.SolarResource.solar_resource_file = str(weather_path)
+            pv_model.SolarResource.solar_resource_data = solar_resource_file_to_sam_data(weather_path)
         else:
             pv_model.SolarResource.solar_resource_data = self.solar_resource_data
         pv_model.execute(0)
@@ -364,6 +357,85 @@ class FlickerMismatch:
             #     plt.plot(x, y)
         # plt.show()
 
+    @staticmethod
+    def _string_module_arrays(array_points: list,
+                              gridcell_width: float,
+                              gridcell_height: float,
+                              xs_min: float,
+                              ys_min: float
+                              ) -> tuple:
+        """
+        Flatten the solar panels of the strings into arrays
+
+        :param array_points: list of solar panels, [# strands, # strings per strand, FlickerMismatch.modules_per_string]
+        :param gridcell_width: width of cells in the heat map
+        :param gridcell_height: height of cells in the heat map
+        :param xs_min: min of heat map grid's x coordinates
+        :param ys_min: min of heat map grid's y coordinates
+        :return: (n_modules, 2) array of module coordinates,
+                 string number of each module,
+                 index in its string of the first module at the same location,
+                 heat map x index of each module,
+                 heat map y index of each module
+        """
+        mods_xy = []
+        string_ind = []
+        module_ind = []
+        strings = [string for array in array_points if array for string in array]
+        for n, string in enumerate(strings):
+            string_xy = [pt.coords[0] for pt in string]
+            mods_xy += string_xy
+            module_ind += [string_xy.index(xy) for xy in string_xy]
+            string_ind += [n] * len(string)
+        mods_xy = np.array(mods_xy, dtype=float).reshape(-1, 2)
+        x_ind = np.round((mods_xy[:, 0] - xs_min) / gridcell_width).astype(int)
+        y_ind = np.round((mods_xy[:, 1] - ys_min) / gridcell_height).astype(int)
+        return mods_xy, np.array(string_ind, dtype=int), np.array(module_ind, dtype=int), x_ind, y_ind
+
+    def _get_module_arrays(self) -> tuple:
+        """
+        Arrays of the solar panels in array_string_points, computed on first use
+
+        :return: output of FlickerMismatch._string_module_arrays
+        """
+        if self.module_arrays is None:
+            self.module_arrays = FlickerMismatch._string_module_arrays(self.array_string_points,
+                                                                       self.gridcell_width, self.gridcell_height,
+                                                                       np.min(self.heat_map_template[1]),
+                                                                       np.min(self.heat_map_template[2]))
+        return self.module_arrays
+
+    @staticmethod
+    def _shaded_modules(shadow: Union[Polygon, MultiPolygon],
+                        mods_xy: np.ndarray
+                        ) -> np.ndarray:
+        """
+        Find which modules are within the shadow, by testing the modules within the shadow's bounds against each of the
+        shadow's rings as arrays
+
+        :param shadow: shadow (Multi)Polygon
+        :param mods_xy: (n_modules, 2) array of module coordinates
+        :return: boolean array of whether each module is shaded
+        """
+        min_x, min_y, max_x, max_y = shadow.bounds
+        shaded = (mods_xy[:, 0] >= min_x) & (mods_xy[:, 0] <= max_x) & \
+                 (mods_xy[:, 1] >= min_y) & (mods_xy[:, 1] <= max_y)
+        candidates = np.flatnonzero(shaded)
+        if not len(candidates):
+            return shaded
+
+        candidates_xy = mods_xy[candidates]
+        in_shadow = np.zeros(len(candidates), dtype=bool)
+        for poly in getattr(shadow, 'geoms', (shadow, )):
+            if not isinstance(poly, Polygon):
+                continue
+            in_poly = PolygonPath(np.asarray(poly.exterior.coords)).contains_points(candidates_xy)
+            for interior in poly.interiors:
+                in_poly &= ~PolygonPath(np.asarray(interior.coords)).contains_points(candidates_xy)
+            in_shadow |= in_poly
+        shaded[candidates] = in_shadow
+        return shaded
+
     @staticmethod
     def _calculate_power_loss(poa: float,
                               elv_ang: float,
@@ -374,11 +446,15 @@ class FlickerMismatch:
                               gridcell_height: float,
                               xs_min: float,
                               ys_min: float,
-                              poa_shading_ratio: float = 0.9
+                              poa_shading_ratio: float = 0.9,
+                              module_arrays: Optional[tuple] = None
                               ):
         """
         Update the heat map with flicker losses, using an unshaded string as baseline for normalizing
 
+        Shaded modules are found for all strings at once, and only the strings with shaded modules are simulated in
+        PVMismatch.
+
         :param poa: irradiance
         :param elv_ang: solar elevation degree
         :param shadows: list of shadow (Multi)Polygons for each blade angle
@@ -389,11 +465,17 @@ class FlickerMismatch:
         :param xs_min: min of heat map grid's x coordinates
         :param ys_min: min of heat map grid's y coordinates
         :param poa_shading_ratio: how much of the poa is blocked by the shadow
+        :param module_arrays: output of FlickerMismatch._string_module_arrays for array_points, computed if not given
         """
         poa_suns = poa/1000
         if elv_ang < 0 or poa_suns < 1e-3:
             return 0, 0
 
+        if module_arrays is None:
+            module_arrays = FlickerMismatch._string_module_arrays(array_points, gridcell_width, gridcell_height,
+                                                                  xs_min, ys_min)
+        mods_xy, string_ind, module_ind, x_ind, y_ind = module_arrays
+
         heat_map_flicker_new = np.zeros(heat_map_flicker.shape)
 
         mods_per_string = len(array_points[0][0])
@@ -409,59 +491,43 @@ class FlickerMismatch:
         suns_memo = dict()
         suns_memo['hits'] = 0
 
+        shaded_poa_suns = poa_suns * (1 - poa_shading_ratio)
         for shadow in shadows:
             ht_map = np.zeros(heat_map_flicker.shape)
 
-            for array in array_points:
-                if not array:
-                    continue
-
-                for string in array:
-                    shaded_module_points = MultiPoint(string).intersection(shadow)
-
-                    if shaded_module_points.is_empty:
-                        continue
-                    elif isinstance(shaded_module_points, Point):
-                        shaded_module_points = (shaded_module_points, )
-                    # else:
-                    #     shaded_module_points = shaded_module_points.geoms
-
-                    shaded_poa_suns = poa_suns * (1 - poa_shading_ratio)
-                    shaded_indices = []
-                    if isinstance(shaded_module_points, MultiPoint):
-                        for mod in shaded_module_points.geoms:
-                            shaded_indices.append(int(np.argmin([(mod.x - m.x) ** 2 + (mod.y - m.y) ** 2 for m in string])))
-                    else:
-                        for mod in shaded_module_points:
-                            shaded_indices.append(int(np.argmin([(mod.x - m.x) ** 2 + (mod.y - m.y) ** 2 for m in string])))
-                    shaded_indices = tuple(shaded_indices)
-                    if shaded_indices in suns_memo.keys():
-                        flicker_loss = suns_memo[shaded_indices]
-                        suns_memo['hits'] += 1
+            shaded = FlickerMismatch._shaded_modules(shadow, mods_xy)
+            shaded_strings = np.unique(string_ind[shaded])
+            if not len(shaded_strings):
+                continue
+
+            string_losses = np.zeros(len(shaded_strings))
+            for n, string in enumerate(shaded_strings):
+                shaded_indices = tuple(np.unique(module_ind[shaded & (string_ind == string)]).tolist())
+                if shaded_indices in suns_memo.keys():
+                    flicker_loss = suns_memo[shaded_indices]
+                    suns_memo['hits'] += 1
+                else:
+                    sun_dict = copy.deepcopy(sun_dict_unshaded)
+                    for index in shaded_indices:
+                        sun_dict[index] = [(shaded_poa_suns,) * 96, cell_num_map_flat]
+                    pvsys.setSuns({0: sun_dict})
+                    flicker_loss = (kwh_unshaded - pvsys.Pmp) / kwh_unshaded
+                    suns_memo[shaded_indices] = flicker_loss
+                string_losses[n] = flicker_loss
+
+            # every module of a shaded string gets the string's loss, in the order of the strings
+            mods = np.flatnonzero(np.isin(string_ind, shaded_strings))
+            mods_loss = string_losses[np.searchsorted(shaded_strings, string_ind[mods])]
+            if FlickerMismatch.periodic:
+                for y, x, flicker_loss in zip(y_ind[mods], x_ind[mods], mods_loss):
+                    if ht_map[y, x] == 0:
+                        ht_map[y, x] = flicker_loss
                     else:
-                        sun_dict = copy.deepcopy(sun_dict_unshaded)
-                        for index in shaded_indices:
-                            sun_dict[index] = [(shaded_poa_suns,) * 96, cell_num_map_flat]
-                        pvsys.setSuns({0: sun_dict})
-                        flicker_loss = (kwh_unshaded - pvsys.Pmp) / kwh_unshaded
-                        suns_memo[shaded_indices] = flicker_loss
-
-                    for pt in string:
-                        x_ind = int(round((pt.x - xs_min) / gridcell_width))
-                        y_ind = int(round((pt.y - ys_min) / gridcell_height))
-                        if FlickerMismatch.periodic:
-                            if ht_map[y_ind, x_ind] == 0:
-                                ht_map[y_ind, x_ind] = flicker_loss
-                            else:
-                                # if reusing a module, take the average
-                                ht_map[y_ind, x_ind] = (ht_map[y_ind, x_ind] + flicker_loss)/2
-                        else:
-                            ht_map[y_ind, x_ind] = flicker_loss
-                    # print(shaded_module_points)
-                # print()
+                        # if reusing a module, take the average
+                        ht_map[y, x] = (ht_map[y, x] + flicker_loss) / 2
+            else:
+                ht_map[y_ind[mods], x_ind[mods]] = mods_loss
             heat_map_flicker_new += ht_map
-        # plt.show()
-        # print(suns_memo)
         heat_map_flicker += heat_map_flicker_new
 
     def _calculate_turbine_shadow(self,
@@ -505,13 +571,13 @@ class FlickerMismatch:
         for i in weight_option:
             if i == "poa":
                 by_poa = True
-                heat_map_shadow = copy.deepcopy(self.heat_map_template[0])
+                heat_map_shadow = np.zeros_like(self.heat_map_template[0])
             elif i == "power":
                 by_power = True
-                heat_map_flicker = copy.deepcopy(self.heat_map_template[0])
+                heat_map_flicker = np.zeros_like(self.heat_map_template[0])
             elif i == "time":
                 by_time = True
-                heat_map_time = copy.deepcopy(self.heat_map_template[0])
+                heat_map_time = np.zeros_like(self.heat_map_template[0])
             else:
                 raise ValueError("Unrecognized 'weight_option'")
 
@@ -520,10 +586,14 @@ class FlickerMismatch:
                              "from the set ('poa', 'power', 'time')")
 
         if by_poa or by_power:
-            if not isinstance(self.poa, Sequence):
+            if self.poa is None:
                 self._setup_irradiance()
             total_poa = sum(self.poa[steps])
 
+        if by_power:
+            xs, ys = np.min(self.heat_map_template[1]), np.min(self.heat_map_template[2])
+            module_arrays = self._get_module_arrays()
+
         progress_size = int(len(steps) / min(10, len(steps)))
         for i, step in enumerate(steps):
             if i % progress_size == 0:
@@ -542,10 +612,10 @@ class FlickerMismatch:
                                                    heat_map_shadow, self.gridcell_width, self.gridcell_height)
 
             if by_power:
-                xs, ys = np.min(self.heat_map_template[1]), np.min(self.heat_map_template[2])
                 FlickerMismatch._calculate_power_loss(self.poa[hr], self.elv_ang[i], shadows,
                                                       self.array_string_points,
-                                                      heat_map_flicker, self.gridcell_width, self.gridcell_height, xs, ys)
+                                                      heat_map_flicker, self.gridcell_width, self.gridcell_height, xs, ys,
+                                                      module_arrays=module_arrays)
 
             if by_time:
                 FlickerMismatch._calculate_shading(1, shadows, self.site_points,
@@ -573,50 +643,103 @@ class FlickerMismatch:
         logger.info("Finished heat maps")
         return tuple(heat_maps_to_return)
 
+    @staticmethod
+    def chunk_steps(intervals: Sequence[range],
+                    chunk_size: int
+                    ) -> List[range]:
+        """
+        Splits ranges of simulation steps into contiguous chunks
+
+        :param intervals: list of ranges of steps
+        :param chunk_size: maximum number of steps per chunk
+        :return: list of ranges with at most chunk_size steps each
+        """
+        chunk_size = max(1, int(chunk_size))
+        return [range(start, min(start + chunk_size, interval.stop))
+                for interval in intervals
+                for start in range(interval.start, interval.stop, chunk_size)]
+
     def run_parallel(self,
                      n_procs: int,
                      weight_option: tuple,
-                     intervals: Optional[Sequence[range]] = None
+                     intervals: Optional[Sequence[range]] = None,
+                     chunk_size: Optional[int] = None,
+                     scheduler: Optional[Callable[[Sequence[range], int], Sequence[range]]] = None
                      ):
         """
-        Runs create_heat_maps_irradiance in parallel
+        Runs create_heat_maps in parallel
+
+        The steps are split into chunks which are handed out to the worker processes as they become free. Workers
+        inherit this instance when the pool is forked, or receive a copy once when processes can only be spawned, and
+        add the heat maps of each chunk, weighted by the chunk's share of the total, into heat maps in shared memory.
+        Only the chunks' ranges are sent between processes for each chunk.
 
-        :param n_procs:
+        :param n_procs: number of processes
         :param weight_option: tuple of selected weighting options, producing a heatmap each
             - "poa": weight by plane-of-array irradiance
             - "power": weight by power loss of pvmismatch module
             - "time": weight by number of timesteps shaded
         :param intervals: list of ranges to simulate; if none, simulate entire weather file's records
-        :return: heat_map_shadow, heat_map_flicker
+        :param chunk_size: number of steps per chunk; if none, there are about 4 chunks per process
+        :param scheduler: function of (intervals, n_procs) returning the list of ranges to run as chunks, replacing
+            the default contiguous chunks of chunk_size steps
+        :return: tuple of heat maps in the order of weight_option
         """
         logger.info("run_parallel with {} processes".format(n_procs))
-        pool = self._create_pool(n_procs)
         if intervals is None:
-            intervals = self.step_intervals
+            intervals = (range(0, self.n_steps), )
+
+        if scheduler is None:
+            if chunk_size is None:
+                chunk_size = int(np.ceil(sum(len(i) for i in intervals) / (4 * n_procs)))
+            chunks = FlickerMismatch.chunk_steps(intervals, chunk_size)
+        else:
+            chunks = [c for c in scheduler(intervals, n_procs) if len(c)]
 
         if 'power' in weight_option or 'poa' in weight_option:
             self._setup_irradiance()
-
-        results = pool.imap(functools.partial(self.create_heat_maps, weight_option=weight_option),
-                            intervals)
-
-        # aggregate results and renormalize
-        heat_maps_to_return = [copy.deepcopy(self.heat_map_template[0]) for _ in weight_option]
-
         if 'power' in weight_option:
-            subhourly_poa = np.repeat(self.poa, FlickerMismatch.steps_per_hour)
-            total_poa = sum([sum(subhourly_poa[i]) for i in intervals])
-        total_steps = sum([len(i) for i in intervals])
-        for r, i in zip(results, intervals):
-            for j, hm in enumerate(heat_maps_to_return):
-                if weight_option[j] == 'poa':
-                    hm += r[j] * sum(self.poa[i]) / total_poa
-                elif weight_option[j] == 'power' or weight_option[j] == 'time':
-                    hm += r[j] * len(i) / total_steps
+            self._get_module_arrays()
+
+        # weight of each chunk's normalized heat maps in the aggregated heat maps
+        total_steps = sum(len(c) for c in chunks)
+        if 'poa' in weight_option:
+            total_poa = sum(sum(self.poa[c]) for c in chunks)
+        chunk_weights = []
+        for c in chunks:
+            weights = []
+            for option in weight_option:
+                if option == 'poa':
+                    weights.append(sum(self.poa[c]) / total_poa)
+                else:
+                    weights.append(len(c) / total_steps)
+            chunk_weights.append(tuple(weights))
+
+        template = self.heat_map_template[0]
+        shape = (len(weight_option), ) + template.shape
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(float).itemsize)
+        try:
+            heat_maps = np.ndarray(shape, dtype=float, buffer=shm.buf)
+            heat_maps[:] = 0
+            # forked workers inherit this instance, spawned workers (i.e. on Windows) receive a pickled copy
+            ctx = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+            class_properties = [(cls, {k: v for k, v in vars(cls).items()
+                                       if not k.startswith('_') and isinstance(v, (bool, int, float, str))})
+                                for cls in type(self).__mro__[:-1]]
+            with ctx.Pool(processes=min(n_procs, len(chunks)),
+                          initializer=_init_heat_map_worker,
+                          initargs=(self, class_properties, weight_option, shm.name, shape, ctx.Lock())) as pool:
+                for _ in pool.imap_unordered(_accumulate_heat_maps, zip(chunks, chunk_weights)):
+                    pass
+            heat_maps_to_return = tuple(hm.copy() for hm in heat_maps)
+            del heat_maps
+        finally:
+            shm.close()
+            shm.unlink()
 
         logger.info("Create_heat_map success")
 
-        return tuple(heat_maps_to_return)
+        return heat_maps_to_return
 
     def plot_on_site(self,
                      plot_array=True,
@@ -639,3 +762,33 @@ class FlickerMismatch:
                     ys = [point.y for point in s]
                     plt.scatter(xs, ys)
         return axs
+
+
+# instance, weight options, shared heat maps and their lock of each worker process of FlickerMismatch.run_parallel
+_heat_map_worker = None
+
+
+def _init_heat_map_worker(flicker: FlickerMismatch,
+                          class_properties: list,
+                          weight_option: tuple,
+                          shm_name: str,
+                          shape: tuple,
+                          lock):
+    global _heat_map_worker
+    # model properties are class attributes, which spawned processes do not inherit
+    for cls, properties in class_properties:
+        for name, value in properties.items():
+            setattr(cls, name, value)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    heat_maps = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    _heat_map_worker = (flicker, weight_option, heat_maps, lock, shm)
+
+
+def _accumulate_heat_maps(chunk: tuple):
+    steps, weights = chunk
+    flicker, weight_option, heat_maps, lock, _ = _heat_map_worker
+    results = flicker.create_heat_maps(steps, weight_option)
+    with lock:
+        for heat_map, result, weight in zip(heat_maps, results, weights):
+            if weight:
+                heat_map += result * weight
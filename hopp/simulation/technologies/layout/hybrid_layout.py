@@ -7,14 +7,24 @@ from hopp.simulation.technologies.layout.wind_layout import WindLayout, WindBoun
 from hopp.simulation.technologies.layout.pv_layout import PVLayout, PVGridParameters
 from hopp.simulation.technologies.layout.pv_layout_tools import get_flicker_loss_multiplier
 from hopp.simulation.technologies.layout.flicker_mismatch import FlickerMismatch
+from hopp.simulation.technologies.layout.flicker_library import FlickerHeatmapLibrary
 from hopp.simulation.technologies.sites.site_info import SiteInfo
+from hopp.utilities.log import hybrid_logger as logger
 
 class HybridLayout:
     def __init__(self,
                  site: SiteInfo,
                  power_sources: dict,
-                 flicker_load_nearest: bool = True):
+                 flicker_load_nearest: bool = True,
+                 flicker_library: Optional[FlickerHeatmapLibrary] = None):
+        """
+        :param flicker_library: optional writable library of generated flicker heat maps. If given, the heat maps that
+            are generated when `flicker_load_nearest` is False are looked up in and saved to it, otherwise they are
+            regenerated each time
+        """
         self.site: SiteInfo = site
+        self.shipped_flicker_library = FlickerHeatmapLibrary()
+        self.flicker_library = flicker_library
         self.pv: Optional[PVLayout] = None
         self.wind: Optional[WindLayout] = None
         for source, model in power_sources.items():
@@ -34,16 +44,20 @@ class HybridLayout:
     def _load_flicker_data(self,
                            flicker_load_nearest: bool):
         """
-        Try to load the file containing the flicker heat map of a single turbine for the lat, lon. This flicker heat
-        map was generated separately using flicker_mismatch.py for a (lat, lon). It was computed with these settings:
-            `diam_mult` identifies how many diameters to the left, right and above of the turbine is in the grid
-                while 4 diameters to the bottom are inside the grid
-            `flicker_diam` identifies the size of the turbine in the flicker model and how to scale the results to =
-                turbines of different sizes
-            `steps_per_hour` is the timestep interval of shadow calculation
-            `angles_per_step` is how many different angles of the blades are calculated per timestep
-
-        If not flicker_load_nearest, generate a low-resolution flicker heat map
+        Load the flicker heat map of a single turbine for the lat, lon from the flicker heat map library. The heat maps
+        were generated separately using flicker_mismatch.py for a (lat, lon). The ones shipped with HOPP in
+        `FLICKER_DATA_DIR`, for the flatirons (39.8, -105.2) and Texas panhandle (35.2, -101.9) resource files, were
+        computed with the same low-resolution settings as the fallback below:
+            `flicker_diam` of 70 m, the size of the turbine in the flicker model, results are scaled to turbines of
+                different sizes
+            90 x 90 m grid cells with one grid cell per string
+            `steps_per_hour` of FlickerMismatch.steps_per_hour, the timestep interval of shadow calculation
+            `angles_per_step` of None, the blade angles are not modeled
+
+        If flicker_load_nearest, use the heat map of the nearest location shipped with HOPP. Otherwise, use the
+        low-resolution heat map for this location and turbine diameter in `flicker_library`, if one was given. If neither
+        is found, a warning is logged and a low-resolution flicker heat map is generated, which runs a year-long shadow
+        simulation and takes about a minute, and is added to `flicker_library`.
 
         :return: tuple:
                     (turbine diameter,
@@ -52,38 +66,30 @@ class HybridLayout:
                      x_coordinates of grid,
                      y_coordinates of grid)
         """
+        lat, lon = self.site.data['lat'], self.site.data['lon']
+        flicker_diam = self.wind.rotor_diameter
         if flicker_load_nearest:
             # pre-processed detailed flicker heat map
-            existing_locations = [[33.209, -108.283],
-                                  [36.334, -119.769],
-                                  [39.7555, -105.2211]]
-            current_location = [self.site.data['lat'], self.site.data['lon']]
-            distance = np.array(existing_locations) - np.array(current_location)
-            distance = np.linalg.norm(distance, axis=1)
-            min_dist_location = existing_locations[int(np.argmin(distance))]
-            flicker_diam = 70  # meters, of the turbine used in flicker modeling
-            steps_per_hour = 4
-            angles_per_step = 12
-            data_path = Path(__file__).parent / "flicker_data"
-            flicker_path = data_path / "{}_{}_{}_{}_shadow.txt".format(min_dist_location[0],
-                                                                       min_dist_location[1],
-                                                                       steps_per_hour, angles_per_step)
-            flicker_heatmap = np.loadtxt(flicker_path)
-
-            bounds = FlickerMismatch.get_turb_site(flicker_diam).bounds
-            _, heatmap_template = FlickerMismatch._setup_heatmap_template(bounds)
-        else:
-            flicker_diam = self.wind.rotor_diameter
-            flicker_no_tower = FlickerMismatch(self.site.data['lat'], self.site.data['lon'],
-                                               blade_length=flicker_diam // 2,
-                                               angles_per_step=None,
-                                               gridcell_height=90, gridcell_width=90, gridcells_per_string=1)
-
-            (flicker_heatmap,) = flicker_no_tower.create_heat_maps(range(8760), ("power",))
-            heatmap_template = flicker_no_tower.heat_map_template
+            self._flicker_data = self.shipped_flicker_library.nearest(lat, lon, flicker_diam)
+        elif self.flicker_library is not None:
+            self._flicker_data = self.flicker_library.get(lat, lon, flicker_diam, FlickerMismatch.steps_per_hour, None)
+        if self._flicker_data is not None:
+            return
+
+        logger.warning("HybridLayout: no flicker heat map found for ({}, {}) with a {} m rotor diameter, generating "
+                       "one".format(lat, lon, flicker_diam))
+        flicker_no_tower = FlickerMismatch(lat, lon,
+                                           blade_length=flicker_diam // 2,
+                                           angles_per_step=None,
+                                           gridcell_height=90, gridcell_width=90, gridcells_per_string=1)
+
+        (flicker_heatmap,) = flicker_no_tower.create_heat_maps(range(8760), ("power",))
+        heatmap_template = flicker_no_tower.heat_map_template
 
         turb_x_ind, turb_y_ind = FlickerMismatch.get_turb_pos_indices(heatmap_template)
         self._flicker_data = flicker_diam, (turb_x_ind, turb_y_ind), flicker_heatmap, heatmap_template[1], heatmap_template[2]
+        if self.flicker_library is not None:
+            self.flicker_library.save(self._flicker_data, lat, lon, FlickerMismatch.steps_per_hour, None)
 
     def calculate_flicker_loss(self):
         # get solar capacity after flicker losses
@@ -204,6 +204,58 @@ def place_solar_strands(max_num_modules: int,
     return (max_num_modules - num_modules_remaining), strands
 
 
+def strand_module_coordinates(primary_strands: List[Tuple[int, float, LineString]],
+                              module_distance: float,
+                              x_bounds: np.ndarray,
+                              y_bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Locations of the modules of straight solar strands that lie within each of a set of rectangles, where modules are
+    laid out every `module_distance` from where each strand enters the rectangle.
+
+    Strands are clipped to all rectangles at once (Liang-Barsky), which is the same as intersecting each rectangle with
+    each strand in Shapely and interpolating the modules along the intersection.
+
+    :param primary_strands: list of (num_modules, length, shapely.geometry.LineString) of straight strands
+    :param module_distance: distance between modules along a strand
+    :param x_bounds: (n_rect, 2) array of min and max x of each rectangle
+    :param y_bounds: (n_rect, 2) array of min and max y of each rectangle
+    :return: index of the rectangle of each module, module x coordinates, module y coordinates
+    """
+    ends = np.array([(row[2].coords[0], row[2].coords[-1]) for row in primary_strands], dtype=float)
+    start = ends[:, 0, :]
+    delta = ends[:, 1, :] - start
+    strand_length = np.hypot(delta[:, 0], delta[:, 1])
+
+    t_enter = np.zeros((len(x_bounds), len(primary_strands)))
+    t_exit = np.ones_like(t_enter)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for axis, bounds in enumerate((x_bounds, y_bounds)):
+            lower = bounds[:, 0:1] - start[:, axis]
+            upper = bounds[:, 1:2] - start[:, axis]
+            parallel = delta[:, axis] == 0
+            t_lower = lower / delta[:, axis]
+            t_upper = upper / delta[:, axis]
+            t_enter = np.maximum(t_enter, np.where(parallel, 0, np.minimum(t_lower, t_upper)))
+            t_exit = np.minimum(t_exit, np.where(parallel, 1, np.maximum(t_lower, t_upper)))
+            outside = parallel & ((lower > 0) | (upper < 0))
+            t_exit[outside] = -1
+
+    clipped_length = np.clip(t_exit - t_enter, 0, None) * strand_length
+    num_modules = np.ceil(clipped_length * (1 + 1e-6) / module_distance).astype(int)
+
+    rect_ind, strand_ind = np.nonzero(num_modules)
+    counts = num_modules[rect_ind, strand_ind]
+    first = np.cumsum(counts) - counts
+    module_ind = np.arange(counts.sum()) - np.repeat(first, counts)
+
+    rect_ind = np.repeat(rect_ind, counts)
+    strand_ind = np.repeat(strand_ind, counts)
+    unit = delta[strand_ind] / strand_length[strand_ind, None]
+    distance = t_enter[rect_ind, strand_ind] * strand_length[strand_ind] + module_ind * module_distance
+    mods = start[strand_ind] + unit * distance[:, None]
+    return rect_ind, mods[:, 0], mods[:, 1]
+
+
 def get_flicker_loss_multiplier(flicker_data: Tuple[float, np.ndarray, np.ndarray, np.ndarray],
                                 turbine_coords_x: list,
                                 turbine_coords_y: list,
@@ -213,6 +265,10 @@ def get_flicker_loss_multiplier(flicker_data: Tuple[float, np.ndarray, np.ndarra
                                 module_points: MultiPoint=None):
     """
     Aggregated loss multiplier of solar output in primary strands due to turbine flicker
+
+    Module coordinates are found for all turbines at once as arrays and looked up in the heatmap by their offset from
+    each turbine. Modules whose offset falls outside the heatmap grid have no flicker loss.
+
     :param flicker_data: (turbine diameter used in flicker modeling,
                           indicies of location of turbine,
                           2-D array containing flicker loss multiplier at x, y coordinates (0-1, 0 is no loss),
@@ -220,9 +276,10 @@ def get_flicker_loss_multiplier(flicker_data: Tuple[float, np.ndarray, np.ndarra
                           y_coordinates of grid)
     :param turbine_coords_x: list of turbine locations x coordinates
     :param turbine_coords_y: list of turbine locations y coordinates
-    :param turbine_diameter: the diameter of turbines in meters
+    :param turbine_diameter: the diameter of turbines in meters, the heat map is scaled from the flicker model's
+        turbine diameter to this one
     :param module_dimensions: tuple of module width & height in meters
-    :param primary_strands: list of (num_modules, length, shapely.geometry.String) of strands of solar panels
+    :param primary_strands: list of (num_modules, length, shapely.geometry.String) of straight strands of solar panels
     :param module_points: MultiPoint object with module locations
     :return: loss multiplier
     """
@@ -242,66 +299,43 @@ def get_flicker_loss_multiplier(flicker_data: Tuple[float, np.ndarray, np.ndarra
         raise ValueError("Only one of `primary_strands` and `module_points` must be provided.")
     
     turb_diam = flicker_data[0]
-    # TODO: implement different flicker table for larger turbine
-    # if abs(turb_diam - turbine_diameter) > 10:
-    #     raise NotImplementedError("Scaling of flicker look up table to different turbine diameters not implemented yet")
-    
     turb_index = flicker_data[1]
     heatmap = flicker_data[2]
-    x_coords, y_coords = flicker_data[3], flicker_data[4]
+
+    # the dimensions of the turbine's shadows are proportional to its diameter, so scale the heat map's grid to match
+    diam_scale = turbine_diameter / turb_diam
+    x_coords, y_coords = np.asarray(flicker_data[3]) * diam_scale, np.asarray(flicker_data[4]) * diam_scale
     
     x_min, x_max = x_coords[0], x_coords[-1]
     y_min, y_max = y_coords[0], y_coords[-1]
     turb_x, turb_y = x_coords[turb_index[0]], y_coords[turb_index[1]]
-    active_area_around_turbine = Polygon(((x_min, y_min),
-                                          (x_min, y_max),
-                                          (x_max, y_max),
-                                          (x_max, y_min)))
     gridcell_width = x_coords[1] - x_coords[0]
     gridcell_height = y_coords[1] - y_coords[0]
-    
-    flicker_power = total_power
-    num_turbines = len(turbine_coords_x)
-    for n in range(num_turbines):
-        t_x = turbine_coords_x[n]
-        t_y = turbine_coords_y[n]
-        dx, dy = t_x - turb_x, t_y - turb_y
-        active_area_translated = translate(active_area_around_turbine, dx, dy)
-
-        modules = []
-        if mode == 'strands':
-            with warnings.catch_warnings():
-                # if intersection is empty will get warnings, turn those off
-                warnings.simplefilter("ignore")
-                active_segments = map(active_area_translated.intersection, [row[2] for row in primary_strands])
-                for i, s in enumerate(active_segments):
-                    if not s.is_empty:
-                        # figure out the orientation of the modules, whether the module_distance is laid out by width or by height
-                        length_per_module = primary_strands[0][1] / primary_strands[0][0] 
-                        module_distance = module_dimensions[np.argmin([abs(d - length_per_module) for d in module_dimensions])]
 
-                        distances = np.arange(0, s.length * (1 + 1e-6), module_distance)
-                        modules += [s.interpolate(distance) for distance in distances]
-        if mode == "points":
-            modules = active_area_translated.intersection(module_points)
-            if modules.is_empty:
-                modules = []
-            if isinstance(modules, MultiPoint):
-                modules = modules.geoms
+    # active area around each turbine
+    t_x = np.asarray(turbine_coords_x, dtype=float)
+    t_y = np.asarray(turbine_coords_y, dtype=float)
+    x_bounds = np.column_stack((x_min + (t_x - turb_x), x_max + (t_x - turb_x)))
+    y_bounds = np.column_stack((y_min + (t_y - turb_y), y_max + (t_y - turb_y)))
 
-        # if len(modules) == 0:
-        #     continue
-
-        mods_x = np.array([p.x for p in modules])
-        mods_y = np.array([p.y for p in modules])
-        mods_dx_from_t = mods_x - t_x
-        mods_dy_from_t = mods_y - t_y
+    if mode == 'strands':
+        # figure out the orientation of the modules, whether the module_distance is laid out by width or by height
+        length_per_module = primary_strands[0][1] / primary_strands[0][0]
+        module_distance = module_dimensions[np.argmin([abs(d - length_per_module) for d in module_dimensions])]
+        turb_ind, mods_x, mods_y = strand_module_coordinates(primary_strands, module_distance, x_bounds, y_bounds)
+    else:
+        points = np.array([(p.x, p.y) for p in module_points.geoms], dtype=float)
+        in_area = (points[:, 0] >= x_bounds[:, 0:1]) & (points[:, 0] <= x_bounds[:, 1:2]) \
+            & (points[:, 1] >= y_bounds[:, 0:1]) & (points[:, 1] <= y_bounds[:, 1:2])
+        turb_ind, mod_ind = np.nonzero(in_area)
+        mods_x, mods_y = points[mod_ind, 0], points[mod_ind, 1]
 
-        # map from dist(module, turbine t) to dist(heatmap grid coordinate, turbine in flicker model)
-        x_coords_ind = ((mods_dx_from_t - x_min) / gridcell_width).round().astype(int)
-        y_coords_ind = ((mods_dy_from_t - y_min) / gridcell_height).round().astype(int)
-        flicker_val = heatmap[y_coords_ind, x_coords_ind]
-        flicker_power -= sum(flicker_val)
+    # map from dist(module, turbine t) to dist(heatmap grid coordinate, turbine in flicker model)
+    x_coords_ind = np.round((mods_x - t_x[turb_ind] - x_min) / gridcell_width).astype(int)
+    y_coords_ind = np.round((mods_y - t_y[turb_ind] - y_min) / gridcell_height).astype(int)
+    in_grid = (x_coords_ind >= 0) & (x_coords_ind < heatmap.shape[1]) \
+        & (y_coords_ind >= 0) & (y_coords_ind < heatmap.shape[0])
+    flicker_power = total_power - heatmap[y_coords_ind[in_grid], x_coords_ind[in_grid]].sum()
 
     return flicker_power / total_power
 
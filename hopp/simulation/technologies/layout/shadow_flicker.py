@@ -1,5 +1,6 @@
 from typing import Union, Tuple, Optional, List
 import datetime
+import functools
 import pytz
 
 import matplotlib.pyplot as plt
@@ -10,21 +11,102 @@ from shapely.geometry import Polygon, MultiPolygon, MultiPoint
 from shapely.ops import unary_union
 import timezonefinder
 from pysolar.solar import *
+from pysolar import constants, solartime as stime
 from pvmismatch import *
 
 from hopp.simulation.technologies.layout.pv_module import *
 
 
+@functools.lru_cache(maxsize=None)
+def get_timezone_finder() -> timezonefinder.TimezoneFinder:
+    """
+    Returns a TimezoneFinder shared within the process, as loading its timezone data is slow
+    """
+    return timezonefinder.TimezoneFinder()
+
+
+@functools.lru_cache(maxsize=1024)
 def get_time_zone(lat: float,
                   lon: float
                   ) -> pytz.tzinfo:
-    timezone_str = timezonefinder.TimezoneFinder().certain_timezone_at(lat=lat, lng=lon)
+    timezone_str = get_timezone_finder().certain_timezone_at(lat=lat, lng=lon)
     if timezone_str is None:
         raise ValueError("Could not determine the time zone")
     else:
         return pytz.timezone(timezone_str)
 
 
+def get_sun_pos_utc(lat: float,
+                    lon: float,
+                    utc_times: np.ndarray
+                    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the sun azimuth & elevation angles for an array of UTC times at once, using the same NREL SPA
+    implementation as pysolar's `get_azimuth` and `get_altitude`
+
+    :param lat: latitude, degrees
+    :param lon: longitude, degrees
+    :param utc_times: array of numpy datetime64 UTC times
+
+    :returns: array of sun azimuth, array of sun elevation
+    """
+    utc_times = np.asarray(utc_times, dtype='datetime64[us]')
+    timestamps = (utc_times - np.datetime64(0, 'us')) / np.timedelta64(1, 's')
+
+    # leap seconds and delta t only change by month
+    months = utc_times.astype('datetime64[M]')
+    leap_seconds = np.zeros(len(utc_times))
+    delta_t = np.zeros(len(utc_times))
+    for month in np.unique(months):
+        month_start = month.astype(datetime.datetime).replace(day=1)
+        when = datetime.datetime(month_start.year, month_start.month, 1, tzinfo=datetime.timezone.utc)
+        in_month = months == month
+        leap_seconds[in_month] = stime.get_leap_seconds(when)
+        delta_t[in_month] = stime.get_delta_t(when)
+
+    day_offset = stime.gregorian_day_offset + stime.julian_day_offset
+    jd = (timestamps + leap_seconds + stime.tt_offset - delta_t) / constants.seconds_per_day + day_offset
+    jde = (timestamps + leap_seconds + stime.tt_offset) / constants.seconds_per_day + day_offset
+
+    # pysolar.solar.get_topocentric_position, from the julian days onward
+    projected_radial_distance = get_projected_radial_distance(0, lat)
+    projected_axial_distance = get_projected_axial_distance(0, lat)
+    jce = stime.get_julian_ephemeris_century(jde)
+    jme = stime.get_julian_ephemeris_millennium(jce)
+    geocentric_latitude = get_geocentric_latitude(jme)
+    geocentric_longitude = get_geocentric_longitude(jme)
+    sun_earth_distance = get_sun_earth_distance(jme)
+    aberration_correction = get_aberration_correction(sun_earth_distance)
+    equatorial_horizontal_parallax = get_equatorial_horizontal_parallax(sun_earth_distance)
+    nutation = get_nutation(jce)
+    apparent_sidereal_time = get_apparent_sidereal_time(jd, jme, nutation)
+    true_ecliptic_obliquity = get_true_ecliptic_obliquity(jme, nutation)
+
+    apparent_sun_longitude = get_apparent_sun_longitude(geocentric_longitude, nutation, aberration_correction)
+    geocentric_sun_right_ascension = get_geocentric_sun_right_ascension(apparent_sun_longitude,
+                                                                        true_ecliptic_obliquity,
+                                                                        geocentric_latitude)
+    geocentric_sun_declination = get_geocentric_sun_declination(apparent_sun_longitude,
+                                                                true_ecliptic_obliquity,
+                                                                geocentric_latitude)
+    local_hour_angle = get_local_hour_angle(apparent_sidereal_time, lon, geocentric_sun_right_ascension)
+    parallax_sun_right_ascension = get_parallax_sun_right_ascension(projected_radial_distance,
+                                                                    equatorial_horizontal_parallax,
+                                                                    local_hour_angle,
+                                                                    geocentric_sun_declination)
+    topocentric_local_hour_angle = get_topocentric_local_hour_angle(local_hour_angle, parallax_sun_right_ascension)
+    topocentric_sun_declination = get_topocentric_sun_declination(geocentric_sun_declination,
+                                                                  projected_axial_distance,
+                                                                  equatorial_horizontal_parallax,
+                                                                  parallax_sun_right_ascension,
+                                                                  local_hour_angle)
+
+    azi_ang = get_topocentric_azimuth_angle(topocentric_local_hour_angle, lat, topocentric_sun_declination)
+    elv_ang = get_topocentric_elevation_angle(lat, topocentric_sun_declination, topocentric_local_hour_angle)
+    elv_ang = elv_ang + get_refraction_correction(constants.standard_pressure, constants.standard_temperature, elv_ang)
+    return azi_ang, elv_ang
+
+
 def get_sun_pos(lat: float,
                 lon: float,
                 step_in_minutes: float = 60,
@@ -46,16 +128,15 @@ def get_sun_pos(lat: float,
     """
     if steps:
         start = datetime.datetime(2012, 1, 1, 0, 0, 0, 0, tzinfo=get_time_zone(lat, lon))
-        date_generated = [start + datetime.timedelta(minutes=x * step_in_minutes) for x in steps]
     else:
         start = datetime.datetime(2012, 1, 1, start_hr, 0, 0, 0, tzinfo=get_time_zone(lat, lon))
-        date_generated = [start + datetime.timedelta(minutes=x * step_in_minutes) for x in range(n)]
+        steps = range(n)
+    date_generated = [start + datetime.timedelta(minutes=x * step_in_minutes) for x in steps]
 
-    azi_ang = np.zeros(len(date_generated))
-    elv_ang = np.zeros(len(date_generated))
-    for tt, date in enumerate(date_generated):
-        azi_ang[tt] = get_azimuth(lat, lon, date)
-        elv_ang[tt] = get_altitude(lat, lon, date)
+    # all entries share the start's UTC offset
+    start_utc = np.datetime64(start.replace(tzinfo=None) - start.utcoffset(), 'us')
+    offsets_us = np.round(np.asarray(steps, dtype=float) * step_in_minutes * 60e6).astype('int64')
+    azi_ang, elv_ang = get_sun_pos_utc(lat, lon, start_utc + offsets_us.astype('timedelta64[us]'))
     return azi_ang, elv_ang, date_generated
 
 
@@ -0,0 +1,116 @@
+from typing import Sequence, Union
+
+import numpy as np
+
+
+class LifetimeProfile:
+    """
+    Time series over the project life, stored as a read-only (years, n_timesteps) array.
+
+    Profiles of a single simulated year are repeated over the project life by broadcasting that year, so arithmetic
+    on them costs one year of memory and time. Lifetime profiles are only materialized into flat arrays by
+    `to_array`, e.g. where PySAM needs them.
+    """
+
+    def __init__(self, profile: Union[Sequence, np.ndarray], n_timesteps: int, project_life: int):
+        """
+        :param profile: time series of one year, a number of years that divides the project life, or, if already
+            year-indexed, a (years, n_timesteps) array
+        :param n_timesteps: number of time steps in a year
+        :param project_life: number of years in the analysis period
+        """
+        years = np.asarray(profile, dtype=float)
+        if years.ndim == 1:
+            if len(years) == 0 or len(years) % n_timesteps:
+                raise ValueError("Profile length {} should be a multiple of n_timesteps {}".format(len(years),
+                                                                                                    n_timesteps))
+            years = years.reshape(-1, n_timesteps)
+        if years.ndim != 2 or years.shape[1] != n_timesteps or project_life % len(years):
+            raise ValueError("Profile should have a number of years that divides project_life {}, each of n_timesteps"
+                             " {}".format(project_life, n_timesteps))
+        if 1 < len(years) < project_life:
+            years = np.tile(years, (project_life // len(years), 1))
+        years = years.view()
+        years.flags.writeable = False
+        self._years = years
+        self.project_life = project_life
+
+    @classmethod
+    def _from_years(cls, years: np.ndarray, project_life: int) -> "LifetimeProfile":
+        return cls(years, years.shape[1], project_life)
+
+    @property
+    def years(self) -> np.ndarray:
+        """
+        Year-indexed profile of shape (project_life, n_timesteps), a broadcast view for repeated years
+        """
+        return np.broadcast_to(self._years, (self.project_life, self.n_timesteps))
+
+    @property
+    def year1(self) -> np.ndarray:
+        return self._years[0]
+
+    @property
+    def n_timesteps(self) -> int:
+        return self._years.shape[1]
+
+    @property
+    def is_repeated_year(self) -> bool:
+        """Whether the profile repeats its first year over the project life"""
+        return len(self._years) == 1
+
+    def __len__(self):
+        return self.project_life * self.n_timesteps
+
+    def to_array(self) -> np.ndarray:
+        """
+        :return: flat profile over the project life
+        """
+        return self.years.ravel()
+
+    def __array__(self, dtype=None, copy=None):
+        return self.to_array() if dtype is None else self.to_array().astype(dtype)
+
+    def annual_sums(self) -> np.ndarray:
+        """
+        :return: sum of each year of the project life
+        """
+        return np.broadcast_to(self._years.sum(axis=1), (self.project_life,))
+
+    def sum(self) -> float:
+        return float(self._years.sum() * self.project_life / len(self._years))
+
+    def _apply(self, func, *others) -> "LifetimeProfile":
+        """Applies an elementwise numpy function to the year-indexed arrays of this and other profiles"""
+        arrays = [self._years]
+        for other in others:
+            if isinstance(other, LifetimeProfile):
+                if other.project_life != self.project_life or other.n_timesteps != self.n_timesteps:
+                    raise ValueError("Profiles should have the same project life and n_timesteps")
+                arrays.append(other._years)
+            else:
+                arrays.append(other)
+        return self._from_years(np.asarray(func(*arrays), dtype=float), self.project_life)
+
+    def __add__(self, other):
+        return self._apply(np.add, other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self._apply(np.subtract, other)
+
+    def __mul__(self, other):
+        return self._apply(np.multiply, other)
+
+    __rmul__ = __mul__
+
+    def minimum(self, other) -> "LifetimeProfile":
+        return self._apply(np.minimum, other)
+
+    def maximum(self, other) -> "LifetimeProfile":
+        return self._apply(np.maximum, other)
+
+    @classmethod
+    def zeros(cls, n_timesteps: int, project_life: int) -> "LifetimeProfile":
+        return cls(np.zeros(n_timesteps), n_timesteps, project_life)
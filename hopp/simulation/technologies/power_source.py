@@ -1,17 +1,29 @@
 from typing import Iterable, Sequence, Union
 
 import numpy as np
-import pandas as pd
 import PySAM.Singleowner as Singleowner
 
 from hopp.simulation.technologies.sites.site_info import SiteInfo
 from hopp.utilities.log import hybrid_logger as logger
 from hopp.simulation.technologies.dispatch.power_sources.power_source_dispatch import PowerSourceDispatch
+from hopp.simulation.technologies.capacity_credit import generation_max_feasible_kwh, capacity_credit_percent
 from hopp.tools.utils import array_not_scalar, equal
 from hopp.utilities.log import hybrid_logger as logger
 from hopp.simulation.base import BaseClass
 
 
+def read_only_array(values) -> np.ndarray:
+    """
+    Read-only float array of `values`: a view if `values` already is a float array, otherwise a single conversion,
+    e.g. of a PySAM output tuple
+
+    :param values: sequence or array
+    """
+    array = np.asarray(values, dtype=float).view()
+    array.flags.writeable = False
+    return array
+
+
 class PowerSource(BaseClass):
     """
     Abstract class for a renewable energy power plant simulation.
@@ -53,7 +65,7 @@ class PowerSource(BaseClass):
             self._financial_model.set_financial_inputs(system_model=self._system_model)               # for custom financial models
 
         self.capacity_factor_mode = "cap_hours"                                    # to calculate via "cap_hours" method or None to use external value
-        self.gen_max_feasible = [0.] * self.site.n_timesteps
+        self.gen_max_feasible = np.zeros(self.site.n_timesteps)
         
     @staticmethod
     def import_financial_model(financial_model, system_model, config_name): 
@@ -116,30 +128,7 @@ class PowerSource(BaseClass):
         :returns: Variable value (when getter)
         """
         var_name = var_name.replace('adjust:', '')
-        attr_obj = None
-        if var_name in self.__dir__():
-            attr_obj = self
-        if not attr_obj:
-            for a in self._system_model.__dir__():
-                try:
-                    group_obj = getattr(self._system_model, a)
-                    if var_name in group_obj.__dir__():
-                        attr_obj = group_obj
-                        break
-                except:
-                    pass
-        if not attr_obj:
-            for a in self._financial_model.__dir__():
-                try:
-                    group_obj = getattr(self._financial_model, a)
-                    if var_name in group_obj.__dir__():
-                        attr_obj = group_obj
-                        break
-                except:
-                    pass
-        if not attr_obj:
-            raise ValueError("Variable {} not found in technology or financial model {}".format(
-                var_name, self.__class__.__name__))
+        attr_obj = self._resolve_value_owner(var_name)
 
         if var_value is None:
             try:
@@ -160,6 +149,66 @@ class PowerSource(BaseClass):
             except Exception as e:
                 raise IOError(f"{self.__class__}'s attribute {var_name} could not be set to {var_value}: {e}")
 
+    def values(self, var_names: Sequence[str], var_values: Sequence = None):
+        """
+        Gets or Sets several variables within the system or financial PySAM models, see :meth:`value`
+
+        ``values(var_names)`` Gets list of variable values
+
+        ``values(var_names, var_values)`` Sets each variable to the value at the same position
+
+        :param var_names: PySAM variable names
+        :param var_values: (optional) PySAM variable values
+
+        :returns: List of variable values (when getter)
+        """
+        if var_values is None:
+            return [self.value(var_name) for var_name in var_names]
+        if len(var_names) != len(var_values):
+            raise ValueError("var_names and var_values must be the same length")
+        for var_name, var_value in zip(var_names, var_values):
+            self.value(var_name, var_value)
+
+    def _resolve_value_owner(self, var_name: str):
+        """
+        Returns the object that holds ``var_name``: this class, a system model group or a financial model group.
+
+        Where a variable lives is looked up once and stored in an index of variable name to (model, group name). The
+        index is rebuilt if the system or financial model is replaced.
+        """
+        models = (self._system_model, self._financial_model)
+        index_models = getattr(self, '_value_index_models', None)
+        if index_models is None or any(a is not b for a, b in zip(models, index_models)):
+            self._value_index = {}
+            self._value_index_models = models
+
+        if var_name in self._value_index:
+            model, group_name = self._value_index[var_name]
+            return self if model is None else getattr(model, group_name)
+
+        owner = None
+        if var_name in self.__dir__():
+            owner = (None, None)
+        if not owner:
+            for model in models:
+                for a in model.__dir__():
+                    try:
+                        group_obj = getattr(model, a)
+                        if var_name in group_obj.__dir__():
+                            owner = (model, a)
+                            break
+                    except:
+                        pass
+                if owner:
+                    break
+        if not owner:
+            raise ValueError("Variable {} not found in technology or financial model {}".format(
+                var_name, self.__class__.__name__))
+
+        self._value_index[var_name] = owner
+        model, group_name = owner
+        return self if model is None else getattr(model, group_name)
+
     def assign(self, input_dict: dict):
         """
         Sets input variables in the PowerSource class or any of its subclasses (system or financial models)
@@ -190,7 +239,7 @@ class PowerSource(BaseClass):
             # [kW]
         return W_ac_nom
 
-    def calc_gen_max_feasible_kwh(self, interconnect_kw: float) -> list:
+    def calc_gen_max_feasible_kwh(self, interconnect_kw: float) -> np.ndarray:
         """
         Calculates the maximum feasible generation profile that could have occurred (year 1)
 
@@ -200,8 +249,7 @@ class PowerSource(BaseClass):
         """
         W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
         t_step = self.site.interval / 60                                                # hr
-        E_net_max_feasible = [min(x,W_ac_nom) * t_step for x in self.generation_profile[0:self.site.n_timesteps]]      # [kWh]
-        return E_net_max_feasible
+        return generation_max_feasible_kwh(self.generation_profile[0:self.site.n_timesteps], W_ac_nom, t_step)
 
     def calc_capacity_credit_percent(self, interconnect_kw: float) -> float:
         """
@@ -220,24 +268,12 @@ class PowerSource(BaseClass):
                     + type(self).__name__)
                 return 0
             else:
-                df = pd.DataFrame()
-                df['cap_hours'] = self.site.capacity_hours
-                df['E_net_max_feasible'] = self.gen_max_feasible  # [kWh]
-
-                sel_df = df[df['cap_hours'] == True]
-
                 if type(self).__name__ != 'Grid':
                     W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
                 else:
                     W_ac_nom = np.min((self.hybrid_nominal_capacity, interconnect_kw))
 
-                if len(sel_df.index) > 0 and W_ac_nom > 0:
-                    capacity_value = sum(np.minimum(sel_df['E_net_max_feasible'].values/(W_ac_nom*t_step), 1.0)) / len(sel_df.index) * 100
-                    capacity_value = np.min((100, capacity_value))       # [%]
-                else:
-                    capacity_value = 0
-
-                return capacity_value
+                return capacity_credit_percent(self.gen_max_feasible, self.site.capacity_hours, W_ac_nom, t_step)
         else:
             return self.capacity_credit_percent
 
@@ -302,7 +338,7 @@ class PowerSource(BaseClass):
 
         if len(self._financial_model.value('gen')) == self.site.n_timesteps:
             #TODO is this correct? It seems like gen should not be multiplied by project life
-            self._financial_model.value('gen', self._financial_model.value('gen') * project_life)
+            self._financial_model.value('gen', np.tile(self._financial_model.value('gen'), project_life))
         self._financial_model.value('system_pre_curtailment_kwac', self._financial_model.value('gen'))
         self._financial_model.value('annual_energy_pre_curtailment_ac', self.value("annual_energy_kwh"))
         # TODO: Should we use the nominal capacity function here?
@@ -504,12 +540,12 @@ class PowerSource(BaseClass):
             return 0
 
     @property
-    def generation_profile(self) -> list:
+    def generation_profile(self) -> np.ndarray:
         """System power generated [kW]"""
         if self.system_capacity_kw:
-            return list(self._system_model.value("gen"))
+            return read_only_array(self._system_model.value("gen"))
         else:
-            return [0] * self.site.n_timesteps
+            return read_only_array(np.zeros(self.site.n_timesteps))
 
     @property
     def capacity_factor(self) -> float:
@@ -714,13 +750,13 @@ class PowerSource(BaseClass):
             return benefits / self._financial_model.value("npv_annual_costs")
 
     @property
-    def gen_max_feasible(self) -> list:
+    def gen_max_feasible(self) -> np.ndarray:
         """Maximum feasible generation profile that could have occurred (year 1)"""
         return self._gen_max_feasible
 
     @gen_max_feasible.setter
-    def gen_max_feasible(self, gen_max_feas: list):
-        self._gen_max_feasible = gen_max_feas
+    def gen_max_feasible(self, gen_max_feas: Sequence):
+        self._gen_max_feasible = read_only_array(gen_max_feas)
 
     def copy(self):
         """
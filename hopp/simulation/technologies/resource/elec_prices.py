@@ -49,10 +49,16 @@ class ElectricityPrices(Resource):
     def format_data(self):
         if not os.path.isfile(self.filename):
             raise IOError(f"ElectricityPrices error: {self.filename} does not exist.")
+        cached_data = self.read_binary_cache(self.filename)
+        if cached_data is not None:
+            self._data = np.array(cached_data['prices'])
+            return
+
         try:
             self._data = np.loadtxt(self.filename)
         except ValueError:
             self._data = np.loadtxt(self.filename, skiprows=1)
+        self.write_binary_cache(self.filename, {'prices': self._data})
 
     def data(self):
         if not os.path.isfile(self.filename):
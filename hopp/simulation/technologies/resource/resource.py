@@ -2,7 +2,14 @@ from abc import ABCMeta, abstractmethod
 import os
 import json
 import requests
+import tempfile
 import time
+from typing import Optional
+from zipfile import BadZipFile
+
+import numpy as np
+
+from hopp.utilities.log import hybrid_logger as logger
 
 
 class Resource(metaclass=ABCMeta):
@@ -10,7 +17,14 @@ class Resource(metaclass=ABCMeta):
     Class to manage resource data for a given lat & lon. If a resource file doesn't exist,
     it is downloaded and saved to 'resource_files' folder. The resource file is then read
     to the appropriate SAM resource data format.
+
+    If ``use_binary_cache`` is True, the formatted data is also written to a NumPy ``.npz`` sidecar next to the
+    resource file on first read and loaded from the sidecar on later reads, as long as the resource file is unchanged.
+    Set ``Resource.use_binary_cache = True`` to enable it for every resource type.
     """
+    use_binary_cache = False
+    binary_cache_suffix = ".npz"
+
     def __init__(self, lat, lon, year, **kwargs):
         """
         Parameters
@@ -97,6 +111,58 @@ class Resource(metaclass=ABCMeta):
 
         return success
 
+    def binary_cache_filename(self, filename) -> str:
+        """Returns the sidecar file name of the binary cache for a resource file"""
+        return str(filename) + self.binary_cache_suffix
+
+    def read_binary_cache(self, filename) -> Optional[dict]:
+        """
+        Loads formatted data from the binary cache of a resource file
+
+        :param filename: resource file path
+
+        :returns: data dictionary, or None if caching is disabled or the cache is missing, out of date or unreadable
+        """
+        cache_file = self.binary_cache_filename(filename)
+        if not self.use_binary_cache or not os.path.isfile(cache_file):
+            return None
+        try:
+            with np.load(cache_file, allow_pickle=False) as cache:
+                if cache["_source_mtime_ns"] != os.stat(filename).st_mtime_ns:
+                    return None
+                return {key: cache[key].tolist() for key in cache.files if key != "_source_mtime_ns"}
+        except (BadZipFile, ValueError, EOFError, OSError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable resource cache {cache_file}: {e}")
+            return None
+
+    def write_binary_cache(self, filename, data: dict):
+        """
+        Writes formatted data to the binary cache of a resource file, if caching is enabled. The cache is written to a
+        temporary file that then replaces the cache file, so readers never see a partly written cache.
+
+        :param filename: resource file path
+        :param data: data dictionary of scalars and numeric sequences
+        """
+        if not self.use_binary_cache:
+            return
+        arrays = {key: np.asarray(value) for key, value in data.items()}
+        arrays["_source_mtime_ns"] = np.asarray(os.stat(filename).st_mtime_ns)
+        cache_file = self.binary_cache_filename(filename)
+        try:
+            fd, temp_file = tempfile.mkstemp(suffix=self.binary_cache_suffix,
+                                             dir=os.path.dirname(os.path.abspath(cache_file)))
+        except OSError:
+            return  # read-only resource directories are simply not cached
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            pass
+        finally:
+            if os.path.isfile(temp_file):
+                os.remove(temp_file)
+
     @abstractmethod
     def download_resource(self):
         """Download resource for given lat/lon"""
@@ -1,10 +1,9 @@
+import functools
 import os
-from collections import defaultdict
 from pathlib import Path
 from typing import Union
 import numpy as np
-import csv
-from PySAM.ResourceTools import SAM_CSV_to_solar_data
+import pandas as pd
 
 from hopp.utilities.keys import get_developer_nrel_gov_key
 from hopp.utilities.log import hybrid_logger as logger
@@ -14,6 +13,93 @@ from hopp import ROOT_DIR
 
 BASE_URL = "https://developer.nrel.gov/api/nsrdb/v2/solar/psm3-download.csv"
 
+# Keys passed to SAM and the column names they may have in resource files (NREL / NASA POWER), as in PySAM's
+# ResourceTools.SAM_CSV_to_solar_data
+SAM_SOLAR_KEYS = {
+    'year': ['year', 'Year', 'yr'],
+    'month': ['month', 'Month', 'mo'],
+    'day': ['day', 'Day'],
+    'hour': ['hour', 'Hour', 'hr'],
+    'minute': ['minute', 'Minute', 'min'],
+    'dn': ['dn', 'DNI', 'dni', 'beam', 'direct normal', 'direct normal irradiance'],
+    'df': ['df', 'DHI', 'dhi', 'diffuse', 'diffuse horizontal', 'diffuse horizontal irradiance'],
+    'gh': ['gh', 'GHI', 'ghi', 'global', 'global horizontal', 'global horizontal irradiance'],
+    'wspd': ['wspd', 'Wind Speed', 'wind speed'],
+    'tdry': ['tdry', 'Temperature', 'dry bulb', 'dry bulb temp', 'temperature', 'ambient', 'ambient temp'],
+    'wdir': ['wdir', 'Wind Direction', 'wind direction'],
+    'pres': ['pres', 'Pressure', 'pressure'],
+    'tdew': ['tdew', 'Dew Point', 'Tdew', 'dew point', 'dew point temperature'],
+    'rhum': ['rhum', 'Relative Humidity', 'rh', 'RH', 'relative humidity', 'humidity'],
+    'alb': ['alb', 'Surface Albedo', 'albedo', 'surface albedo'],
+    'snow': ['snow', 'Snow Depth', 'snow depth', 'snow cover']
+}
+
+# Number of parsed solar resource files kept by `read_solar_resource_file`
+SOLAR_RESOURCE_FILE_CACHE_SIZE = 16
+
+
+def read_solar_resource_file(filename: Union[str, Path]) -> pd.DataFrame:
+    """
+    Reads an NSRDB formatted solar resource file in a single pass.
+
+    The most recently read ``SOLAR_RESOURCE_FILE_CACHE_SIZE`` files are cached, keyed by path and modification time,
+    so every model using the same file shares one parse. The returned table is shared and must not be modified.
+
+    :param filename: Any csv resource file formatted according to NSRDB
+
+    :return: time series table with the file's column names as float columns. The two header lines (i.e.
+        'Latitude', 'Longitude', 'Time Zone', 'Elevation' and 'Source') are in the table's ``attrs`` as strings.
+    """
+    path = os.path.abspath(filename)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"{filename} does not exist.")
+    return _parse_solar_resource_file(path, os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=SOLAR_RESOURCE_FILE_CACHE_SIZE)
+def _parse_solar_resource_file(path: str, mtime_ns: int) -> pd.DataFrame:
+    """Parses a solar resource file, see `read_solar_resource_file`. `mtime_ns` only keys the cache"""
+    with open(path) as file_in:
+        info = [file_in.readline().rstrip().split(",") for _ in range(2)]
+        if "Time Zone" not in info[0]:
+            raise ValueError("`Time Zone` field not found in solar resource file.")
+        table = pd.read_csv(file_in, dtype=float, float_precision='round_trip')
+    table = table[table.columns.drop(list(table.filter(regex='^Unnamed')))]  # drop unnamed (empty) columns
+    table.attrs.update(zip(info[0], info[1]))
+    return table
+
+
+def solar_resource_file_to_sam_data(filename: Union[str, Path]) -> dict:
+    """
+    Formats an NSRDB formatted solar resource file as a 'solar_resource_data' dictionary for use in PySAM, with the
+    same keys as PySAM's ResourceTools.SAM_CSV_to_solar_data but read through :func:`read_solar_resource_file`
+
+    :param filename: Any csv resource file formatted according to NSRDB
+
+    :return: Dictionary for PySAM.Pvwattsv8.Pvwattsv8.SolarResource, and other models
+    """
+    table = read_solar_resource_file(filename)
+    weather = {
+        'tz': float(table.attrs['Time Zone']),
+        'elev': float(table.attrs['Elevation']),
+        'lat': float(table.attrs['Latitude']),
+        'lon': float(table.attrs['Longitude'])
+    }
+    for key, list_of_keys in SAM_SOLAR_KEYS.items():
+        for good_key in list_of_keys:
+            if good_key in table.columns:
+                weather[key] = table[good_key].tolist()
+                break
+
+    # handles averaged hourly data with no minute column provided by NASA POWER and removes 2/29 data for leap years
+    if table.attrs.get('Source') == 'NASA/POWER':
+        weather['minute'] = [30] * len(weather['hour'])
+        if len(weather['hour']) == 8784:
+            for key in weather.keys():
+                if key not in ['tz', 'elev', 'lat', 'lon']:
+                    del weather[key][1416:1440]
+    return weather
+
 
 class SolarResource(Resource):
     """
@@ -109,25 +195,17 @@ class SolarResource(Resource):
         :key tdew: array, dew point temp [C]
         :key press: array, atmospheric pressure [mbar]
         """
-        self._data = SAM_CSV_to_solar_data(data_dict)
-        # TODO: Update ResourceTools.py in pySAM to include pressure and dew point or relative humidity
-        with open(data_dict) as file_in:
-            wfd = defaultdict(list)
-            for i in range(2):
-                file_in.readline()
-            reader = csv.DictReader(file_in)
-            for row in reader:
-                for col, dat in row.items():
-                    if len(col) > 0:
-                        wfd[col].append(float(dat))
-
-        if 'Dew Point' in wfd:
-            self._data['tdew'] = wfd.pop('Dew Point')
-        elif 'RH' in wfd:
-            self._data['rh'] = wfd.pop('RH')
-        elif 'Pressure' in wfd:
-            self._data['pres'] = wfd.pop('Pressure')
+        cached_data = self.read_binary_cache(data_dict)
+        if cached_data is not None:
+            self._data = cached_data
+            return
 
+        self._data = solar_resource_file_to_sam_data(data_dict)
+        # TODO: Update ResourceTools.py in pySAM to include pressure and dew point or relative humidity
+        table = read_solar_resource_file(data_dict)
+        if 'Dew Point' not in table.columns and 'RH' in table.columns:
+            self._data['rh'] = table['RH'].tolist()
+        self.write_binary_cache(data_dict, self._data)
 
     def roll_timezone(self, roll_hours, timezone):
         """
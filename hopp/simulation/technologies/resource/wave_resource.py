@@ -75,6 +75,11 @@ class WaveResource(Resource):
             - hour
             - minute
         """
+        cached_data = self.read_binary_cache(self.filename)
+        if cached_data is not None:
+            self._data = {key: pd.Series(values, name=key) for key, values in cached_data.items()}
+            return
+
         wavefile_model = wavefile.new()
         #Load resource file
         wavefile_model.WeatherReader.wave_resource_filename_ts = str(self.filename)
@@ -135,4 +140,5 @@ class WaveResource(Resource):
         else:
             raise ValueError("Resource time-series cannot be subhourly.")
 
-        self._data = dic
\ No newline at end of file
+        self._data = dic
+        self.write_binary_cache(self.filename, self._data)
\ No newline at end of file
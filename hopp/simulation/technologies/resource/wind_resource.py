@@ -187,5 +187,10 @@ class WindResource(Resource):
         """
         Sets the wind resource data to a dictionary in SAM Wind format (see Pysam.ResourceTools.SRW_to_wind_data)
         """
+        cached_data = self.read_binary_cache(data_file)
+        if cached_data is not None:
+            self._data = cached_data
+            return
 
         self._data = SRW_to_wind_data(data_file)
+        self.write_binary_cache(data_file, self._data)
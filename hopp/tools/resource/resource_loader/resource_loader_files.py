@@ -1,7 +1,123 @@
 import numpy as np
 import os.path
+import tempfile
 from pathlib import Path
 import pandas as pd
+from scipy.spatial import cKDTree
+
+from hopp.utilities.log import hybrid_logger as logger
+
+# Name of the coordinate manifest stored in each resource directory, hidden and without a resource file extension so
+# tools listing the resource files do not pick it up
+MANIFEST_FILENAME = ".resource_coordinates.manifest"
+MANIFEST_COLUMNS = ['Filename', 'Lat', 'Lon', 'mtime']
+
+
+def solar_file_coordinates(file_path: Path):
+    """
+    Reads the latitude and longitude of a solar resource file from its header
+
+    :param file_path: solar resource file
+    :return: latitude, longitude
+    """
+    df = pd.read_csv(file_path, nrows=1)
+    if str(df['Longitude'][0]) == '-101.94':
+        lon = float(file_path.name[:-13].rsplit('_')[1])
+    else:
+        lon = float(df['Longitude'].values[0])
+
+    if str(df['Latitude'][0]) == '35.21':
+        lat = float(file_path.name.rsplit('_')[0])
+    else:
+        lat = float(df['Latitude'].values[0])
+    return lat, lon
+
+
+def wind_file_coordinates(file_path: Path):
+    """
+    Reads the latitude and longitude of a wind resource file from its header
+
+    :param file_path: wind resource file
+    :return: latitude, longitude
+    """
+    df = pd.read_csv(file_path, nrows=1)
+    if (df.columns[5] == '39.759235') & (df.columns[6] == '-105.21756'):
+        lat = float(file_path.name[:-4].rsplit('t')[1].rsplit('_')[0])
+        lon = float(file_path.name[:-4].rsplit('_')[1])
+    else:
+        lat = float(df.columns[5])
+        lon = float(df.columns[6])
+    return lat, lon
+
+
+def resource_coordinate_manifest(resource_dir: Path, extension: str, coordinate_reader) -> pd.DataFrame:
+    """
+    Returns the coordinates of every resource file in a directory.
+
+    Coordinates are kept in a manifest file in the directory, so each resource file is only opened the first time it
+    is seen or after it is modified. The manifest is updated when files are added, removed or modified, and is rebuilt
+    from the files if it can't be read.
+
+    :param resource_dir: directory of resource files
+    :param extension: resource file extension, i.e. '.csv'
+    :param coordinate_reader: function returning (lat, lon) of a resource file
+    :return: Dataframe of Filename, Lat, Lon and mtime [ns], in directory listing order
+    """
+    manifest_path = resource_dir / MANIFEST_FILENAME
+    known = {}
+    if manifest_path.is_file():
+        try:
+            manifest = pd.read_csv(manifest_path)
+            if list(manifest.columns) != MANIFEST_COLUMNS:
+                raise ValueError(f"expected columns {MANIFEST_COLUMNS}, found {list(manifest.columns)}")
+            known = {row.Filename: row for row in manifest.itertuples(index=False)}
+        except (ValueError, OSError) as e:
+            logger.warning(f"Rebuilding unreadable resource coordinate manifest {manifest_path}: {e}")
+
+    rows = []
+    changed = False
+    for file in os.listdir(resource_dir):
+        if not file.endswith(extension) or file == MANIFEST_FILENAME:
+            continue
+        # integer nanoseconds, which unlike float seconds round-trip through the csv manifest
+        mtime = os.stat(resource_dir / file).st_mtime_ns
+        if file in known and known[file].mtime == mtime:
+            rows.append((file, known[file].Lat, known[file].Lon, mtime))
+        else:
+            lat, lon = coordinate_reader(resource_dir / file)
+            rows.append((file, lat, lon, mtime))
+            changed = True
+
+    manifest = pd.DataFrame(rows, columns=MANIFEST_COLUMNS)
+    if changed or len(manifest) != len(known):
+        temp_file = None
+        try:
+            # written to a temporary file and renamed so concurrent readers never see a partial manifest
+            fd, temp_file = tempfile.mkstemp(suffix=".tmp", prefix=MANIFEST_FILENAME, dir=resource_dir)
+            with os.fdopen(fd, "w", newline="") as f:
+                manifest.to_csv(f, index=False)
+            os.replace(temp_file, manifest_path)
+        except OSError:
+            pass  # read-only resource directories are re-read on each call
+        finally:
+            if temp_file is not None and os.path.isfile(temp_file):
+                os.remove(temp_file)
+    return manifest
+
+
+def nearest_sites(site_lats, site_lons, desired_lats, desired_lons) -> np.ndarray:
+    """
+    Finds the nearest site to each desired location, using the same lat/lon distance as `resource_loader_file`
+
+    :param site_lats: latitudes of the available sites
+    :param site_lons: longitudes of the available sites
+    :param desired_lats: desired latitudes
+    :param desired_lons: desired longitudes, same length as desired_lats
+    :return: index of the nearest site for each desired location
+    """
+    tree = cKDTree(np.column_stack((site_lats, site_lons)))
+    _, idx = tree.query(np.column_stack((np.atleast_1d(desired_lats), np.atleast_1d(desired_lons))))
+    return idx
 
 
 def resource_loader_file(resource_dir, desired_lats, desired_lons, year="2012"):
@@ -13,10 +129,6 @@ def resource_loader_file(resource_dir, desired_lats, desired_lons, year="2012"):
     :param desired_lons: Desired Longitudes
     :return: all_sites Dataframe of site_num, lat, lon, solar_filenames, wind_filenames
     """
-    # directory to resource_files
-    main_dir = Path(__file__).parent.parent
-    npy_dir = main_dir / 'resource_files_big/npy_files/'
-    # resource_dir = main_dir / 'resource_files_big'
     solar_dir = (resource_dir / 'solar').resolve()
     wind_dir = (resource_dir / 'wind').resolve()
     if type(desired_lats) == int or type(desired_lats) == float:
@@ -29,102 +141,32 @@ def resource_loader_file(resource_dir, desired_lats, desired_lons, year="2012"):
     else:
         N_lon = len(desired_lons)
 
-    # Get list of files in the directory
-    files_solar = []
-    files_wind = []
-    for file in os.listdir(solar_dir):
-        if file.endswith(".csv"):
-            if file.rsplit('_')[4].rsplit('.')[0] == str(year):
-                files_solar.append(file)
-
-    for file in os.listdir(wind_dir):
-        if file.endswith(".srw"):
-            if file.rsplit('_')[3] == str(year):
-                files_wind.append(file)
-
-    # Get Solar Data
-    x_lon_solar = np.zeros(len(files_solar))
-    y_lat_solar = np.zeros(len(files_solar))
-
-    for i in range(0, len(files_solar)):
-        strFile = solar_dir / files_solar[i]
-        df = pd.read_csv(strFile, nrows=1)
-        # print(df['Longitude'][0])
-        if str(df['Longitude'][0]) == '-101.94':
-            x_lon_solar[i] = files_solar[i][:-13].rsplit('_')[1]
-        else:
-            x_lon_solar[i] = df['Longitude'].values
-
-        if str(df['Latitude'][0]) == '35.21':
-            y_lat_solar[i] = files_solar[i].rsplit('_')[0]
-        else:
-            y_lat_solar[i] = df['Latitude'].values
-
-        # Get Wind Data
-        x_lon_wind = np.zeros(len(files_wind))
-        y_lat_wind = np.zeros(len(files_wind))
-
-        # get size of the files
-        strFile = wind_dir / files_wind[0]
-
-    for i in range(0, len(files_wind)):
-        strFile = wind_dir / files_wind[i]
-        df = pd.read_csv(strFile, nrows=1)
-        if (df.columns[5] == '39.759235') & (df.columns[6] == '-105.21756'):
-            y_lat_wind[i] = files_wind[i][:-4].rsplit('t')[1].rsplit('_')[0]
-            x_lon_wind[i] = files_wind[i][:-4].rsplit('_')[1]
-        else:
-            x_lon_wind[i] = float(df.columns[6])
-            y_lat_wind[i] = float(df.columns[5])
+    # Create site description arrays for Solar and Wind
+    solar_sites = resource_coordinate_manifest(solar_dir, ".csv", solar_file_coordinates)
+    solar_sites = solar_sites[[file.rsplit('_')[4].rsplit('.')[0] == str(year) for file in solar_sites['Filename']]]
 
-        # Create site description arrays for Solar and Wind
-    solar_sites = pd.DataFrame({'Lat': y_lat_solar[:len(x_lon_solar)], 'Lon': x_lon_solar[:len(x_lon_solar)],
-                                'Filename': files_solar[:len(x_lon_solar)]})
-
-    wind_sites = pd.DataFrame({'Lat': y_lat_wind[:len(x_lon_wind)], 'Lon': x_lon_wind[:len(x_lon_wind)],
-                               'Filename': files_wind[:len(x_lon_wind)]})
+    wind_sites = resource_coordinate_manifest(wind_dir, ".srw", wind_file_coordinates)
+    wind_sites = wind_sites[[file.rsplit('_')[3] == str(year) for file in wind_sites['Filename']]]
 
     site_nums = np.linspace(1, N_lat * N_lon, N_lat * N_lon)
     site_nums = site_nums.astype(int)
-    count = 0
-    desired_lons_grid = np.zeros(N_lat * N_lon)
-    desired_lats_grid = np.zeros(N_lat * N_lon)
     if N_lat * N_lon == 1:
         desired_lats_grid = [desired_lats]
         desired_lons_grid = [desired_lons]
     else:
-        for desired_lon in desired_lons:
-            for desired_lat in desired_lats:
-                desired_lons_grid[count] = desired_lon
-                desired_lats_grid[count] = desired_lat
-                count = count + 1
+        desired_lons_grid, desired_lats_grid = (grid.ravel() for grid in np.meshgrid(desired_lons, desired_lats,
+                                                                                     indexing='ij'))
 
     all_sites = pd.DataFrame(
         {'site_nums': site_nums, 'Lat': desired_lats_grid[:len(desired_lats_grid)],
          'Lon': desired_lons_grid[:len(desired_lons_grid)]})
-    nearest_solar_files = []
-    nearest_wind_files = []
-    years = []
 
     # Find the solar and wind files corresponding to the nearest locations to the desired lat/lon
-    for i in range(len(all_sites)):
-        solar_dist = np.sqrt(
-            (all_sites['Lat'][i] - solar_sites['Lat']) ** 2 + (all_sites['Lon'][i] - solar_sites['Lon']) ** 2)
-        solar_idx = np.where(solar_dist == np.min(solar_dist))
-        nearest_solar_file = os.path.join(solar_dir, solar_sites['Filename'][solar_idx[0][0]])
-        nearest_solar_files.append(nearest_solar_file)
-
-        wind_dist = np.sqrt(
-            (all_sites['Lat'][i] - wind_sites['Lat']) ** 2 + (all_sites['Lon'][i] - wind_sites['Lon']) ** 2)
-        wind_idx = np.where(wind_dist == np.min(wind_dist))
-        nearest_wind_file = os.path.join(wind_dir, wind_sites['Filename'][wind_idx[0][0]])
-        nearest_wind_files.append(nearest_wind_file)
-        years.append(str(year))
-
-    all_sites['solar_filenames'] = nearest_solar_files
-    all_sites['wind_filenames'] = nearest_wind_files
-    all_sites['year'] = years
-
-    return all_sites
+    solar_idx = nearest_sites(solar_sites['Lat'], solar_sites['Lon'], all_sites['Lat'], all_sites['Lon'])
+    wind_idx = nearest_sites(wind_sites['Lat'], wind_sites['Lon'], all_sites['Lat'], all_sites['Lon'])
 
+    all_sites['solar_filenames'] = [os.path.join(solar_dir, file) for file in solar_sites['Filename'].iloc[solar_idx]]
+    all_sites['wind_filenames'] = [os.path.join(wind_dir, file) for file in wind_sites['Filename'].iloc[wind_idx]]
+    all_sites['year'] = [str(year)] * len(all_sites)
 
+    return all_sites
@@ -1,3 +1,4 @@
+import itertools
 import numpy as np
 from typing import Sequence
 
@@ -78,4 +79,50 @@ def export_all(obj):
 
 def array_not_scalar(array):
     """Return True if array is array-like and not a scalar"""
-    return isinstance(array, Sequence) or (isinstance(array, np.ndarray) and hasattr(array, "__len__"))
\ No newline at end of file
+    return isinstance(array, Sequence) or (isinstance(array, np.ndarray) and hasattr(array, "__len__"))
+
+
+class Candidates(tuple):
+    """
+    Candidate values of a parameter in a parameter grid, see :func:`expand_param_grid`. Leaves of the grid that are
+    not wrapped in ``Candidates``, including lists, are the parameter's value in every scenario.
+    """
+
+
+def expand_param_grid(param_grid):
+    """
+    Expands a grid of parameter values into the list of scenarios it spans
+
+    :param param_grid: nested dict, of any depth, whose leaves are either ``Candidates`` of a parameter or the
+        parameter's fixed value, i.e. ``{'pv': {'system_capacity_kw': Candidates([5000, 10000])},
+        'ppa_price': Candidates([0.03, 0.05])}``. The cartesian product of all ``Candidates`` is taken. A
+        sequence of scenario dicts is returned unchanged.
+
+    :returns: list of dicts with the same nesting as ``param_grid`` and a single value at each leaf
+    """
+    if not isinstance(param_grid, dict):
+        return list(param_grid)
+
+    def leaves(grid, path):
+        for key, value in grid.items():
+            if isinstance(value, dict):
+                yield from leaves(value, path + (key,))
+            else:
+                yield path + (key,), value
+
+    paths = []
+    candidates = []
+    for path, value in leaves(param_grid, ()):
+        paths.append(path)
+        candidates.append(value if isinstance(value, Candidates) else (value,))
+
+    scenarios = []
+    for combination in itertools.product(*candidates):
+        scenario = {}
+        for path, value in zip(paths, combination):
+            node = scenario
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = value
+        scenarios.append(scenario)
+    return scenarios
@@ -23,6 +23,7 @@ package_data_files = [
     *base_path.glob("tools/analysis/bos/BOSLookup.csv"),
     *base_path.glob("simulation/technologies/layout/flicker_data/*shadow.txt"),
     *base_path.glob("simulation/technologies/layout/flicker_data/*flicker.txt"),
+    *base_path.glob("simulation/technologies/layout/flicker_data/*flicker.npz"),
     *base_path.glob("simulation/technologies/csp/pySSC_daotk/libs/*"),
     *base_path.glob("simulation/technologies/csp/pySSC_daotk/tower_data/*"),
     *base_path.glob("simulation/technologies/csp/pySSC_daotk/trough_data/*"),
@@ -1,10 +1,13 @@
 from unittest.mock import MagicMock
 from copy import deepcopy
 
+import numpy as np
 import pytest
 from pytest import fixture
+import PySAM.BatteryStateful as BatteryModel
 
 from hopp.simulation.technologies.battery import Battery, BatteryConfig
+from hopp.simulation.technologies.capacity_credit import battery_max_feasible_kwh, capacity_credit_percent
 from tests.hopp.utils import create_default_site_info
 
 
@@ -81,3 +84,72 @@ def test_battery_initialization(site, subtests):
         battery = Battery(site, config=config)
 
         assert battery._financial_model == fin_model
+
+
+def test_battery_simulate_with_dispatch(site):
+    config = BatteryConfig.from_dict(config_data)
+    n_periods = 24
+    current = [0.0] * 6 + [-0.01] * 6 + [0.01] * 6 + [0.0] * 6    # MA
+
+    battery = Battery(site, config=config)
+    battery.setup_performance_model()
+    battery._dispatch = MagicMock(current=current,
+                                  power=[0.0] * n_periods,
+                                  soc=[0.0] * n_periods,
+                                  time_duration=[1.0] * n_periods,
+                                  control_variable="input_current")
+    battery._dispatch.options.include_lifecycle_count = False
+    battery.simulate_with_dispatch(n_periods, sim_start_time=24)
+
+    # Same simulation, one time step at a time
+    expected = Battery(site, config=config)
+    expected.setup_performance_model()
+    for t in range(n_periods):
+        expected.value("input_current", current[t] * 1e6)
+        expected.simulate_power(time_step=24 + t)
+
+    for attr in battery.outputs.stateful_attributes:
+        assert getattr(battery.outputs, attr)[24:48] == pytest.approx(getattr(expected.outputs, attr)[24:48])
+        assert getattr(battery.outputs, attr)[:24] == [0.0] * 24
+    assert max(battery.outputs.SOC) > config.initial_SOC
+
+
+def test_battery_values(site):
+    config = BatteryConfig.from_dict(config_data)
+    battery = Battery(site, config=config)
+
+    battery.values(["minimum_SOC", "maximum_SOC"], [15.0, 85.0])
+    assert battery.values(["minimum_SOC", "maximum_SOC", "system_capacity_kw"]) == [15.0, 85.0, batt_kw]
+    assert battery.value("maximum_SOC") == battery._system_model.ParamsCell.maximum_SOC
+
+    with pytest.raises(ValueError):
+        battery.values(["minimum_SOC", "maximum_SOC"], [15.0])
+
+    with pytest.raises(ValueError):
+        battery.value("not_a_variable")
+
+    # variable locations are looked up again when a model is replaced
+    system_model = battery._system_model
+    battery._system_model = BatteryModel.new()
+    battery._system_model.assign(system_model.export())
+    battery.value("maximum_SOC", 80.0)
+    assert battery._system_model.ParamsCell.maximum_SOC == 80.0
+    assert system_model.ParamsCell.maximum_SOC == 85.0
+
+
+def test_battery_max_feasible_kwh():
+    power_kw = [-100., 50., 3000., 6000.]
+    soc_percent = [10., 50., 90., 0.]
+
+    # discharged plus stored energy, limited to the power and nominal capacities
+    max_feasible = battery_max_feasible_kwh(power_kw, soc_percent, batt_kw, batt_kw * 4, 4e3, 1.0)
+    assert max_feasible == pytest.approx([2000., 4000., 4000., 4000.])
+    max_feasible = battery_max_feasible_kwh(power_kw, soc_percent, batt_kw, batt_kw * 4, 4e3, 1.0,
+                                            use_avail_storage=False)
+    assert max_feasible == pytest.approx([0., 50., 3000., 4000.])
+
+    capacity_hours = [True, False, True, False]
+    assert capacity_credit_percent([2000., 4000., 3000., 4000.], capacity_hours, 4e3, 1.0) == pytest.approx(62.5)
+    assert capacity_credit_percent([8000., 0., 8000., 0.], capacity_hours, 4e3, 1.0) == pytest.approx(100)
+    assert capacity_credit_percent(max_feasible, [False] * 4, 4e3, 1.0) == 0
+    assert capacity_credit_percent(max_feasible, capacity_hours, 0., 1.0) == 0
@@ -1,11 +1,14 @@
 import pytest
 import datetime
 
+import numpy as np
+
 
 from hopp.simulation import HoppInterface
 from hopp.simulation.technologies.dispatch.power_sources.csp_dispatch import CspDispatch
 from hopp.simulation.technologies.csp.tower_plant import TowerPlant, TowerConfig
 from hopp.simulation.technologies.csp.trough_plant import TroughPlant, TroughConfig
+from hopp.simulation.technologies.capacity_credit import csp_power_block_gross_max_feasible_kwh
 from tests.hopp.utils import create_default_site_info
 
 
@@ -387,4 +390,48 @@ def test_tower_annual_financial(site):
     assert csp.ssc.get('N_hel') == pytest.approx(expected_Nhel, 1e-3)
     assert csp.annual_energy_kwh == pytest.approx(expected_energy, 2e-3)
     assert csp._financial_model.value('lcoe_nom') == pytest.approx(expected_lcoe_nom, 2e-3)
-    assert csp._financial_model.value('lppa_nom') == pytest.approx(expected_ppa_nom, 2e-3)
\ No newline at end of file
+    assert csp._financial_model.value('lppa_nom') == pytest.approx(expected_ppa_nom, 2e-3)
+
+
+def test_csp_power_block_gross_max_feasible_kwh():
+    sigma = 1e-6
+    params = dict(t_step=1.0, startup_time=0.5, cycle_capacity_kw=1e5, cycle_max_frac=1.05,
+                  cycle_nominal_efficiency=0.4, startup_frac=0.5)
+
+    def row_max_feasible_kwh(q_startup, e_startup, w_gross, e_tes, eta, q_pb):
+        # power block state of each time step, evaluated one time step at a time
+        if abs(q_startup) < sigma and abs(w_gross) < sigma:
+            state = 'off'
+        elif q_startup > sigma and abs(w_gross) < sigma:
+            return 0
+        elif q_startup > sigma and w_gross > sigma:
+            state = 'started'
+        elif abs(q_startup) < sigma and w_gross > sigma:
+            state = 'on'
+        else:
+            return np.nan
+        if state == 'off':
+            t_pb_startup = params['startup_time']
+        elif state == 'started':
+            t_pb_startup = params['t_step'] * (1.0 - eta / (w_gross / (q_pb - q_startup))) if e_startup > sigma else 0
+        else:
+            t_pb_startup = 0
+        w_pb_nom = params['cycle_capacity_kw']
+        e_pb_max = max(w_pb_nom * params['cycle_max_frac'] * (params['t_step'] - t_pb_startup),
+                       w_gross * params['t_step'])
+        if state == 'off':
+            e_pb_startup = w_pb_nom / params['cycle_nominal_efficiency'] * params['startup_frac'] * t_pb_startup
+            return min(e_pb_max, max(0, e_tes - e_pb_startup) * params['cycle_nominal_efficiency'])
+        return min(e_pb_max, w_gross * params['t_step'] + e_tes * eta)
+
+    q_startup = [0., 0., 5e4, 5e4, 0., 5e4, -1., 0.]
+    e_startup = [0., 0., 2e4, 2e4, 0., 0., 0., 0.]
+    w_gross = [0., 0., 0., 4e4, 9e4, 3e4, 0., 1e5]
+    e_tes = [0., 5e5, 3e5, 3e5, 2e5, 1e5, 1e5, 1e6]
+    eta = [0., 0., 0., 0.35, 0.41, 0.38, 0., 0.42]
+    q_pb = [0., 0., 5e4, 1.6e5, 2.2e5, 1.3e5, 0., 2.4e5]
+
+    max_feasible = csp_power_block_gross_max_feasible_kwh(q_startup, e_startup, w_gross, e_tes, eta, q_pb, **params)
+    expected = [row_max_feasible_kwh(*row) for row in zip(q_startup, e_startup, w_gross, e_tes, eta, q_pb)]
+    assert max_feasible == pytest.approx(expected, nan_ok=True)
+    assert np.isnan(max_feasible[6])
@@ -1,4 +1,5 @@
-from pytest import approx, fixture
+from pytest import approx, fixture, raises
+import numpy as np
 import json
 
 from hopp import ROOT_DIR
@@ -408,3 +409,36 @@ def test_hybrid_detailed_pv_with_wind_storage_dispatch(site):
     assert npvs.wind == approx(npv_expected_wind, 1e-3)
     assert npvs.battery == approx(npv_expected_battery, 1e-3)
     assert npvs.hybrid == approx(npv_expected_hybrid, 1e-3)
+
+
+def test_custom_financial_batch_evaluate():
+    model = CustomFinancialModel(DEFAULT_FIN_CONFIG)
+    model.value('total_installed_cost', 1e6)
+    model.value('system_capacity', 1e3)
+    model.value('annual_energy_pre_curtailment_ac', 2e6)
+    model.value('degradation', [0.005] * 25)
+    model.value('ppa_price_input', [0.05])
+    model.value('ppa_escalation', 0)
+    model.value('analysis_period', 25)
+
+    ppa_prices = np.array([0.03, 0.05, 0.08])
+    real_discount_rates = np.array([6.4, 6.4, 8.0])
+    batch = model.batch_evaluate(ppa_price_input=ppa_prices, real_discount_rate=real_discount_rates)
+
+    # Each scenario matches the single-scenario cash flow and NPV
+    for i, (ppa_price, real_discount_rate) in enumerate(zip(ppa_prices, real_discount_rates)):
+        model.value('ppa_price_input', [ppa_price])
+        model.value('real_discount_rate', real_discount_rate)
+        cash_flow = model.net_cash_flow(25)
+        rate = model.nominal_discount_rate(model.value('inflation_rate'), real_discount_rate) / 100
+        assert batch['net_present_value'][i] == approx(CustomFinancialModel.npv(rate, cash_flow))
+        assert CustomFinancialModel.npv(batch['internal_rate_of_return'][i] / 100, cash_flow) == approx(0, abs=1e-3)
+
+    # Without escalation, a PPA price equal to the nominal LCOE breaks even
+    lcoe_nom = batch['levelized_cost_of_energy_nominal'][0] / 100
+    breakeven = model.batch_evaluate(ppa_price_input=lcoe_nom, real_discount_rate=6.4)
+    assert breakeven['net_present_value'][0] == approx(0, abs=1e-3)
+    assert batch['levelized_cost_of_energy_real'][0] < batch['levelized_cost_of_energy_nominal'][0]
+
+    with raises(ValueError):
+        model.batch_evaluate(discount_rate=[0.05])
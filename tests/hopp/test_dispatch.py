@@ -1,5 +1,9 @@
+import importlib.util
+import json
 from pathlib import Path
 import pytest
+import numpy as np
+import pandas as pd
 import pyomo.environ as pyomo
 from pyomo.environ import units as u
 from pyomo.opt import TerminationCondition
@@ -22,7 +26,15 @@ from hopp.simulation.technologies.battery import Battery, BatteryConfig
 
 from hopp.simulation.technologies.dispatch.power_storage.linear_voltage_convex_battery_dispatch import ConvexLinearVoltageBatteryDispatch
 from hopp.simulation.technologies.dispatch.power_storage.simple_battery_dispatch import SimpleBatteryDispatch
-from hopp.simulation.technologies.dispatch.hybrid_dispatch_builder_solver import HybridDispatchBuilderSolver, HybridDispatchOptions
+from hopp.simulation.technologies.dispatch.hybrid_dispatch_builder_solver import HybridDispatchBuilderSolver, HybridDispatchOptions, SolverOptions
+from hopp.simulation.technologies.dispatch.matrix_dispatch import MatrixDispatchLP
+from hopp.simulation.technologies.dispatch import DispatchProblemState
+from hopp.simulation.technologies.dispatch.dispatch_problem_state import PARQUET_SUMMARY_KEY
+from hopp.simulation.technologies.dispatch.dispatch_solution_cache import (
+    CACHED_RESULTS,
+    DispatchSolutionCache,
+    shared_solution_cache
+)
 from hopp.simulation.technologies.dispatch.power_sources.pv_dispatch import PvDispatch
 from hopp.simulation.technologies.dispatch.power_sources.wind_dispatch import WindDispatch
 
@@ -119,6 +131,37 @@ def test_solar_dispatch(site):
         assert dispatch_generation[t] * 1e3 == pytest.approx(available_resource[t], 1e-3)
 
 
+def test_set_block_params(site):
+    dispatch_n_look_ahead = 48
+
+    config = PVConfig.from_dict(technologies['pv'])
+    solar = PVPlant(site, config=config)
+
+    model = pyomo.ConcreteModel(name='solar_only')
+    model.forecast_horizon = pyomo.Set(initialize=range(dispatch_n_look_ahead))
+    dispatch = PvDispatch(model,
+                          model.forecast_horizon,
+                          solar._system_model,
+                          solar._financial_model)
+
+    resource = np.linspace(0, 100, dispatch_n_look_ahead) / 3
+    for scale in (1, 2):    # first and later updates of the rolling horizon
+        dispatch.available_generation = resource * scale
+        assert dispatch.available_generation == pytest.approx(np.round(resource * scale, dispatch.round_digits),
+                                                              abs=1e-12)
+        assert pyomo.value(model.pv[10].available_generation) == round(resource[10] * scale, dispatch.round_digits)
+
+    # single values are set for every period
+    dispatch.set_block_params('cost_per_generation', 1.234567)
+    assert all(model.pv[t].cost_per_generation.value == 1.2346 for t in model.forecast_horizon)
+
+    # values outside the parameter's domain are rejected by Pyomo, as with per-period updates
+    with pytest.raises(ValueError):
+        dispatch.cost_per_generation = -1.0
+    with pytest.raises(ValueError):
+        dispatch.set_block_params('available_generation', resource[:-1])
+
+
 def test_csp_dispatch_model(site):
     expected_objective = 217896.9003
     dispatch_n_look_ahead = 48
@@ -992,3 +1035,461 @@ def test_simple_battery_dispatch_lifecycle_limit(site):
     assert sum(battery.dispatch.discharge_power) > 0.0
     assert (sum(battery.dispatch.charge_power) * battery.dispatch.round_trip_efficiency / 100.0
             == pytest.approx(sum(battery.dispatch.discharge_power)))
+
+
+def test_appsi_persistent_dispatch_warm_start(site):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    hopp_config = {
+        "site": site,
+        "technologies": solar_battery_technologies,
+        "config": {
+            "dispatch_options": {'grid_charging': False}
+        }
+    }
+    hi = HoppInterface(hopp_config)
+    hybrid_plant = hi.system
+    hybrid_plant.pv.simulate(1)
+
+    builder = hybrid_plant.dispatch_builder
+    builder.dispatch.initialize_parameters()
+    builder.dispatch.update_time_series_parameters(0)
+
+    opt = HybridDispatchBuilderSolver.create_appsi_persistent_solver('appsi_highs')
+    solver_options = SolverOptions({}, "")
+    results = HybridDispatchBuilderSolver.appsi_persistent_solve(opt, builder.pyomo_model, solver_options)
+    assert results.solver.termination_condition == TerminationCondition.optimal
+    objective = pyomo.value(builder.dispatch.objective_value)
+
+    # Shifting the solution moves each period's values one period earlier
+    soc = list(hybrid_plant.battery.dispatch.soc)
+    builder.shift_solution_for_warm_start(1)
+    assert list(hybrid_plant.battery.dispatch.soc) == pytest.approx(soc[1:] + soc[-1:])
+
+    # Re-solving from the warm start after a parameter-only update gives the same optimum
+    assert HybridDispatchBuilderSolver.is_warm_start_capable(opt)
+    assert not HybridDispatchBuilderSolver.is_warm_start_capable(None)
+    results = HybridDispatchBuilderSolver.appsi_persistent_solve(opt, builder.pyomo_model, solver_options,
+                                                                 warm_start=True)
+    assert results.solver.termination_condition == TerminationCondition.optimal
+    assert pyomo.value(builder.dispatch.objective_value) == pytest.approx(objective, 1e-3)
+
+
+def test_appsi_persistent_dispatch_variable_bounds(site):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    hopp_config = {
+        "site": site,
+        "technologies": solar_battery_technologies,
+        "config": {
+            "dispatch_options": {'grid_charging': False}
+        }
+    }
+    hi = HoppInterface(hopp_config)
+    hybrid_plant = hi.system
+    hybrid_plant.pv.simulate(1)
+
+    builder = hybrid_plant.dispatch_builder
+    builder.dispatch.initialize_parameters()
+    builder.dispatch.update_time_series_parameters(0)
+
+    opt = HybridDispatchBuilderSolver.create_appsi_persistent_solver('appsi_highs')
+    solver_options = SolverOptions({}, "")
+    hybrid_plant.battery.dispatch.initial_soc = 60.
+    HybridDispatchBuilderSolver.appsi_persistent_solve(opt, builder.pyomo_model, solver_options)
+    assert min(hybrid_plant.battery.dispatch.soc) < 50.
+
+    # Raising the state-of-charge minimum between solves must reach the persistent solver
+    hybrid_plant.battery.dispatch.minimum_soc = 50.
+    results = HybridDispatchBuilderSolver.appsi_persistent_solve(opt, builder.pyomo_model, solver_options)
+    assert results.solver.termination_condition == TerminationCondition.optimal
+    assert min(hybrid_plant.battery.dispatch.soc) == pytest.approx(50.)
+
+
+def test_cbc_persistent_dispatch(site):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    outputs = {}
+    for solver in ('cbc', 'cbc_persistent'):
+        hopp_config = {
+            "site": site,
+            "technologies": solar_battery_technologies,
+            "config": {
+                "dispatch_options": {'solver': solver,
+                                     'grid_charging': False,
+                                     'is_test_start_year': True}
+            }
+        }
+        hi = HoppInterface(hopp_config)
+        hi.simulate(1)
+        problem_state = hi.system.dispatch_builder.problem_state
+        assert problem_state.n_non_optimal_solves == 0
+        outputs[solver] = (sum(problem_state.objective), hi.system.battery.outputs.dispatch_SOC[:48])
+
+    assert not HybridDispatchBuilderSolver.is_warm_start_capable(hi.system.dispatch_builder.opt)
+    assert outputs['cbc_persistent'][0] == pytest.approx(outputs['cbc'][0], 1e-4)
+    assert outputs['cbc_persistent'][1] == pytest.approx(outputs['cbc'][1], abs=0.1)
+
+
+def test_highs_dispatch(site):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    hopp_config = {
+        "site": site,
+        "technologies": solar_battery_technologies,
+        "config": {
+            "dispatch_options": {'solver': 'highs',
+                                 'solver_options': {'mip_rel_gap': 0.01},
+                                 'grid_charging': False,
+                                 'is_test_start_year': True}
+        }
+    }
+    hi = HoppInterface(hopp_config)
+    hi.simulate(1)
+
+    problem_state = hi.system.dispatch_builder.problem_state
+    assert len(problem_state.termination_condition) == 5
+    assert problem_state.n_non_optimal_solves == 0
+
+    assert HybridDispatchOptions().solver == 'cbc'
+
+
+def test_dispatch_problem_metrics(site, tmp_path):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    metrics_file = tmp_path / "dispatch_metrics.csv"
+    hopp_config = {
+        "site": site,
+        "technologies": solar_battery_technologies,
+        "config": {
+            "dispatch_options": {'solver': 'highs',
+                                 'grid_charging': False,
+                                 'is_test_start_year': True,
+                                 'problem_metrics_file': str(metrics_file)}
+        }
+    }
+    hi = HoppInterface(hopp_config)
+    hi.simulate(1)
+
+    problem_state = hi.system.dispatch_builder.problem_state
+    assert problem_state.n_solves == 5
+    assert list(problem_state.start_time) == [0, 24, 48, 72, 96]
+    assert all(problem_state.update_time > 0)
+    assert all(problem_state.wall_time > 0)
+    with pytest.raises(ValueError):
+        problem_state.objective[0] = 0.0
+
+    summary = problem_state.summary()
+    assert summary['n_solves'] == 5
+    assert summary['n_non_optimal_solves'] == 0
+    assert summary['build_time'] > 0
+    assert summary['total_update_time'] == pytest.approx(sum(problem_state.update_time))
+
+    metrics = pd.read_csv(metrics_file)
+    assert len(metrics) == 5
+    assert list(metrics['termination_condition']) == list(problem_state.termination_condition)
+    assert metrics['objective'].to_numpy() == pytest.approx(problem_state.objective)
+
+    parquet_file = tmp_path / "dispatch_metrics.parquet"
+    if importlib.util.find_spec('pyarrow') is None:
+        with pytest.raises(ImportError):
+            HybridDispatchOptions({'problem_metrics_file': str(parquet_file)})
+        with pytest.raises(ImportError):
+            problem_state.export(parquet_file)
+    else:
+        import pyarrow.parquet
+        problem_state.export(parquet_file)
+        assert len(pd.read_parquet(parquet_file)) == 5
+        metadata = pyarrow.parquet.read_schema(parquet_file).metadata
+        assert json.loads(metadata[PARQUET_SUMMARY_KEY])['n_solves'] == 5
+
+    # metric storage grows past its preallocated size
+    combined = DispatchProblemState(n_solves=1)
+    combined.extend(problem_state)
+    combined.extend(problem_state)
+    assert combined.n_solves == 10
+    assert list(combined.start_time) == list(problem_state.start_time) * 2
+    assert len(combined.to_dataframe()) == 10
+
+
+def test_dispatch_solution_cache(site, tmp_path):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+
+    def simulate(cache_size):
+        hopp_config = {
+            "site": site,
+            "technologies": solar_battery_technologies,
+            "config": {
+                "dispatch_options": {'solver': 'highs',
+                                     'grid_charging': False,
+                                     'is_test_start_year': True,
+                                     'solution_cache_size': cache_size,
+                                     'solution_cache_dir': str(tmp_path)}
+            }
+        }
+        hi = HoppInterface(hopp_config)
+        hi.simulate(1)
+        return hi.system
+
+    system = simulate(16)
+    assert system.dispatch_builder.problem_state.summary()['n_cache_hits'] == 0
+    assert len(list(tmp_path.glob("*.npz"))) == 5
+
+    # identical inputs reuse the solutions kept in memory
+    cached_system = simulate(16)
+    problem_state = cached_system.dispatch_builder.problem_state
+    assert problem_state.summary()['n_cache_hits'] == 5
+    assert problem_state.objective == pytest.approx(system.dispatch_builder.problem_state.objective)
+    assert cached_system.battery.outputs.dispatch_SOC == pytest.approx(system.battery.outputs.dispatch_SOC)
+    assert cached_system.grid.generation_profile == pytest.approx(system.grid.generation_profile)
+
+    # a new cache with the same directory loads the solutions from disk
+    assert len(shared_solution_cache(8, str(tmp_path))) == 0
+    disk_system = simulate(8)
+    assert disk_system.dispatch_builder.problem_state.summary()['n_cache_hits'] == 5
+    assert disk_system.battery.outputs.dispatch_SOC == pytest.approx(system.battery.outputs.dispatch_SOC)
+
+    # unreadable solution files are misses, and are replaced without leaving temporary files
+    cache = DispatchSolutionCache(4, tmp_path)
+    solution_file = sorted(tmp_path.glob("*.npz"))[0]
+    solution_file.write_bytes(b"partial")
+    assert cache.get(solution_file.stem) is None
+    assert cache.misses == 1
+    cache.put(solution_file.stem, np.arange(3), {name: 1.0 for name in CACHED_RESULTS})
+    assert DispatchSolutionCache(4, tmp_path).get(solution_file.stem)[0] == pytest.approx([0, 1, 2])
+    assert len(list(tmp_path.glob("*.npz"))) == 5
+
+
+def test_dispatch_horizon_tuning(site, monkeypatch):
+    builds = []
+    build_dispatch_model = HybridDispatchBuilderSolver.build_dispatch_model
+    monkeypatch.setattr(HybridDispatchBuilderSolver, 'build_dispatch_model',
+                        lambda self: builds.append(self.options.n_look_ahead_periods) or build_dispatch_model(self))
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    hopp_config = {
+        "site": site,
+        "technologies": solar_battery_technologies,
+        "config": {
+            "dispatch_options": {'solver': 'highs',
+                                 'grid_charging': False,
+                                 'is_test_start_year': True,
+                                 'tune_horizon': True,
+                                 'horizon_candidates': [[24, 24], [48, 24]],
+                                 'n_horizon_tuning_samples': 2,
+                                 'n_horizon_tuning_days': 2,
+                                 'horizon_revenue_tolerance': 0.0}
+        }
+    }
+    hi = HoppInterface(hopp_config)
+    hi.simulate(1)
+
+    dispatch_builder = hi.system.dispatch_builder
+    benchmark = dispatch_builder.horizon_benchmark
+    assert list(benchmark['n_look_ahead_periods']) == [24, 48]
+    assert list(benchmark['n_solves']) == [4, 4]
+    assert all(benchmark['run_time'] > 0)
+    assert benchmark['relative_revenue'].max() == 1.0
+
+    # without revenue tolerance the candidate with the most revenue is chosen
+    best = benchmark.loc[benchmark['revenue'].idxmax()]
+    assert dispatch_builder.options.n_look_ahead_periods == best['n_look_ahead_periods']
+    assert len(hi.system.battery.dispatch.blocks) == best['n_look_ahead_periods']
+    assert dispatch_builder.problem_state.n_solves == 5
+    assert hi.system.annual_energies.battery != 0
+    # the model is built for each candidate, then once for the chosen one
+    assert builds[-3:] == [24, 48, best['n_look_ahead_periods']]
+
+    # each solve records its own start time, and the last roll is cut at the end of the sample
+    benchmark = dispatch_builder.benchmark_horizons([[48, 36]], [24], 2, rebuild=False)
+    assert list(dispatch_builder.problem_state.start_time) == [24, 60]
+    assert benchmark['revenue'][0] == pytest.approx(
+        dispatch_builder.dispatch_sample_revenue(24, 1) + dispatch_builder.dispatch_sample_revenue(48, 1), rel=0.05)
+    assert dispatch_builder.options.n_roll_periods == 24
+
+    benchmark = pd.DataFrame({'n_look_ahead_periods': [24, 48, 72],
+                              'n_roll_periods': [24, 24, 24],
+                              'run_time': [1.0, 2.0, 4.0],
+                              'revenue': [98.0, 99.6, 100.0]})
+    assert HybridDispatchBuilderSolver.select_horizon(benchmark, 0.005) == (48, 24)
+    assert HybridDispatchBuilderSolver.select_horizon(benchmark, 0.03) == (24, 24)
+    assert HybridDispatchBuilderSolver.select_horizon(benchmark, 0.0) == (72, 24)
+
+
+def test_mixed_resolution_look_ahead(site):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    hopp_config = {
+        "site": site,
+        "technologies": solar_battery_technologies,
+        "config": {
+            "dispatch_options": {'solver': 'highs',
+                                 'grid_charging': False,
+                                 'is_test_start_year': True,
+                                 'look_ahead_block_periods': 4}
+        }
+    }
+    hi = HoppInterface(hopp_config)
+    dispatch_builder = hi.system.dispatch_builder
+    assert len(dispatch_builder.pyomo_model.forecast_horizon) == 24 + 6
+
+    dispatch_builder.options.look_ahead_block_periods = 5
+    assert dispatch_builder.horizon_period_lengths() == [1] * 24 + [5] * 4 + [4]
+    dispatch_builder.options.look_ahead_block_periods = 4
+
+    hi.simulate(1)
+    assert dispatch_builder.problem_state.n_solves == 5
+    assert hi.system.annual_energies.battery != 0
+
+    battery_dispatch = hi.system.battery.dispatch
+    assert battery_dispatch.time_duration == [1.0] * 24 + [4.0] * 6
+    assert battery_dispatch.day_periods(0) == list(range(24))
+    assert battery_dispatch.day_periods(1) == list(range(24, 30))
+    assert len(battery_dispatch.lifecycles) == 2
+
+    # look-ahead periods are dispatched with time series averaged over their time steps
+    grid_dispatch = hi.system.grid.dispatch
+    hourly_prices = np.array(hi.system.grid._financial_model.value("dispatch_factors_ts")[96:144]) \
+        * hi.system.grid._financial_model.value("ppa_price_input")[0] * 1e3
+    assert grid_dispatch.electricity_sell_price[:24] == pytest.approx(hourly_prices[:24], abs=1e-4)
+    assert grid_dispatch.electricity_sell_price[24] == pytest.approx(hourly_prices[24:28].mean(), abs=1e-4)
+    pv_generation = np.array(hi.system.pv.generation_profile[96:144]) / 1e3
+    assert hi.system.pv.dispatch.available_generation[25] == pytest.approx(pv_generation[28:32].mean(), abs=1e-3)
+
+    # the warm start shifts values by time step: each hour of the next window takes the aggregated period it was in
+    soc = list(battery_dispatch.soc)
+    dispatch_builder.shift_solution_for_warm_start(24)
+    assert list(battery_dispatch.soc) == pytest.approx([soc[24 + i // 4] for i in range(24)] + soc[24:])
+    soc = list(battery_dispatch.soc)
+    dispatch_builder.shift_solution_for_warm_start(2)
+    assert list(battery_dispatch.soc) == pytest.approx(soc[2:24] + [soc[24]] * 3 + soc[25:])
+
+
+def test_highs_matrix_dispatch(site):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    outputs = {}
+    for solver in ('highs', 'highs_matrix'):
+        hopp_config = {
+            "site": site,
+            "technologies": solar_battery_technologies,
+            "config": {
+                "dispatch_options": {'solver': solver,
+                                     'grid_charging': False,
+                                     'is_test_start_year': True}
+            }
+        }
+        hi = HoppInterface(hopp_config)
+        hi.simulate(1)
+
+        problem_state = hi.system.dispatch_builder.problem_state
+        assert len(problem_state.termination_condition) == 5
+        assert problem_state.n_non_optimal_solves == 0
+        outputs[solver] = (problem_state.objective,
+                           hi.system.battery.outputs.dispatch_SOC[:120],
+                           hi.system.grid.generation_profile[:120])
+
+    assert outputs['highs_matrix'][0] == pytest.approx(outputs['highs'][0], 1e-4)
+    assert outputs['highs_matrix'][1] == pytest.approx(outputs['highs'][1], abs=0.1)
+    assert outputs['highs_matrix'][2] == pytest.approx(outputs['highs'][2], rel=1e-2)
+
+    # parameter changes are picked up in the next solve
+    builder = hi.system.dispatch_builder
+    opt = builder.opt
+    assert isinstance(opt, MatrixDispatchLP)
+    # all parameter-dependent coefficients are mapped to their parameters
+    assert not opt._pyomo_expressions
+    hi.system.grid.dispatch.electricity_sell_price = [2 * p for p in hi.system.grid.dispatch.electricity_sell_price]
+    results = opt.solve()
+    assert results.solver.termination_condition == TerminationCondition.optimal
+    assert results.problem.number_of_variables == len(opt.variables)
+    objective = pyomo.value(builder.dispatch.objective_value)
+
+    appsi_opt = HybridDispatchBuilderSolver.create_appsi_persistent_solver('appsi_highs')
+    HybridDispatchBuilderSolver.appsi_persistent_solve(appsi_opt, builder.pyomo_model, SolverOptions({}, ""))
+    assert pyomo.value(builder.dispatch.objective_value) == pytest.approx(objective, 1e-4)
+
+
+def segment_divergence(serial, parallel, boundaries, n_periods):
+    """
+    Divergence of a battery simulated in parallel dispatch segments from the serial simulation
+
+    :param serial: battery outputs of the serial simulation
+    :param parallel: battery outputs of the segmented simulation
+    :param boundaries: first time period of each segment after the first
+    :param n_periods: number of periods after each boundary to compare the SOC over
+    :return: largest absolute SOC difference [%] after the boundaries, relative differences of the total generation
+        and of the final cycle count
+    """
+    soc_error = max(np.abs(np.array(parallel.SOC[b:b + n_periods]) - np.array(serial.SOC[b:b + n_periods])).max()
+                    for b in boundaries)
+    gen_error = abs(sum(parallel.gen) / sum(serial.gen) - 1)
+    cycles_error = abs(parallel.n_cycles[-1] / serial.n_cycles[-1] - 1)
+    return soc_error, gen_error, cycles_error
+
+
+def test_hybrid_dispatch_parallel_segments(site):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+    fixed_dispatch = [0.0] * 6 + [-1.0] * 6 + [1.0] * 6 + [0.0] * 6
+
+    battery_outputs = {}
+    for n_segments in (1, 3):
+        hopp_config = {
+            "site": site,
+            "technologies": solar_battery_technologies,
+            "config": {
+                "dispatch_options": {'battery_dispatch': 'heuristic',
+                                     'grid_charging': False,
+                                     'n_dispatch_segments': n_segments}
+            }
+        }
+        hi = HoppInterface(hopp_config)
+        hi.system.battery.dispatch.user_fixed_dispatch = fixed_dispatch
+        hi.simulate(1)
+        battery_outputs[n_segments] = hi.system.battery.outputs
+
+        boundary_errors = hi.system.dispatch_builder.segment_boundary_soc_error
+        assert len(boundary_errors) == n_segments - 1
+        for error in boundary_errors:
+            assert error < 5.0
+
+    serial, parallel = battery_outputs[1], battery_outputs[3]
+    assert len(parallel.gen) == len(serial.gen) == 8760
+    # first segment is simulated exactly as in series, and the first day of the next is re-solved from its end SOC
+    # (the battery temperature and capacity are not carried over)
+    assert parallel.SOC[:122 * 24] == pytest.approx(serial.SOC[:122 * 24])
+    soc_error, gen_error, cycles_error = segment_divergence(serial, parallel, (122 * 24, 244 * 24), 24)
+    assert soc_error < 2.2
+    assert gen_error < 0.025
+    assert cycles_error < 0.015
+
+
+def test_hybrid_dispatch_parallel_segments_optimized(site):
+    solar_battery_technologies = {k: technologies[k] for k in ('pv', 'battery', 'grid')}
+
+    battery_outputs = {}
+    objectives = {}
+    for n_segments in (1, 2):
+        hopp_config = {
+            "site": site,
+            "technologies": solar_battery_technologies,
+            "config": {
+                "dispatch_options": {'solver': 'highs',
+                                     'grid_charging': False,
+                                     'n_dispatch_segments': n_segments,
+                                     'n_segment_overlap_days': 2}
+            }
+        }
+        hi = HoppInterface(hopp_config)
+        hi.simulate(1)
+        builder = hi.system.dispatch_builder
+        battery_outputs[n_segments] = hi.system.battery.outputs
+        # re-solved days are stored after the segments' solves
+        objectives[n_segments] = sum(builder.problem_state.objective[:365])
+
+        boundary_errors = builder.segment_boundary_soc_error
+        assert len(boundary_errors) == n_segments - 1
+        assert builder.problem_state.n_non_optimal_solves == 0
+
+    serial, parallel = battery_outputs[1], battery_outputs[2]
+    boundary = 183 * 24
+    assert parallel.SOC[:boundary] == pytest.approx(serial.SOC[:boundary])
+    # the SOC at the boundary is carried over from the first segment as in series
+    soc_error, gen_error, cycles_error = segment_divergence(serial, parallel, (boundary,), 48)
+    assert soc_error < 0.7
+    assert gen_error < 0.007
+    # one cycle of the year
+    assert cycles_error < 0.025
+    assert objectives[2] == pytest.approx(objectives[1], rel=0.01)
@@ -149,3 +149,19 @@ def test_swept_area():
     expected_bounds = (-63.34583, -19.71403, 0.1617619, 0.6037036)
     for b in range(4):
         assert shadow.bounds[b] == approx(expected_bounds[b])
+
+
+def test_get_sun_pos():
+    lat = 39.7555
+    lon = -105.2211
+    azi_ang, elv_ang, dates = get_sun_pos(lat, lon, step_in_minutes=15, n=24 * 4 * 3, start_hr=6)
+    assert len(azi_ang) == len(elv_ang) == len(dates) == 24 * 4 * 3
+    for i in range(0, len(dates), 7):
+        assert azi_ang[i] == approx(get_azimuth(lat, lon, dates[i]), abs=1e-6)
+        assert elv_ang[i] == approx(get_altitude(lat, lon, dates[i]), abs=1e-6)
+
+    azi_steps, elv_steps, _ = get_sun_pos(lat, lon, step_in_minutes=15, steps=range(24, 48))
+    assert azi_steps == approx(azi_ang[:24])
+    assert elv_steps == approx(elv_ang[:24])
+
+    assert get_time_zone(lat, lon) is get_time_zone(lat, lon)
@@ -1,5 +1,6 @@
-import platform
+import multiprocessing as mp
 from pytest import approx
+from shapely.geometry import Point
 from hopp.simulation.technologies.layout.flicker_data.plot_flicker import *
 
 lat = 39.7555
@@ -44,8 +45,6 @@ def test_single_turbine_multiple_angles(subtests):
 
     with subtests.test("run parallel"):
         # run parallel
-        if platform.system() != "Darwin":
-            return
         shadow_p, loss_p = flicker.run_parallel(2, ("poa", "power",), (range(3185, 3186), range(3186, 3187)))
 
         assert(np.max(shadow_p) == approx(1.0, 1e-4))
@@ -56,7 +55,29 @@ def test_single_turbine_multiple_angles(subtests):
         assert(np.count_nonzero(loss_p) == 3010)
 
 
-def test_single_turbine_time_weighted():
+def test_shaded_modules():
+    shadow = Point(0, 0).buffer(10).difference(Point(0, 0).buffer(3)).union(Point(30, 0).buffer(5))
+    xx, yy = np.meshgrid(np.arange(-15.5, 40, 1.), np.arange(-15.5, 15, 1.))
+    mods_xy = np.column_stack((xx.ravel(), yy.ravel()))
+
+    shaded = FlickerMismatch._shaded_modules(shadow, mods_xy)
+    assert [Point(xy).within(shadow) for xy in mods_xy] == shaded.tolist()
+
+
+def test_module_arrays_cache():
+    FlickerMismatch.diam_mult_nwe = 3
+    FlickerMismatch.diam_mult_s = 1
+    flicker = FlickerMismatch(lat, lon, angles_per_step=1)
+    mods_xy = flicker._get_module_arrays()[0]
+    assert flicker._get_module_arrays()[0] is mods_xy
+
+    # arrays are recomputed for new string points
+    flicker.array_string_points = flicker.array_string_points[:1]
+    assert flicker.module_arrays is None
+    assert 0 < len(flicker._get_module_arrays()[0]) < len(mods_xy)
+
+
+def test_single_turbine_time_weighted(monkeypatch):
     # two time steps: one with shading, one without
     FlickerMismatch.diam_mult_nwe = 3
     FlickerMismatch.diam_mult_s = 1
@@ -67,8 +88,6 @@ def test_single_turbine_time_weighted():
     assert(np.average(hours_shaded) == approx(0.0016010, 1e-4))
     assert(np.count_nonzero(hours_shaded) == 435)
 
-    if platform.system() != "Darwin":
-        return
     intervals = (range(3187, 3188), range(3188, 3189))
     (hours_shaded_p, ) = flicker.run_parallel(2, ("time",), intervals)
     # plot_maps((hours_shaded, hours_shaded_p), flicker)
@@ -77,6 +96,20 @@ def test_single_turbine_time_weighted():
     assert(np.average(hours_shaded_p) == approx(0.0016010, 1e-4))
     assert(np.count_nonzero(hours_shaded_p) == 435)
 
+    # chunks from a single interval, by chunk size or a custom scheduler
+    assert FlickerMismatch.chunk_steps((range(3187, 3189), range(10, 15)), 2) == [range(3187, 3189), range(10, 12),
+                                                                                  range(12, 14), range(14, 15)]
+    (hours_shaded_c, ) = flicker.run_parallel(2, ("time",), (range(3187, 3189), ), chunk_size=1)
+    assert hours_shaded_c == approx(hours_shaded_p)
+    (hours_shaded_c, ) = flicker.run_parallel(2, ("time",), (range(3187, 3189), ),
+                                              scheduler=lambda steps, n_procs: FlickerMismatch.chunk_steps(steps, 1))
+    assert hours_shaded_c == approx(hours_shaded_p)
+
+    # workers are spawned where processes can not be forked, i.e. on Windows
+    monkeypatch.setattr(mp, "get_all_start_methods", lambda: ["spawn"])
+    (hours_shaded_s, ) = flicker.run_parallel(2, ("time",), intervals)
+    assert hours_shaded_s == approx(hours_shaded_p)
+
 
 def test_single_turbine_time_weighted_no_tower():
     FlickerMismatch.turbine_tower_shadow = False
@@ -157,8 +190,6 @@ def test_grid(subtests):
 
     with subtests.test("run parallel"):
         # run parallel with  multiple angles
-        if platform.system() != "Darwin":
-            return
         flicker = FlickerMismatchGrid(lat, lon, dx, dy, angle, angles_per_step=3)
         intervals = (range(3185, 3186), range(3186, 3187))
         shadow_p, loss_p = flicker.run_parallel(2, ("poa", "power"), intervals)
@@ -6,6 +6,7 @@ import numpy as np
 from numpy.testing import assert_array_equal, assert_approx_equal
 
 from hopp.simulation.technologies.grid import GridConfig, Grid
+from hopp.simulation.technologies.lifetime_profile import LifetimeProfile
 from tests.hopp.utils import create_default_site_info
 
 
@@ -89,6 +90,23 @@ def test_simulate_grid_connection(mock_simulate_power, site, subtests):
         )
         assert_array_equal(grid.generation_profile, total_gen)
 
+    with subtests.test("no desired schedule: partial year profile"):
+        grid.simulate_grid_connection(
+            hybrid_size_kw,
+            total_gen[:100],
+            project_life,
+            lifetime_sim,
+            total_gen_max_feasible_year1
+        )
+        assert_array_equal(grid.generation_profile, total_gen[:100])
+        grid.simulate_grid_connection(
+            hybrid_size_kw,
+            total_gen,
+            project_life,
+            lifetime_sim,
+            total_gen_max_feasible_year1
+        )
+
     with subtests.test("update attributes"):
         mock_simulate_power.assert_called_with(project_life, lifetime_sim)
         assert_array_equal(grid.total_gen_max_feasible_year1, total_gen_max_feasible_year1)
@@ -128,3 +146,48 @@ def test_simulate_grid_connection(mock_simulate_power, site, subtests):
 
         assert_array_equal(grid.schedule_curtailed, np.repeat([2000], timesteps)) 
         assert_approx_equal(grid.schedule_curtailed_percentage, 2/3)
+
+    with subtests.test("follow desired schedule: repeated year profile"):
+        year1_gen = np.tile([0., 2000., 5000.], site.n_timesteps // 3)
+        grid.simulate_grid_connection(
+            hybrid_size_kw,
+            LifetimeProfile(year1_gen, site.n_timesteps, project_life),
+            project_life,
+            lifetime_sim,
+            total_gen_max_feasible_year1
+        )
+
+        lifetime_gen = np.tile(year1_gen, project_life)
+        assert_array_equal(grid.generation_profile, np.minimum(lifetime_gen, 3000))
+        assert_array_equal(grid.missed_load, 3000 - np.minimum(lifetime_gen, 3000))
+        assert_approx_equal(grid.missed_load_percentage, 4/9)
+        assert_array_equal(grid.schedule_curtailed, np.maximum(lifetime_gen - 3000, 0))
+        assert_approx_equal(grid.schedule_curtailed_percentage, 2/9)
+
+
+def test_lifetime_profile(site):
+    n_timesteps = site.n_timesteps
+    project_life = 4
+    year1 = np.arange(n_timesteps, dtype=float)
+    repeated = LifetimeProfile(year1, n_timesteps, project_life)
+    assert repeated.is_repeated_year
+    assert len(repeated) == n_timesteps * project_life
+    assert repeated.years.shape == (project_life, n_timesteps)
+    assert repeated.years.strides[0] == 0
+    assert not repeated.years.flags.writeable
+    assert_array_equal(repeated.to_array(), np.tile(year1, project_life))
+    assert_approx_equal(repeated.sum(), year1.sum() * project_life)
+
+    two_years = LifetimeProfile(np.concatenate((year1, 2 * year1)), n_timesteps, project_life)
+    assert not two_years.is_repeated_year
+    assert_array_equal(two_years.annual_sums(), year1.sum() * np.array([1, 2, 1, 2]))
+
+    total = repeated + two_years
+    assert_array_equal(total.to_array(), np.tile(year1, project_life) + np.tile(np.concatenate((year1, 2 * year1)), 2))
+    assert (repeated + repeated).is_repeated_year
+    assert_array_equal(repeated.minimum(10).year1, np.minimum(year1, 10))
+
+    with pytest.raises(ValueError):
+        LifetimeProfile(year1[:-1], n_timesteps, project_life)
+    with pytest.raises(ValueError):
+        LifetimeProfile(np.tile(year1, 3), n_timesteps, project_life)
@@ -14,6 +14,7 @@ from hopp.simulation.technologies.financial.mhk_cost_model import MHKCostModelIn
 from tests.hopp.utils import create_default_site_info, DEFAULT_FIN_CONFIG
 from hopp import ROOT_DIR
 from hopp.utilities import load_yaml
+from hopp.tools.utils import Candidates, expand_param_grid
 
 
 @fixture
@@ -568,6 +569,106 @@ def test_hybrid(hybrid_config):
     assert npvs.hybrid == approx(-19216589, 1e3)
 
 
+def test_hybrid_sweep(hybrid_config, subtests):
+    technologies = hybrid_config["technologies"]
+    hybrid_config["technologies"] = {key: technologies[key] for key in ('pv', 'grid')}
+    hybrid_plant = HoppInterface(hybrid_config).system
+
+    param_grid = {'pv': {'system_capacity_kw': Candidates([4000, 6000])}, 'ppa_price': Candidates([0.01, 0.02])}
+    pv_capacity = hybrid_plant.pv.system_capacity_kw
+    outputs = ('annual_energies', 'net_present_values')
+
+    serial = {i: (scenario, out) for i, scenario, out in hybrid_plant.sweep(param_grid, outputs=outputs)}
+    parallel = {i: out for i, _, out in hybrid_plant.sweep(param_grid, n_workers=2, outputs=outputs)}
+
+    with subtests.test("all scenarios"):
+        assert sorted(serial.keys()) == [0, 1, 2, 3]
+        assert sorted(parallel.keys()) == [0, 1, 2, 3]
+
+    with subtests.test("scenario expansion"):
+        assert serial[1][0] == {'pv': {'system_capacity_kw': 4000}, 'ppa_price': 0.02}
+
+    for i, (scenario, out) in serial.items():
+        with subtests.test(f"scenario {i}"):
+            reference_plant = HoppInterface(hybrid_config).system
+            reference_plant.assign(scenario)
+            reference_plant.simulate()
+            assert out['annual_energies']['pv'] == approx(reference_plant.annual_energies.pv)
+            assert out['net_present_values']['hybrid'] == approx(reference_plant.net_present_values.hybrid)
+            assert parallel[i]['annual_energies']['pv'] == approx(out['annual_energies']['pv'])
+            assert parallel[i]['net_present_values']['hybrid'] == approx(out['net_present_values']['hybrid'])
+
+    with subtests.test("inputs restored"):
+        assert hybrid_plant.pv.system_capacity_kw == approx(pv_capacity)
+
+    with subtests.test("scenarios independent"):
+        scenarios = [{'pv': {'system_capacity_kw': 4000}}, {'ppa_price': 0.02}]
+        results = {i: out for i, _, out in hybrid_plant.sweep(scenarios, outputs=outputs)}
+        reference_plant = HoppInterface(hybrid_config).system
+        reference_plant.assign(scenarios[1])
+        reference_plant.simulate()
+        assert results[1]['annual_energies']['pv'] == approx(reference_plant.annual_energies.pv)
+
+
+def test_expand_param_grid():
+    param_grid = {'a': {'b': {'c': Candidates([1, 2])}}, 'd': [3, 4], 'e': Candidates([(5,), (6,)])}
+    scenarios = expand_param_grid(param_grid)
+    assert len(scenarios) == 4
+    assert scenarios[0] == {'a': {'b': {'c': 1}}, 'd': [3, 4], 'e': (5,)}
+    assert scenarios[3] == {'a': {'b': {'c': 2}}, 'd': [3, 4], 'e': (6,)}
+    assert expand_param_grid(scenarios) == scenarios
+
+
+def test_hybrid_resimulate_financials(hybrid_config, subtests):
+    technologies = hybrid_config["technologies"]
+    hybrid_config["technologies"] = {key: technologies[key] for key in ('pv', 'wind', 'grid')}
+    hybrid_plant = HoppInterface(hybrid_config).system
+
+    with subtests.test("before simulate"):
+        with raises(RuntimeError):
+            hybrid_plant.resimulate_financials({'ppa_price': 0.02})
+
+    hybrid_plant.simulate(25)
+    aeps = hybrid_plant.annual_energies
+    npvs = hybrid_plant.net_present_values
+
+    with subtests.test("no changes"):
+        assert hybrid_plant.resimulate_financials() == {'grid'}
+        assert hybrid_plant.net_present_values.hybrid == approx(npvs.hybrid)
+
+    with subtests.test("technology change"):
+        changed = hybrid_plant.resimulate_financials({'pv': {'om_fixed': (1e5,)}})
+        assert changed == {'pv', 'grid'}
+        assert hybrid_plant.net_present_values.pv < npvs.pv
+        assert hybrid_plant.net_present_values.wind == approx(npvs.wind)
+        assert hybrid_plant.annual_energies.hybrid == approx(aeps.hybrid)
+
+    with subtests.test("matches full simulation"):
+        changes = {'ppa_price': 0.02, 'pv': {'om_fixed': (1e5,)}}
+        assert hybrid_plant.resimulate_financials(changes) == {'pv', 'wind', 'grid'}
+        reference_plant = HoppInterface(hybrid_config).system
+        reference_plant.assign(changes)
+        reference_plant.simulate(25)
+        for tech in ('pv', 'wind', 'hybrid'):
+            assert getattr(hybrid_plant.net_present_values, tech) == \
+                approx(getattr(reference_plant.net_present_values, tech))
+
+    with subtests.test("grid only change"):
+        assert hybrid_plant.resimulate_financials({'grid': {'ppa_escalation': 0.01}}) == {'grid'}
+
+    with subtests.test("performance inputs rejected"):
+        capacity = hybrid_plant.pv.system_capacity_kw
+        with raises(ValueError):
+            hybrid_plant.resimulate_financials({'pv': {'system_capacity_kw': capacity * 2, 'om_fixed': (0,)}})
+        assert hybrid_plant.pv.system_capacity_kw == approx(capacity)
+        assert hybrid_plant.pv.value('om_fixed') == approx((1e5,))
+
+    with subtests.test("performance changed"):
+        hybrid_plant.pv.simulate_power(1)
+        with raises(RuntimeError):
+            hybrid_plant.resimulate_financials({'ppa_price': 0.03})
+
+
 def test_wind_pv_with_storage_dispatch(hybrid_config):
     technologies = hybrid_config["technologies"]
     wind_pv_battery = {key: technologies[key] for key in ('pv', 'wind', 'battery', 'grid')}
@@ -4,15 +4,18 @@ from pathlib import Path
 from timeit import default_timer
 import numpy as np
 import json
+import os
 import matplotlib.pyplot as plt
 from shapely import affinity
 from shapely.ops import unary_union
-from shapely.geometry import Point, MultiLineString
+from shapely.geometry import Point, MultiLineString, MultiPoint, LineString
 
 from hopp.simulation.technologies.wind.wind_plant import WindPlant, WindConfig
 from hopp.simulation.technologies.pv.pv_plant import PVPlant, PVConfig
 from hopp.simulation.technologies.layout.hybrid_layout import HybridLayout, WindBoundaryGridParameters, PVGridParameters, get_flicker_loss_multiplier
 from hopp.simulation.technologies.layout.wind_layout_tools import create_grid
+from hopp.simulation.technologies.layout.flicker_library import FlickerHeatmapLibrary
+from hopp.simulation.technologies.layout.flicker_mismatch import FlickerMismatch
 from hopp.simulation.technologies.layout.pv_design_utils import size_electrical_parameters, find_modules_per_string
 from hopp.simulation.technologies.pv.detailed_pv_plant import DetailedPVPlant, DetailedPVConfig
 
@@ -173,6 +176,78 @@ def test_hybrid_layout_rotated_array(site):
     # assert time_points < time_strands
 
 
+def test_flicker_loss_multiplier():
+    # uniform 10% flicker loss within 10 m of a turbine at the origin of the heatmap grid
+    grid = np.arange(-10, 10.5, 1.)
+    flicker_data = (70, (10, 10), np.full((len(grid), len(grid)), 0.1), grid, grid)
+    strand = LineString([(0, -50), (0, 50)])
+    turbines_x, turbines_y = [0, 0, 500], [0, 15, 0]
+
+    # modules every 2 m from where the strand enters each turbine's active area, the last turbine is too far away
+    loss = get_flicker_loss_multiplier(flicker_data, turbines_x, turbines_y, 70, (1, 2),
+                                       primary_strands=[(50, strand.length, strand)])
+    assert loss == approx(1 - 2 * 11 * 0.1 / 50)
+
+    module_points = MultiPoint([strand.interpolate(d) for d in np.arange(0, strand.length + 1, 2)])
+    loss = get_flicker_loss_multiplier(flicker_data, turbines_x, turbines_y, 70, (1, 2),
+                                       module_points=module_points)
+    assert loss == approx(1 - (11 + 10) * 0.1 / 51)
+
+
+def test_flicker_heatmap_library(tmp_path):
+    library = FlickerHeatmapLibrary(tmp_path)
+    assert library.nearest(35.2, -101.9) is None
+
+    grid = np.arange(-10, 10.5, 1.)
+    for lat, lon, diameter in ((35.21, -101.94, 70), (35.2, -101.9, 100), (39.75, -105.22, 100)):
+        heatmap = np.full((len(grid), len(grid)), diameter / 1000)
+        library.save((diameter, (10, 10), heatmap, grid, grid), lat, lon, 1, None)
+    # legacy text format
+    np.savetxt(tmp_path / "33.209_-108.283_4_12_shadow.txt", np.zeros((3, 3)))
+
+    index = library.index
+    assert len(index) == 4
+    assert (tmp_path / "flicker_library.csv").is_file()
+    assert index['mtime_ns'].dtype.kind == 'i'
+    assert len(FlickerHeatmapLibrary(tmp_path).index) == 4
+
+    # read-only libraries are indexed in memory and can't be saved to
+    read_only_dir = tmp_path / "read_only"
+    read_only_dir.mkdir()
+    read_only = FlickerHeatmapLibrary(read_only_dir, read_only=True)
+    assert read_only.save((70, (10, 10), heatmap, grid, grid), 35.2, -101.9, 1, None) is None
+    np.savetxt(read_only_dir / "33.209_-108.283_4_12_shadow.txt", np.zeros((3, 3)))
+    assert len(read_only.index) == 1
+    assert os.listdir(read_only_dir) == ["33.209_-108.283_4_12_shadow.txt"]
+    assert FlickerHeatmapLibrary().read_only
+
+    # heat maps shipped for the test resource files
+    shipped = FlickerHeatmapLibrary()
+    assert len(shipped.index) >= 2
+    assert shipped.get(39.7555, -105.2211, 70, FlickerMismatch.steps_per_hour, None)[0] == 70
+    assert shipped.nearest(35.2018863, -101.945027, 100)[2].shape == (9, 12)
+
+    # same location bucket, diameter and settings
+    flicker_data = library.get(35.22, -101.92, 70, 1, None)
+    assert flicker_data[0] == 70
+    assert flicker_data[1] == (10, 10)
+    assert flicker_data[2][0, 0] == approx(0.07)
+    assert library.get(35.2, -101.9, 70, 4, 12) is None
+
+    # nearest location, then closest diameter
+    assert library.nearest(35.0, -102.0, 90)[0] == 100
+    assert library.nearest(35.0, -102.0, 80)[0] == 70
+    assert library.nearest(40, -105, 70)[0] == 100
+    assert library.nearest(33, -108)[2].shape == (3, 3)
+
+    # heat map is scaled to the turbine diameter: a strand 15 m from the turbine is only in the scaled heat map
+    strand = LineString([(15, -50), (15, 50)])
+    loss = get_flicker_loss_multiplier(flicker_data, [0], [0], 70, (1, 2), primary_strands=[(50, strand.length, strand)])
+    assert loss == 1
+    loss = get_flicker_loss_multiplier(flicker_data, [0], [0], 140, (1, 2), primary_strands=[(50, strand.length, strand)])
+    assert loss < 1
+
+
 def test_hybrid_layout_wind_only(site):
     config = WindConfig.from_dict(technology['wind'])
     power_sources = {
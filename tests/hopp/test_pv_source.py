@@ -1,6 +1,7 @@
 import pytest
 from pytest import fixture
 
+import numpy as np
 from numpy.testing import assert_array_equal
 
 from hopp.simulation.technologies.pv.pv_plant import PVConfig, PVPlant
@@ -78,4 +79,23 @@ def test_pv_plant_mass(site, subtests):
     pv_plant = PVPlant(site=site, config=config)
 
     with subtests.test("plant mass"):
-        assert pv_plant.plant_mass == pytest.approx(5079.51,0.01)
\ No newline at end of file
+        assert pv_plant.plant_mass == pytest.approx(5079.51,0.01)
+
+def test_pv_generation_profile_arrays(site):
+    config = PVConfig.from_dict({'system_capacity_kw': 100.0})
+    pv_plant = PVPlant(site=site, config=config)
+    pv_plant.simulate_power(1)
+
+    gen = pv_plant.generation_profile
+    assert isinstance(gen, np.ndarray)
+    assert len(gen) == site.n_timesteps
+    assert not gen.flags.writeable
+    assert_array_equal(gen, pv_plant._system_model.value("gen"))
+
+    gen_max_feasible = pv_plant.calc_gen_max_feasible_kwh(interconnect_kw=50.0)
+    assert isinstance(gen_max_feasible, np.ndarray)
+    assert gen_max_feasible.max() <= 50.0
+
+    pv_plant.gen_max_feasible = gen_max_feasible.tolist()
+    assert not pv_plant.gen_max_feasible.flags.writeable
+    assert_array_equal(pv_plant.gen_max_feasible, gen_max_feasible)
@@ -1,10 +1,15 @@
 import os
+import shutil
 
 import requests
 import pytest
 import responses
 
+from hopp import ROOT_DIR
 from hopp.simulation.technologies.resource import Resource
+from hopp.tools.resource import resource_loader_file
+from hopp.tools.resource.resource_loader import resource_loader_files
+from hopp.tools.resource.resource_loader.resource_loader_files import MANIFEST_FILENAME
 
 api_url = "https://api.example.com/data"
 fname = "testfile.csv"
@@ -72,4 +77,43 @@ def test_call_api_429_error():
         status=429
     )
     with pytest.raises(RuntimeError):
-        Resource.call_api(api_url, fname)
\ No newline at end of file
+        Resource.call_api(api_url, fname)
+
+
+def test_resource_loader_file(tmp_path, monkeypatch):
+    for resource_type in ('solar', 'wind'):
+        shutil.copytree(ROOT_DIR.parent / "resource_files" / resource_type, tmp_path / resource_type)
+
+    all_sites = resource_loader_file(tmp_path, [39.7, 35.0], [-105.0, -102.0])
+    assert list(all_sites['site_nums']) == [1, 2, 3, 4]
+    assert list(all_sites['Lat']) == [39.7, 35.0, 39.7, 35.0]
+    assert list(all_sites['Lon']) == [-105.0, -105.0, -102.0, -102.0]
+    assert [os.path.basename(f) for f in all_sites['solar_filenames']] == [
+        "39.7555_-105.2211_psmv3_60_2012.csv", "35.2018863_-101.945027_psmv3_60_2012.csv",
+        "39.7555_-105.2211_psmv3_60_2012.csv", "35.2018863_-101.945027_psmv3_60_2012.csv"]
+    assert all(os.path.basename(f).startswith("35.2018863_-101.945027") for f in all_sites['wind_filenames'])
+    assert (tmp_path / "solar" / MANIFEST_FILENAME).is_file()
+    assert not any(MANIFEST_FILENAME in f for f in all_sites['solar_filenames'])
+    assert len(list((tmp_path / "solar").glob("*.csv"))) == len(os.listdir(ROOT_DIR.parent / "resource_files" / "solar"))
+
+    # coordinates are read from the manifest once it exists
+    monkeypatch.setattr(resource_loader_files.pd, "read_csv", _only_read_manifest(resource_loader_files.pd.read_csv))
+    assert resource_loader_file(tmp_path, [39.7, 35.0], [-105.0, -102.0]).equals(all_sites)
+    monkeypatch.undo()
+
+    # empty, truncated and old-format manifests are rebuilt from the resource files
+    manifest_path = tmp_path / "solar" / MANIFEST_FILENAME
+    manifest = manifest_path.read_text()
+    for corrupt in ("", manifest[:len(manifest) // 2], "Filename,Lat,Lon\n"):
+        manifest_path.write_text(corrupt)
+        assert resource_loader_file(tmp_path, [39.7, 35.0], [-105.0, -102.0]).equals(all_sites)
+        assert manifest_path.read_text() == manifest
+    assert sorted(os.listdir(tmp_path / "solar")) == sorted(os.listdir(ROOT_DIR.parent / "resource_files" / "solar") +
+                                                            [MANIFEST_FILENAME])
+
+
+def _only_read_manifest(read_csv):
+    def read_manifest_only(path, *args, **kwargs):
+        assert os.path.basename(path) == MANIFEST_FILENAME
+        return read_csv(path, *args, **kwargs)
+    return read_manifest_only
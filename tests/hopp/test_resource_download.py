@@ -1,15 +1,22 @@
 from pytest import approx, fixture
 import responses
 import os
+import pandas as pd
 
 from hopp import ROOT_DIR
 from hopp.simulation.technologies.resource.solar_resource import BASE_URL as SOLAR_URL
+from hopp.simulation.technologies.resource.solar_resource import (
+    SOLAR_RESOURCE_FILE_CACHE_SIZE,
+    read_solar_resource_file,
+    solar_resource_file_to_sam_data
+)
 from hopp.simulation.technologies.resource.wind_resource import WTK_BASE_URL, TAP_BASE_URL
-from hopp.simulation.technologies.resource import SolarResource, WindResource, Resource
+from hopp.simulation.technologies.resource import SolarResource, WindResource, WaveResource, Resource
 from tests.hopp.utils import DEFAULT_WIND_RESOURCE_FILE
 
 import PySAM.Windpower as wp
 import PySAM.Pvwattsv8 as pv
+from PySAM.ResourceTools import SAM_CSV_to_solar_data
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 
@@ -26,6 +33,8 @@ solar_file = ROOT_DIR.parent / "resource_files" / "solar" / "39.7555_-105.2211_p
 with open(solar_file, 'r') as f:
     solar_body = f.read()
 
+wave_file = ROOT_DIR.parent / "resource_files" / "wave" / "Wave_resource_timeseries.csv"
+
 @responses.activate
 def test_solar():
     resp = responses.add(
@@ -154,3 +163,81 @@ def test_from_file():
         filepath=str(solar_file)
     )
     assert(len(solar_resource.data['gh']) > 0)
+
+
+def test_solar_resource_file_cache(tmp_path):
+    expected = SAM_CSV_to_solar_data(str(solar_file))
+    assert solar_resource_file_to_sam_data(solar_file) == expected
+
+    # each file is parsed once and shared until it is modified
+    table = read_solar_resource_file(solar_file)
+    assert read_solar_resource_file(str(solar_file)) is table
+    assert table.attrs['Time Zone'] == str(int(expected['tz']))
+
+    copied_file = tmp_path / solar_file.name
+    copied_file.write_text(solar_body)
+    copied_table = read_solar_resource_file(copied_file)
+    assert copied_table is not table
+    os.utime(copied_file, (0, 0))
+    assert read_solar_resource_file(copied_file) is not copied_table
+
+    # only the most recently read files are kept
+    for i in range(SOLAR_RESOURCE_FILE_CACHE_SIZE):
+        other_file = tmp_path / f"{i}_{solar_file.name}"
+        other_file.write_text(solar_body)
+        read_solar_resource_file(other_file)
+    assert read_solar_resource_file(solar_file) is not table
+
+
+def test_resource_binary_cache(tmp_path, monkeypatch):
+    copied_solar_file = tmp_path / solar_file.name
+    copied_solar_file.write_text(solar_body)
+    copied_wind_file = tmp_path / DEFAULT_WIND_RESOURCE_FILE.name
+    copied_wind_file.write_text(wind_body)
+
+    expected_solar = SolarResource(lat=lat, lon=lon, year=year, filepath=str(copied_solar_file)).data
+    expected_wind = WindResource(lat=lat, lon=lon, year=year, wind_turbine_hub_ht=hubheight,
+                                 filepath=str(copied_wind_file)).data
+    assert not os.path.isfile(str(copied_solar_file) + ".npz")
+
+    monkeypatch.setattr(Resource, "use_binary_cache", True)
+    for _ in range(2):
+        # first read writes the sidecar files, second read loads them
+        solar_resource = SolarResource(lat=lat, lon=lon, year=year, filepath=str(copied_solar_file))
+        assert solar_resource.data == expected_solar
+        wind_resource = WindResource(lat=lat, lon=lon, year=year, wind_turbine_hub_ht=hubheight,
+                                     filepath=str(copied_wind_file))
+        assert wind_resource.data == expected_wind
+        assert os.path.isfile(str(copied_solar_file) + ".npz")
+        assert os.path.isfile(str(copied_wind_file) + ".npz")
+
+    # sidecar is ignored once the resource file changes
+    os.utime(copied_solar_file, (0, 0))
+    assert solar_resource.read_binary_cache(copied_solar_file) is None
+
+    # caches are replaced whole, and unreadable caches fall back to the resource file
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([copied_solar_file.name, copied_wind_file.name,
+                                                                 copied_solar_file.name + ".npz",
+                                                                 copied_wind_file.name + ".npz"])
+    with open(str(copied_wind_file) + ".npz", "wb") as f:
+        f.write(b"not a cache")
+    assert wind_resource.read_binary_cache(copied_wind_file) is None
+    wind_resource = WindResource(lat=lat, lon=lon, year=year, wind_turbine_hub_ht=hubheight,
+                                 filepath=str(copied_wind_file))
+    assert wind_resource.data == expected_wind
+
+
+def test_wave_resource_binary_cache(tmp_path, monkeypatch):
+    copied_wave_file = tmp_path / wave_file.name
+    copied_wave_file.write_text(wave_file.read_text())
+
+    expected_wave = WaveResource(lat=lat, lon=lon, year=year, filepath=str(copied_wave_file)).data
+
+    monkeypatch.setattr(Resource, "use_binary_cache", True)
+    for _ in range(2):
+        wave_resource = WaveResource(lat=lat, lon=lon, year=year, filepath=str(copied_wave_file))
+        assert os.path.isfile(str(copied_wave_file) + ".npz")
+        assert wave_resource.data.keys() == expected_wave.keys()
+        for key, values in expected_wave.items():
+            assert isinstance(wave_resource.data[key], pd.Series)
+            assert wave_resource.data[key].tolist() == values.tolist()